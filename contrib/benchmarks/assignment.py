@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares assignments to object properties, local variables and nested
+dict and list items with the legacy LhsExpression, which evaluated every
+target through YAQL in a freshly populated context, and with assignment
+targets compiled into chains of keys.
+"""
+
+import argparse
+import os
+import sys
+import time
+import types
+
+import yaql.context
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import lhs_expression  # noqa
+from muranoapi.dsl import murano_object  # noqa
+from muranoapi.dsl import type_scheme  # noqa
+from muranoapi.dsl import yaql_expression  # noqa
+
+import object_memory  # noqa
+
+
+class LegacyLhsExpression(object):
+    Property = lhs_expression.LhsExpression.Property
+
+    def __init__(self, expression):
+        self._expression = yaql_expression.parse(expression)
+        self._current_obj = None
+        self._current_obj_name = None
+
+    def _create_context(self, root_context, murano_class):
+        def _get_value(src, key):
+            if isinstance(src, types.DictionaryType):
+                return src.get(key)
+            elif isinstance(src, types.ListType) and isinstance(
+                    key, types.IntType):
+                return src[key]
+            elif isinstance(src, murano_object.MuranoObject) and isinstance(
+                    key, types.StringTypes):
+                self._current_obj = src
+                self._current_obj_name = key
+                return src.get_property(key, murano_class)
+            else:
+                raise TypeError()
+
+        def _set_value(src, key, value):
+            if isinstance(src, types.DictionaryType):
+                old_value = src.get(key, type_scheme.NoValue)
+                src[key] = value
+                if self._current_obj is not None:
+                    try:
+                        p_value = self._current_obj.get_property(
+                            self._current_obj_name, murano_class)
+                        self._current_obj.set_property(
+                            self._current_obj_name, p_value, murano_class)
+                    except Exception as e:
+                        if old_value is not type_scheme.NoValue:
+                            src[key] = old_value
+                        else:
+                            src.pop(key, None)
+                        raise e
+            elif isinstance(src, types.ListType) and isinstance(
+                    key, types.IntType):
+                old_value = src[key]
+                src[key] = value
+                if self._current_obj is not None:
+                    try:
+                        p_value = self._current_obj.get_property(
+                            self._current_obj_name, murano_class)
+                        self._current_obj.set_property(
+                            self._current_obj_name, p_value, murano_class)
+                    except Exception as e:
+                        src[key] = old_value
+                        raise e
+            elif isinstance(src, murano_object.MuranoObject) and isinstance(
+                    key, types.StringTypes):
+                src.set_property(key, value, murano_class)
+            else:
+                raise TypeError()
+
+        def get_context_data(path):
+            path = path()
+
+            def set_data(value):
+                if not path or path == '$' or path == '$this':
+                    raise ValueError()
+                root_context.set_data(value, path)
+
+            return self.Property(
+                lambda: root_context.get_data(path), set_data)
+
+        @yaql.context.EvalArg('this', arg_type=self.Property)
+        def attribution(this, arg_name):
+            arg_name = arg_name()
+            return self.Property(
+                lambda: _get_value(this.get(), arg_name),
+                lambda value: _set_value(this.get(), arg_name, value))
+
+        @yaql.context.EvalArg("this", self.Property)
+        def indexation(this, index):
+            return self.Property(
+                lambda: _get_value(this.get(), index()),
+                lambda value: _set_value(this.get(), index(), value))
+
+        context = yaql.context.Context()
+        context.register_function(get_context_data, '#get_context_data')
+        context.register_function(attribution, '#operator_.')
+        context.register_function(indexation, "where")
+        return context
+
+    def __call__(self, value, context, murano_class):
+        new_context = self._create_context(context, murano_class)
+        new_context.set_data(context.get_data('$'))
+        self._current_obj = None
+        self._current_obj_name = None
+        property = self._expression.evaluate(context=new_context)
+        property.set(value)
+
+
+def measure(lhs_class, target, value, context, murano_class, count, repeat):
+    lhs = lhs_class(target)
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in xrange(count):
+            lhs(value, context, murano_class)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dsl_executor = executor.MuranoDslExecutor(object_memory.ModelLoader())
+    root = dsl_executor.load({'Objects': object_memory.build_model(1)})
+    app = root.get_property('applications')[0]
+    # Resource declares the writable 'state' property
+    resource = app.type.parents[0].parents[0]
+    context = dsl_executor._create_context(app, resource, None)
+    context.set_data({'name': None, 'ports': [0, 0]}, 'template')
+
+    row = '{0:<20} {1:>12} {2:>12}'
+    print(row.format('target', 'legacy, us', 'current, us'))
+    for target, value in (('$.state', 'deployed'),
+                          ('$template', {'name': None, 'ports': [0, 0]}),
+                          ('$template.name', 'app'),
+                          ('$template.ports[0]', 80)):
+        timings = [measure(cls, target, value, context, resource,
+                           args.count, args.repeat)
+                   for cls in (LegacyLhsExpression,
+                               lhs_expression.LhsExpression)]
+        print(row.format(target, '%.1f' % (timings[0] * 1e6),
+                         '%.1f' % (timings[1] * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
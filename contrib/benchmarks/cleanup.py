@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares MuranoDslExecutor.cleanup() with the legacy implementation, which
+loaded the whole ObjectsCopy model into a second object store, and with
+the current one, which loads only deleted objects and the objects they
+depend on, on the object_memory.py model: with nothing deleted and with
+one application deleted.
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import object_store  # noqa
+
+import object_memory  # noqa
+
+
+class LegacyExecutor(executor.MuranoDslExecutor):
+    def cleanup(self, data):
+        objects_copy = data.get('ObjectsCopy')
+        if not objects_copy:
+            return
+        gc_object_store = object_store.ObjectStore(self._class_loader)
+        gc_object_store.load(objects_copy, None, self._root_context)
+        objects_to_clean = []
+        for object_id in self._list_objects(objects_copy):
+            if gc_object_store.has(object_id) \
+                    and not self._object_store.has(object_id):
+                obj = gc_object_store.get(object_id)
+                objects_to_clean.append(obj)
+        if objects_to_clean:
+            backup = self._object_store
+            try:
+                self._object_store = gc_object_store
+                for obj in objects_to_clean:
+                    methods = obj.type.find_method('destroy')
+                    for cls, method in methods:
+                        try:
+                            cls.invoke(method, self, obj, {})
+                        except Exception:
+                            pass
+            finally:
+                self._object_store = backup
+
+
+def measure(executor_class, objects, objects_copy, repeat):
+    loader = object_memory.ModelLoader()
+    best = None
+    for _ in range(repeat):
+        dsl_executor = executor_class(loader)
+        dsl_executor.load({'Objects': copy.deepcopy(objects)})
+        data = {'ObjectsCopy': copy.deepcopy(objects_copy)}
+        start = time.time()
+        dsl_executor.cleanup(data)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--applications', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    model = object_memory.build_model(args.applications)
+    changed = copy.deepcopy(model)
+    changed['applications'].pop()
+
+    row = '{0:<22} {1:>15} {2:>15}'
+    print('model objects: {0}'.format(1 + 2 * args.applications))
+    print(row.format('case', 'legacy, ms', 'current, ms'))
+    for title, objects in (('nothing deleted', model),
+                           ('one app deleted', changed)):
+        timings = [measure(cls, objects, model, args.repeat)
+                   for cls in (LegacyExecutor, executor.MuranoDslExecutor)]
+        print(row.format(title, '%.1f' % (timings[0] * 1000),
+                         '%.1f' % (timings[1] * 1000)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares helpers.evaluate() with precomputed evaluation plans on a Heat
+template like statement: a large constant dict with a few expressions.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import yaql
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import helpers  # noqa
+from muranoapi.dsl import yaql_expression  # noqa
+
+
+def build_template(resources):
+    template = {'Resources': {}, 'Outputs': {}}
+    for index in range(resources):
+        name = 'Instance{0}'.format(index)
+        template['Resources'][name] = {
+            'Type': 'AWS::EC2::Instance',
+            'Properties': {
+                'InstanceType': 'm1.medium',
+                'ImageId': 'ubuntu-14.04',
+                'KeyName': yaql_expression.YaqlExpression('$.keyname')
+                if index == 0 else 'default',
+                'UserData': {'Fn::Base64': {'Fn::Join': ['', [
+                    '#!/bin/bash\n', 'echo ', name, '\n']]}},
+                'NetworkInterfaces': [{
+                    'DeviceIndex': '0',
+                    'SubnetId': {'Ref': 'Subnet'},
+                    'AssociatePublicIpAddress': True
+                }]
+            }
+        }
+        template['Outputs'][name + '-PublicIp'] = {
+            'Value': {'Fn::GetAtt': [name, 'PublicIp']}
+        }
+    return template
+
+
+def measure(func, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in xrange(count):
+            func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    context = yaql.create_context()
+    context.set_data({'keyname': 'key'})
+    row = '{0:<10} {1:>14} {2:>14}'
+    print(row.format('resources', 'evaluate, us', 'plan, us'))
+    for resources in (10, 100):
+        template = build_template(resources)
+        plan = helpers.EvaluationPlan(template)
+        assert plan(context) == helpers.evaluate(template, context)
+        legacy = measure(lambda: helpers.evaluate(template, context),
+                         args.count, args.repeat)
+        current = measure(lambda: plan(context), args.count, args.repeat)
+        print(row.format(resources, '%.1f' % (legacy * 1e6),
+                         '%.1f' % (current * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
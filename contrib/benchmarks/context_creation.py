@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares YAQL context creation of the legacy executor, which built and
+populated the root context for every task and registered two closures in
+every method call context, with the shared frozen root context and cached
+per-class contexts: executor construction and method call context creation.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import yaql.context
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import murano_object  # noqa
+from muranoapi.dsl import yaql_functions  # noqa
+
+import object_memory  # noqa
+
+
+class LegacyExecutor(executor.MuranoDslExecutor):
+    def __init__(self, class_loader, environment=None):
+        super(LegacyExecutor, self).__init__(class_loader, environment)
+        self._root_context = class_loader.create_root_context()
+        self._root_context.set_data(self, '?executor')
+        self._root_context.set_data(self._class_loader, '?classLoader')
+        self._root_context.set_data(environment, '?environment')
+        self._root_context.set_data(self._object_store, '?objectStore')
+        self._root_context.set_data(self._attribute_store, '?attributeStore')
+        yaql_functions.register(self._root_context)
+        self._root_context = yaql.context.Context(self._root_context)
+
+    def _create_context(self, this, murano_class, context, **kwargs):
+        new_context = self._class_loader.create_local_context(
+            parent_context=self._root_context,
+            murano_class=murano_class)
+        new_context.set_data(this)
+        new_context.set_data(this, 'this')
+        new_context.set_data(this, '?this')
+        new_context.set_data(murano_class, '?type')
+        new_context.set_data(context, '?callerContext')
+
+        @yaql.context.EvalArg('obj', arg_type=murano_object.MuranoObject)
+        @yaql.context.EvalArg('property_name', arg_type=str)
+        def obj_attribution(obj, property_name):
+            return obj.get_property(property_name, murano_class)
+
+        @yaql.context.EvalArg('prefix', str)
+        @yaql.context.EvalArg('name', str)
+        def validate(prefix, name):
+            return murano_class.namespace_resolver.resolve_name(
+                '%s:%s' % (prefix, name))
+
+        new_context.register_function(obj_attribution, '#operator_.')
+        new_context.register_function(validate, '#validate')
+        for key, value in kwargs.iteritems():
+            new_context.set_data(value, key)
+        return new_context
+
+
+def best_of(function, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in xrange(count):
+            function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    loader = object_memory.ModelLoader()
+    row = '{0:<22} {1:>12} {2:>12}'
+    print(row.format('case', 'legacy, us', 'current, us'))
+    executors = []
+    for executor_class in (LegacyExecutor, executor.MuranoDslExecutor):
+        executors.append((
+            best_of(lambda: executor_class(loader), args.count, args.repeat),
+            executor_class(loader)))
+    print(row.format('executor construction',
+                     '%.1f' % (executors[0][0] * 1e6),
+                     '%.1f' % (executors[1][0] * 1e6)))
+
+    timings = []
+    for _, dsl_executor in executors:
+        root = dsl_executor.load({'Objects': object_memory.build_model(1)})
+        timings.append(best_of(
+            lambda: dsl_executor._create_context(
+                root, root.type, None, value=1),
+            args.count * 10, args.repeat))
+    print(row.format('method call context', '%.1f' % (timings[0] * 1e6),
+                     '%.1f' % (timings[1] * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
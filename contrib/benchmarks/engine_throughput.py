@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measures engine throughput with 1 to N worker processes consuming CPU-bound
+tasks (loading and serializing object_memory.py models, every fourth task
+eight times larger than the others). The main process stands for the
+broker: it delivers tasks to the workers round-robin, to each at most
+--prefetch unacknowledged tasks at a time, and a worker acknowledges a task
+once it is completed, the way engine workers consume the tasks topic.
+Reports tasks per second and the speedup over a single worker for the given
+prefetch and for unlimited prefetch, i.e. workers that take every task they
+are offered.
+"""
+
+import argparse
+import copy
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import results_serializer  # noqa
+
+import object_memory  # noqa
+
+LARGE_TASK_PERIOD = 4
+LARGE_TASK_FACTOR = 8
+
+
+def run_task(model):
+    dsl_executor = executor.MuranoDslExecutor(object_memory.ModelLoader())
+    root = dsl_executor.load({'Objects': copy.deepcopy(model)})
+    results_serializer.serialize(root, dsl_executor)
+
+
+def worker(index, tasks, acks, models):
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        run_task(models[task])
+        acks.put(index)
+
+
+def measure(workers, tasks, models, prefetch):
+    queues = [multiprocessing.Queue() for _ in range(workers)]
+    acks = multiprocessing.Queue()
+    processes = [multiprocessing.Process(
+        target=worker, args=(index, queues[index], acks, models))
+        for index in range(workers)]
+    for process in processes:
+        process.start()
+    start = time.time()
+    unacked = [0] * workers
+    delivered = 0
+    consumer = 0
+    for _ in range(tasks):
+        while delivered < tasks:
+            for offset in range(workers):
+                index = (consumer + offset) % workers
+                if not prefetch or unacked[index] < prefetch:
+                    break
+            else:
+                break
+            queues[index].put(int(delivered % LARGE_TASK_PERIOD == 0))
+            unacked[index] += 1
+            delivered += 1
+            consumer = (index + 1) % workers
+        unacked[acks.get()] -= 1
+    elapsed = time.time() - start
+    for queue in queues:
+        queue.put(None)
+    for process in processes:
+        process.join()
+    return tasks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-workers', type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument('--tasks', type=int, default=64)
+    parser.add_argument('--applications', type=int, default=10)
+    parser.add_argument('--prefetch', type=int, default=1)
+    args = parser.parse_args()
+
+    models = [object_memory.build_model(args.applications),
+              object_memory.build_model(
+                  args.applications * LARGE_TASK_FACTOR)]
+    run_task(models[0])
+
+    row = '{0:>8} {1:>12} {2:>9} {3:>12} {4:>9}'
+    print('cores: {0}, prefetch: {1}'.format(
+        multiprocessing.cpu_count(), args.prefetch))
+    print(row.format('workers', 'tasks/s', 'speedup', 'unlimited',
+                     'speedup'))
+    bases = [None, None]
+    for workers in range(1, args.max_workers + 1):
+        throughputs = [measure(workers, args.tasks, models, prefetch)
+                       for prefetch in (args.prefetch, 0)]
+        bases = [base or throughput
+                 for base, throughput in zip(bases, throughputs)]
+        print(row.format(workers,
+                         '%.1f' % throughputs[0],
+                         '%.2f' % (throughputs[0] / bases[0]),
+                         '%.1f' % throughputs[1],
+                         '%.2f' % (throughputs[1] / bases[1])))
+
+
+if __name__ == '__main__':
+    main()
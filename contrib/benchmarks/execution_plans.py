@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares building of agent execution plans for a number of hosts with
+legacy resource access, which read and encoded script files for every
+host, and with the process-wide resource cache.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.common import config  # noqa
+from muranoapi.engine.system import agent  # noqa
+from muranoapi.engine.system import resource_manager  # noqa
+
+
+class Package(object):
+    def __init__(self, directory):
+        self._directory = directory
+
+    def get_resource(self, name):
+        return os.path.join(self._directory, 'Resources', name)
+
+
+class LegacyResourceManager(resource_manager.ResourceManager):
+    def string(self, name):
+        with open(self._package.get_resource(name)) as file:
+            return file.read()
+
+    def base64(self, name):
+        return self.string(name).encode('base64')
+
+
+def build_package(directory, scripts, script_size):
+    os.makedirs(os.path.join(directory, 'Resources', 'scripts'))
+    names = []
+    for index in range(scripts):
+        name = 'script%d.sh' % index
+        path = os.path.join(directory, 'Resources', 'scripts', name)
+        with open(path, 'w') as file:
+            file.write('#' * script_size)
+        names.append(name)
+    return names
+
+
+def build_plans(resources_class, package, names, hosts):
+    resources = object.__new__(resources_class)
+    resources._package = package
+    builder = object.__new__(agent.Agent)
+    start = time.time()
+    for _ in xrange(hosts):
+        builder.buildExecutionPlan({
+            'FormatVersion': '2.0.0',
+            'Scripts': {
+                'deploy': {
+                    'EntryPoint': names[0],
+                    'Files': ['<{0}>'.format(name) for name in names[1:]]
+                }
+            }
+        }, resources)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hosts', type=int, default=200)
+    parser.add_argument('--scripts', type=int, default=5)
+    parser.add_argument('--script-size', type=int, default=64 * 1024)
+    args = parser.parse_args()
+
+    config.parse_args([])
+    directory = tempfile.mkdtemp()
+    try:
+        names = build_package(directory, args.scripts, args.script_size)
+        package = Package(directory)
+        legacy = build_plans(LegacyResourceManager, package, names,
+                             args.hosts)
+        current = build_plans(resource_manager.ResourceManager, package,
+                              names, args.hosts)
+    finally:
+        shutil.rmtree(directory)
+
+    print('hosts: {0}, scripts: {1} x {2} bytes'.format(
+        args.hosts, args.scripts, args.script_size))
+    print('legacy plans, ms:  {0:.1f}'.format(legacy * 1000))
+    print('current plans, ms: {0:.1f}'.format(current * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares parsing of method bodies with the legacy macro dispatch (every
+registered macro is tried until one accepts the keywords) and with the
+keyword index, and execution of a Match block with the legacy per-call
+CodeBlock construction and with pre-parsed branches.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import yaml
+import yaql
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import exceptions  # noqa
+from muranoapi.dsl import expressions  # noqa
+from muranoapi.dsl import macros  # noqa
+from muranoapi.dsl import yaql_expression  # noqa
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir,
+                                    os.pardir))
+SOURCES = [os.path.join(ROOT, 'meta'),
+           os.path.join(ROOT, 'muranoapi', 'tests', 'language')]
+
+
+class YaqlLoader(yaml.Loader):
+    pass
+
+
+def _yaql_constructor(loader, node):
+    return yaql_expression.YaqlExpression(loader.construct_scalar(node))
+
+
+yaml.add_constructor(u'!yaql', _yaql_constructor, YaqlLoader)
+yaml.add_implicit_resolver(u'!yaql', yaql_expression.YaqlExpression,
+                           Loader=YaqlLoader)
+
+
+class LinearMacros(object):
+    """Stands in for the keyword index and offers every macro instead."""
+
+    def __init__(self, index):
+        self._classes = []
+        for classes in index.itervalues():
+            for cls in classes:
+                if cls not in self._classes:
+                    self._classes.append(cls)
+
+    def get(self, keywords, default=None):
+        return self._classes
+
+
+class LegacyMatchMacro(macros.MatchMacro):
+    def __init__(self, Match, Value, Default=None):
+        super(LegacyMatchMacro, self).__init__(Match, Value, Default)
+        self._match = Match
+
+    def execute(self, context, murano_class):
+        match_value = self._value(context)
+        for key, value in self._match.iteritems():
+            if key == match_value:
+                macros.CodeBlock(value).execute(context, murano_class)
+                return
+        if self._default is not None:
+            self._default.execute(context, murano_class)
+
+
+def load_bodies():
+    bodies = []
+    for source in SOURCES:
+        for path, _, files in os.walk(source):
+            for name in files:
+                if not name.endswith('.yaml') or name == 'manifest.yaml':
+                    continue
+                with open(os.path.join(path, name)) as stream:
+                    data = yaml.load(stream, YaqlLoader)
+                for method in (data.get('Workflow') or {}).itervalues():
+                    body = (method or {}).get('Body')
+                    if body:
+                        bodies.append(body)
+    return bodies
+
+
+def measure(func, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in xrange(count):
+            func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count
+
+
+def parse_all(bodies):
+    for body in bodies:
+        macros.MethodBlock(body)
+
+
+def measure_parsing(bodies, count, repeat):
+    index = expressions._macros
+    current = measure(lambda: parse_all(bodies), count, repeat)
+    expressions._macros = LinearMacros(index)
+    try:
+        legacy = measure(lambda: parse_all(bodies), count, repeat)
+    finally:
+        expressions._macros = index
+    return legacy, current
+
+
+def measure_match(branches, count, repeat):
+    match = dict(('key{0}'.format(i), [{'Return': i}])
+                 for i in range(branches))
+    value = yaql_expression.YaqlExpression('$value')
+    context = yaql.create_context()
+    context.set_data('key{0}'.format(branches - 1), 'value')
+    results = []
+    for cls in (LegacyMatchMacro, macros.MatchMacro):
+        macro = cls(match, value)
+
+        def run():
+            try:
+                macro.execute(context, None)
+            except exceptions.ReturnException:
+                pass
+        results.append(measure(run, count, repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    bodies = load_bodies()
+    row = '{0:<26} {1:>12} {2:>12}'
+    print(row.format('case', 'legacy, us', 'current, us'))
+    legacy, current = measure_parsing(bodies, args.count, args.repeat)
+    print(row.format('parse {0} method bodies'.format(len(bodies)),
+                     '%.1f' % (legacy * 1e6), '%.1f' % (current * 1e6)))
+    for branches in (4, 32):
+        legacy, current = measure_match(branches, args.count * 10,
+                                        args.repeat)
+        print(row.format('Match, {0} branches'.format(branches),
+                         '%.1f' % (legacy * 1e6), '%.1f' % (current * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
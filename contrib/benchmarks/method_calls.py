@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares MuranoPL method call rate with the legacy executor (a greenthread,
+an Event and a uuid marker per call) and with inline execution: recursive
+calls on one object and a chain of calls across objects.
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+import eventlet
+import eventlet.event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.tests import dsl_utils  # noqa
+
+
+CLASSES = {
+    'Node': """
+Name: Node
+Properties:
+  next:
+    Contract: $.class(Node)
+Workflow:
+  depth:
+    Arguments:
+      - n:
+          Contract: $.int()
+    Body:
+      - If: $n > 0
+        Then:
+          - Return: $.depth($n - 1) + 1
+      - Return: 0
+  length:
+    Body:
+      - If: $.next = null
+        Then:
+          - Return: 1
+      - Return: $.next.length() + 1
+"""
+}
+
+
+class LegacyExecutor(executor.MuranoDslExecutor):
+    def _invoke_method_implementation(self, method, this, murano_class,
+                                      context, params):
+        body = method.body
+        if not body:
+            return None
+
+        current_thread = eventlet.greenthread.getcurrent()
+        if not hasattr(current_thread, '_murano_dsl_thread_marker'):
+            thread_marker = current_thread._murano_dsl_thread_marker = \
+                uuid.uuid4().hex
+        else:
+            thread_marker = current_thread._murano_dsl_thread_marker
+
+        method_id = id(body)
+        this_id = this.object_id
+
+        event, marker = self._locks.get((method_id, this_id), (None, None))
+        if event:
+            if marker == thread_marker:
+                return self._invoke_method_implementation_gt(
+                    body, this, params, murano_class, context)
+            event.wait()
+
+        event = eventlet.event.Event()
+        self._locks[(method_id, this_id)] = (event, thread_marker)
+        gt = eventlet.spawn(self._invoke_method_implementation_gt, body,
+                            this, params, murano_class, context,
+                            thread_marker)
+        result = gt.wait()
+        del self._locks[(method_id, this_id)]
+        event.send()
+        return result
+
+
+def build_chain(length):
+    head = None
+    for index in range(length):
+        node = dsl_utils.new_object('Node', 'node{0}'.format(index))
+        node['next'] = head
+        head = node
+    return head
+
+
+def measure(func, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in xrange(count):
+            func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count
+
+
+def measure_calls(executor_class, method, args, model, count, repeat):
+    loader = dsl_utils.TestClassLoader(CLASSES)
+    dsl_executor = executor_class(loader)
+    root = dsl_executor.load({'Objects': model})
+    return measure(lambda: root.type.invoke(method, dsl_executor, root, args),
+                   count, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # the legacy executor runs reentrant calls on the caller stack and
+    # cannot recurse much deeper than 30 calls on one object
+    cases = [
+        ('recursion, depth 20', 21, 'depth', [20],
+         dsl_utils.new_object('Node', 'node')),
+        ('chain of 50 objects', 50, 'length', [], build_chain(50))
+    ]
+    row = '{0:<22} {1:>16} {2:>16}'
+    print(row.format('case', 'legacy, calls/s', 'inline, calls/s'))
+    for title, calls, method, method_args, model in cases:
+        rates = [calls / measure_calls(cls, method, method_args, model,
+                                       args.count, args.repeat)
+                 for cls in (LegacyExecutor, executor.MuranoDslExecutor)]
+        print(row.format(title, '%.0f' % rates[0], '%.0f' % rates[1]))
+
+
+if __name__ == '__main__':
+    main()
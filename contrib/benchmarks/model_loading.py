@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares loading of the object_memory.py model with the legacy object
+store, which initialized the whole model twice (first with unresolved
+references, then for real), and with the two-phase loader that validates
+every property once and only revisits properties holding references.
+"""
+
+import argparse
+import copy
+import inspect
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import helpers  # noqa
+from muranoapi.dsl import object_store  # noqa
+
+import object_memory  # noqa
+
+
+def legacy_load(self, value, parent, context, defaults=None):
+    if value is None:
+        return None
+    if '?' not in value or 'type' not in value['?']:
+        raise ValueError()
+    system_key = value['?']
+    object_id = system_key['id']
+    class_obj = self._class_loader.get_class(system_key['type'])
+    if not class_obj:
+        raise ValueError()
+    if object_id in self._store:
+        obj = self._store[object_id]
+    else:
+        obj = class_obj.new(parent, self, context=context,
+                            object_id=object_id, defaults=defaults)
+        self._store[object_id] = obj
+        self._designer_attributes_store[object_id] = \
+            object_store.ObjectStore._get_designer_attributes(system_key)
+
+    argspec = inspect.getargspec(obj.initialize).args
+    if '_context' in argspec:
+        value['_context'] = context
+    if '_parent' in argspec:
+        value['_parent'] = parent
+
+    is_root = parent is None
+    try:
+        if is_root:
+            self._initializing = True
+        obj.initialize(**value)
+        if is_root:
+            self._initializing = False
+            obj.initialize(**value)
+    finally:
+        if is_root:
+            self._initializing = False
+
+    if not self.initializing:
+        dsl_executor = helpers.get_executor(context)
+        for cls, method in obj.type.find_method('initialize'):
+            cls.invoke(method, dsl_executor, obj, {})
+    return obj
+
+
+def measure(model, repeat):
+    loader = object_memory.ModelLoader()
+    best = None
+    for _ in range(repeat):
+        data = {'Objects': copy.deepcopy(model)}
+        start = time.time()
+        executor.MuranoDslExecutor(loader).load(data)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--applications', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    model = object_memory.build_model(args.applications)
+    measure(object_memory.build_model(1), 1)
+
+    current_load = object_store.ObjectStore.load
+    object_store.ObjectStore.load = legacy_load
+    try:
+        legacy = measure(model, args.repeat)
+    finally:
+        object_store.ObjectStore.load = current_load
+    current = measure(model, args.repeat)
+
+    print('model objects:    {0}'.format(1 + 2 * args.applications))
+    print('legacy load, ms:  {0:.1f}'.format(legacy * 1000))
+    print('current load, ms: {0:.1f}'.format(current * 1000))
+
+
+if __name__ == '__main__':
+    main()
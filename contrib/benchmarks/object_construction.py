@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares MuranoObject construction with the legacy property initialization
+(two passes over the properties of every class, defaults evaluated for
+every property) and with per-class initialization plans, for objects that
+get all property values and for objects that rely on defaults.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import yaql.context
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import helpers  # noqa
+from muranoapi.dsl import murano_object  # noqa
+from muranoapi.dsl import object_store  # noqa
+from muranoapi.dsl import type_scheme  # noqa
+from muranoapi.dsl import yaql_expression  # noqa
+
+import object_memory  # noqa
+
+
+def _property(contract, default=None):
+    result = object_memory._property(contract)
+    if default is not None:
+        result['Default'] = default
+    return result
+
+
+object_memory.CLASSES['Server'] = {
+    'Extends': 'Resource',
+    'Properties': {
+        'name': _property('$.string().notNull()'),
+        'flavor': _property('$.string()', 'm1.small'),
+        'port': _property('$.int()', 8080),
+        'networks': {
+            'Contract': {
+                'useEnvironmentNetwork': yaql_expression.YaqlExpression(
+                    '$.bool().notNull()'),
+                'useFlatNetwork': yaql_expression.YaqlExpression(
+                    '$.bool().notNull()'),
+                'customNetworks': [yaql_expression.YaqlExpression(
+                    '$.string()')]
+            },
+            'Default': {
+                'useEnvironmentNetwork': True,
+                'useFlatNetwork': False,
+                'customNetworks': []
+            }
+        },
+        'hostname': _property('$.string()', yaql_expression.YaqlExpression(
+            '$.name'))
+    }
+}
+
+
+def legacy_initialize(self, **kwargs):
+    slots = self._MuranoObject__root_object._MuranoObject__type.\
+        object_layout.slots
+    for murano_class in self.type.object_layout.hierarchy:
+        used_names = set()
+        for i in xrange(2):
+            for property_name in murano_class.properties:
+                entry = slots[(murano_class.name, property_name)]
+                default_plan = entry[3]
+                if i == 0 and not default_plan.constant or i == 1 \
+                        and property_name in used_names:
+                    continue
+                used_names.add(property_name)
+                property_value = kwargs.get(property_name,
+                                            type_scheme.NoValue)
+                legacy_set_slot(self, entry, property_name, property_value)
+
+
+def legacy_set_slot(self, entry, key, value, caller_class=None):
+    offset, owner, spec, default_plan = entry
+    root = self._MuranoObject__root_object
+    defaults = self._MuranoObject__defaults
+    context = self._MuranoObject__context
+    if key not in defaults and default_plan.constant:
+        default = default_plan(None)
+    else:
+        default = defaults.get(key, spec.default)
+        child_context = None
+        if helpers.needs_evaluation(default):
+            child_context = yaql.context.Context(parent_context=context)
+            child_context.set_data(root)
+        default = helpers.evaluate(default, child_context, 1)
+
+    self._MuranoObject__values[offset] = spec.validate(
+        value, root, context, self._MuranoObject__object_store, default)
+
+
+def construct(server_class, store, context, values, count):
+    for index in xrange(count):
+        obj = server_class.new(None, store, context)
+        obj.initialize(**values)
+
+
+def measure(values, count, repeat):
+    loader = object_memory.ModelLoader()
+    server_class = loader.get_class('Server')
+    store = object_store.ObjectStore(loader)
+    context = loader.create_root_context()
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        construct(server_class, store, context, values, count)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ('all values given', {
+            'name': 'server', 'flavor': 'm1.large', 'port': 80,
+            'hostname': 'server.local', 'region': 'RegionOne',
+            'networks': {'useEnvironmentNetwork': False,
+                         'useFlatNetwork': True,
+                         'customNetworks': ['net']}}),
+        ('defaults', {'name': 'server'})
+    ]
+    row = '{0:<18} {1:>12} {2:>12}'
+    print(row.format('case', 'legacy, us', 'current, us'))
+    current_initialize = murano_object.MuranoObject.initialize
+    for title, values in cases:
+        murano_object.MuranoObject.initialize = legacy_initialize
+        try:
+            legacy = measure(values, args.count, args.repeat)
+        finally:
+            murano_object.MuranoObject.initialize = current_initialize
+        current = measure(values, args.count, args.repeat)
+        print(row.format(title, '%.1f' % (legacy * 1e6),
+                         '%.1f' % (current * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measures memory used by a loaded environment model: an environment with
+a number of applications, each owning an instance. Applications and
+instances are 3- and 4-level class hierarchies. Memory is reported as
+growth of peak RSS and of the number of objects tracked by the garbage
+collector while the model is loaded.
+"""
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import class_loader  # noqa
+from muranoapi.dsl import exceptions  # noqa
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import murano_package  # noqa
+from muranoapi.dsl import yaql_expression  # noqa
+
+
+def _property(contract, usage='In'):
+    if isinstance(contract, list):
+        contract = [yaql_expression.YaqlExpression(t) for t in contract]
+    else:
+        contract = yaql_expression.YaqlExpression(contract)
+    return {'Contract': contract, 'Usage': usage}
+
+
+CLASSES = {
+    'io.murano.Object': {},
+    'Environment': {
+        'Properties': {
+            'name': _property('$.string().notNull()'),
+            'applications': _property(['$.class(App)'])
+        }
+    },
+    'Resource': {
+        'Properties': {
+            'region': _property('$.string()'),
+            'state': _property('$.string()', 'Runtime')
+        }
+    },
+    'Application': {
+        'Extends': 'Resource',
+        'Properties': {
+            'name': _property('$.string().notNull()')
+        }
+    },
+    'App': {
+        'Extends': 'Application',
+        'Properties': {
+            'instance': _property('$.class(LinuxInstance)'),
+            'port': _property('$.int()')
+        }
+    },
+    'Instance': {
+        'Extends': 'Resource',
+        'Properties': {
+            'name': _property('$.string().notNull()'),
+            'flavor': _property('$.string()'),
+            'image': _property('$.string()')
+        }
+    },
+    'LinuxInstance': {
+        'Extends': 'Instance',
+        'Properties': {
+            'keyname': _property('$.string()')
+        }
+    },
+    'CustomLinuxInstance': {
+        'Extends': 'LinuxInstance'
+    }
+}
+
+
+class ModelLoader(class_loader.MuranoClassLoader):
+    def load_definition(self, name):
+        if name not in CLASSES:
+            raise exceptions.NoClassFound(name)
+        result = dict(CLASSES[name])
+        result['Name'] = name
+        return result
+
+    def find_package_name(self, class_name):
+        return 'benchmark'
+
+    def load_package(self, name):
+        package = murano_package.MuranoPackage()
+        package.name = name
+        return package
+
+
+def build_model(applications):
+    def instance(index):
+        return {
+            '?': {'id': 'instance%d' % index, 'type': 'CustomLinuxInstance'},
+            'name': 'instance%d' % index,
+            'flavor': 'm1.small',
+            'image': 'ubuntu',
+            'keyname': 'key',
+            'region': 'RegionOne'
+        }
+
+    return {
+        '?': {'id': 'environment', 'type': 'Environment'},
+        'name': 'benchmark',
+        'applications': [{
+            '?': {'id': 'app%d' % index, 'type': 'App'},
+            'name': 'app%d' % index,
+            'port': 8000 + index,
+            'region': 'RegionOne',
+            'instance': instance(index)
+        } for index in range(applications)]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--applications', type=int, default=250)
+    args = parser.parse_args()
+
+    loader = ModelLoader()
+    executor.MuranoDslExecutor(loader).load({'Objects': build_model(1)})
+    model = build_model(args.applications)
+    gc.collect()
+
+    objects_before = len(gc.get_objects())
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    dsl_executor = executor.MuranoDslExecutor(loader)
+    root = dsl_executor.load({'Objects': model})
+    elapsed = time.time() - start
+    gc.collect()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    objects_after = len(gc.get_objects())
+
+    print('model objects:    {0}'.format(1 + 2 * args.applications))
+    print('load time, ms:    {0:.1f}'.format(elapsed * 1000))
+    print('peak RSS growth:  {0} KiB'.format(rss_after - rss_before))
+    print('tracked objects:  {0}'.format(objects_after - objects_before))
+    return root
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares loading of the io.murano package by consecutive engine tasks with
+the legacy package loader, which downloaded and extracted every package
+into a per-task directory, and with the persistent package cache. The
+catalog is simulated with a fixed download latency.
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.engine import package_cache  # noqa
+from muranoapi.engine import package_loader  # noqa
+from muranoapi.packages import application_package as app_pkg  # noqa
+
+META_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                        'meta', 'io.murano')
+
+
+class PackageDefinition(object):
+    id = 'io.murano-id'
+    fully_qualified_name = 'io.murano'
+    updated = '2014-01-01T00:00:00'
+
+
+class Catalog(object):
+    def __init__(self, latency):
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, 'w') as archive:
+            app_pkg._zipdir(META_DIR, archive)
+        self.archive = data.getvalue()
+        self.latency = latency
+        self.downloads = 0
+        self.packages = self
+
+    def download(self, package_id):
+        self.downloads += 1
+        time.sleep(self.latency)
+        return self.archive
+
+
+class LegacyPackageLoader(object):
+    def __init__(self, client, root):
+        self._client = client
+        self._cache_directory = os.path.join(root, str(uuid.uuid4()))
+        os.makedirs(self._cache_directory)
+
+    def get_package(self, package_def):
+        package_directory = os.path.join(self._cache_directory,
+                                         package_def.fully_qualified_name)
+        package_data = self._client.packages.download(package_def.id)
+        with tempfile.NamedTemporaryFile(delete=False) as package_file:
+            package_file.write(package_data)
+        try:
+            return app_pkg.load_from_file(
+                package_file.name, target_dir=package_directory,
+                drop_dir=False, loader=package_loader.YaqlYamlLoader)
+        finally:
+            os.remove(package_file.name)
+
+    def cleanup(self):
+        shutil.rmtree(self._cache_directory, ignore_errors=True)
+
+
+class CachedPackageLoader(package_loader.ApiPackageLoader):
+    def __init__(self, client, cache):
+        self._client_instance = client
+        super(CachedPackageLoader, self).__init__(None, None, cache)
+
+    def _get_murano_client(self, token_id, tenant_id):
+        return self._client_instance
+
+    def get_package(self, package_def):
+        return self._get_package_by_definition(package_def)
+
+
+def measure(create_loader, tasks):
+    start = time.time()
+    for _ in range(tasks):
+        loader = create_loader()
+        try:
+            loader.get_package(PackageDefinition())
+        finally:
+            loader.cleanup()
+    return (time.time() - start) / tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=50,
+                        help='package download latency, ms')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        row = '{0:<8} {1:>14} {2:>10}'
+        print(row.format('loader', 'per task, ms', 'downloads'))
+        catalog = Catalog(args.latency / 1000.0)
+        elapsed = measure(lambda: LegacyPackageLoader(catalog, root),
+                          args.tasks)
+        print(row.format('legacy', '%.1f' % (elapsed * 1000),
+                         catalog.downloads))
+
+        catalog = Catalog(args.latency / 1000.0)
+        cache = package_cache.PackageCache(os.path.join(root, 'cache'),
+                                           1 << 30)
+        elapsed = measure(lambda: CachedPackageLoader(catalog, cache),
+                          args.tasks)
+        print(row.format('cached', '%.1f' % (elapsed * 1000),
+                         catalog.downloads))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
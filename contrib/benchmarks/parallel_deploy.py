@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Simulates deployment of an environment whose applications deploy their
+instances in parallel (nested pselect()), each instance making a few
+remote calls. Compares the legacy unbounded GreenPool per construct with
+the parallel scheduler and reports wall time, peak number of concurrent
+remote calls and the number of greenthreads spawned.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import eventlet
+from eventlet import greenpool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import concurrency  # noqa
+
+
+class RemoteService(object):
+    def __init__(self, latency):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+
+    def call(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            eventlet.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+
+class LegacyScheduler(object):
+    def __init__(self):
+        self.spawned = 0
+
+    def map(self, func, items, limit=None):
+        items = list(items)
+        self.spawned += len(items)
+        pool = greenpool.GreenPool(limit or len(items) or 1)
+        return list(pool.imap(func, items))
+
+
+def deploy(scheduler, service, applications, instances, calls):
+    def deploy_instance(_):
+        for _ in xrange(calls):
+            service.call()
+
+    def deploy_application(_):
+        scheduler.map(deploy_instance, xrange(instances))
+
+    scheduler.map(deploy_application, xrange(applications))
+
+
+def measure(scheduler, args):
+    service = RemoteService(args.latency / 1000.0)
+    start = time.time()
+    deploy(scheduler, service, args.applications, args.instances, args.calls)
+    return time.time() - start, service.peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--applications', type=int, default=300)
+    parser.add_argument('--instances', type=int, default=3)
+    parser.add_argument('--calls', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=5,
+                        help='remote call latency, ms')
+    args = parser.parse_args()
+
+    row = '{0:<20} {1:>10} {2:>12} {3:>10}'
+    print(row.format('scheduler', 'time, ms', 'peak calls', 'spawned'))
+    legacy = LegacyScheduler()
+    elapsed, peak = measure(legacy, args)
+    print(row.format('unbounded', '%.1f' % (elapsed * 1000), peak,
+                     legacy.spawned))
+    for limit in (16, 64, 256):
+        scheduler = concurrency.ParallelScheduler(
+            limit, concurrency.Budget(512))
+        elapsed, peak = measure(scheduler, args)
+        print(row.format('budget %d' % limit, '%.1f' % (elapsed * 1000),
+                         peak, scheduler.stats()['spawned']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measures MuranoObject property reads and writes on linear class hierarchies.
+Each level of the hierarchy declares one property, the object is created
+for the most derived class and every property is read and written through
+it.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import class_loader  # noqa
+from muranoapi.dsl import exceptions  # noqa
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import murano_package  # noqa
+from muranoapi.dsl import yaql_expression  # noqa
+
+
+class HierarchyLoader(class_loader.MuranoClassLoader):
+    def __init__(self, levels):
+        self._classes = {'io.murano.Object': {'Name': 'io.murano.Object'}}
+        parent = 'io.murano.Object'
+        for level in range(levels):
+            name = 'Level{0}'.format(level)
+            self._classes[name] = {
+                'Name': name,
+                'Extends': parent,
+                'Properties': {
+                    'property{0}'.format(level): {
+                        'Contract': yaql_expression.YaqlExpression(
+                            '$.string()'),
+                        'Usage': 'InOut'
+                    }
+                }
+            }
+            parent = name
+        self.leaf = parent
+        super(HierarchyLoader, self).__init__()
+
+    def load_definition(self, name):
+        if name not in self._classes:
+            raise exceptions.NoClassFound(name)
+        return dict(self._classes[name])
+
+    def find_package_name(self, class_name):
+        return 'benchmark'
+
+    def load_package(self, name):
+        package = murano_package.MuranoPackage()
+        package.name = name
+        return package
+
+
+def timeit(func, names, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in xrange(count):
+            for name in names:
+                func(name)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / (count * len(names))
+
+
+def measure(levels, count, repeat):
+    loader = HierarchyLoader(levels)
+    obj = executor.MuranoDslExecutor(loader).load({'Objects': {
+        '?': {'id': 'obj', 'type': loader.leaf}}})
+    names = ['property{0}'.format(level) for level in range(levels)]
+
+    read = timeit(obj.get_property, names, count, repeat)
+    write = timeit(lambda name: obj.set_property(name, 'value'),
+                   names, count / 10, repeat)
+    return read, write
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    row = '{0:<8} {1:>12} {2:>12}'
+    print(row.format('levels', 'read, us', 'write, us'))
+    for levels in (3, 6):
+        read, write = measure(levels, args.count, args.repeat)
+        print(row.format(levels, '%.2f' % (read * 1e6),
+                         '%.2f' % (write * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares filling a list property item by item ($.values[$index]: ...) and
+a dict property key by key ($.tags[$key]: ...) with the legacy behavior,
+which validated the whole property contract again after every write, and
+with validation of the written item only.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import lhs_expression  # noqa
+from muranoapi.dsl import murano_object  # noqa
+from muranoapi.dsl import type_scheme  # noqa
+from muranoapi.dsl import yaql_expression  # noqa
+
+import object_memory  # noqa
+
+
+object_memory.CLASSES['Collector'] = {
+    'Properties': {
+        'values': object_memory._property(['$.int()'], 'Out'),
+        'tags': {
+            'Contract': {
+                yaql_expression.YaqlExpression('$.string()'):
+                yaql_expression.YaqlExpression('$.int()')
+            },
+            'Usage': 'Out'
+        }
+    }
+}
+
+
+def legacy_validate_property_item(self, key, path, value, caller_class=None):
+    return type_scheme.NoValue
+
+
+def fill(target, count, initial, key):
+    dsl_executor = executor.MuranoDslExecutor(object_memory.ModelLoader())
+    collector = dsl_executor.load({'Objects': {
+        '?': {'id': 'collector', 'type': 'Collector'},
+        initial[0]: initial[1]
+    }})
+    lhs = lhs_expression.LhsExpression(target)
+    start = time.time()
+    for index in xrange(count):
+        context = dsl_executor._create_context(
+            collector, collector.type, None, key=key(index))
+        lhs(index, context, collector.type)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=5000)
+    args = parser.parse_args()
+
+    cases = [
+        ('list', '$.values[$key]', ('values', [0] * args.count),
+         lambda index: index),
+        ('dict', '$.tags[$key]', ('tags', {}), lambda index: str(index))
+    ]
+    row = '{0:<6} {1:>12} {2:>12}'
+    print('writes: {0}'.format(args.count))
+    print(row.format('', 'legacy, ms', 'current, ms'))
+    current = murano_object.MuranoObject.validate_property_item
+    for title, target, initial, key in cases:
+        murano_object.MuranoObject.validate_property_item = \
+            legacy_validate_property_item
+        try:
+            legacy = fill(target, args.count, initial, key)
+        finally:
+            murano_object.MuranoObject.validate_property_item = current
+        timing = fill(target, args.count, initial, key)
+        print(row.format(title, '%.1f' % (legacy * 1000),
+                         '%.1f' % (timing * 1000)))
+
+
+if __name__ == '__main__':
+    main()
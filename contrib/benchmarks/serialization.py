@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares deployment result serialization with the legacy serializer (two
+trees, each built by a to_dictionary() pass and a fix-up pass) and with the
+single-pass one on the object_memory.py model. Reports wall time, number
+of to_dictionary() calls and number of dicts and lists allocated by a
+serialization: containers of the result trees and of to_dictionary()
+outputs.
+"""
+
+import argparse
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import executor  # noqa
+from muranoapi.dsl import murano_object  # noqa
+from muranoapi.dsl import results_serializer  # noqa
+
+import object_memory  # noqa
+
+
+def _legacy_serialize_tree(root_object, designer_attributes):
+    serialized_objects = set()
+    tree = _legacy_pass1(
+        root_object, None, serialized_objects, designer_attributes)
+    _legacy_pass2(tree, serialized_objects)
+    return tree, serialized_objects
+
+
+def legacy_serialize(root_object, executor):
+    tree, serialized_objects = _legacy_serialize_tree(
+        root_object, executor.object_store.designer_attributes)
+    tree_copy, _ = _legacy_serialize_tree(root_object, None)
+    attributes = executor.attribute_store.serialize(serialized_objects)
+    return {
+        'Objects': tree,
+        'ObjectsCopy': tree_copy,
+        'Attributes': attributes
+    }
+
+
+def _legacy_pass1(value, parent, serialized_objects,
+                  designer_attributes_getter):
+    if isinstance(value, (types.StringTypes, types.IntType, types.FloatType,
+                          types.BooleanType, types.NoneType)):
+        return value
+    elif isinstance(value, murano_object.MuranoObject):
+        if not results_serializer._cmp_objects(value.parent, parent) \
+                or value.object_id in serialized_objects:
+            return results_serializer.ObjRef(value)
+        else:
+            result = value.to_dictionary()
+            if designer_attributes_getter is not None:
+                result['?'].update(designer_attributes_getter(value.object_id))
+            serialized_objects.add(value.object_id)
+            return _legacy_pass1(
+                result, value, serialized_objects, designer_attributes_getter)
+    elif isinstance(value, types.DictionaryType):
+        result = {}
+        for d_key, d_value in value.iteritems():
+            result[str(d_key)] = _legacy_pass1(
+                d_value, parent, serialized_objects,
+                designer_attributes_getter)
+        return result
+    elif isinstance(value, types.ListType):
+        return [_legacy_pass1(t, parent, serialized_objects,
+                              designer_attributes_getter) for t in value]
+    elif isinstance(value, types.TupleType):
+        return _legacy_pass1(list(value), parent, serialized_objects,
+                             designer_attributes_getter)
+    else:
+        raise ValueError()
+
+
+def _legacy_pass2(value, serialized_objects):
+    if isinstance(value, types.DictionaryType):
+        for d_key, d_value in value.iteritems():
+            if isinstance(d_value, results_serializer.ObjRef):
+                if d_value.ref_obj.object_id in serialized_objects:
+                    value[d_key] = d_value.ref_obj.object_id
+                else:
+                    value[d_key] = None
+            else:
+                _legacy_pass2(d_value, serialized_objects)
+    elif isinstance(value, types.ListType):
+        index = 0
+        while index < len(value):
+            item = value[index]
+            if isinstance(item, results_serializer.ObjRef):
+                if item.ref_obj.object_id in serialized_objects:
+                    value[index] = item.ref_obj.object_id
+                else:
+                    value.pop(index)
+                    index -= 1
+            else:
+                _legacy_pass2(item, serialized_objects)
+            index += 1
+
+
+def collect_containers(value, containers):
+    if isinstance(value, (types.DictionaryType, types.ListType)):
+        if id(value) in containers:
+            return
+        containers[id(value)] = value
+        items = value.itervalues() if isinstance(
+            value, types.DictionaryType) else value
+        for item in items:
+            collect_containers(item, containers)
+
+
+def count_allocations(serialize, root, dsl_executor):
+    to_dictionary = murano_object.MuranoObject.to_dictionary
+    outputs = []
+
+    def keep_output(self, *args):
+        outputs.append(to_dictionary(self, *args))
+        return outputs[-1]
+
+    murano_object.MuranoObject.to_dictionary = keep_output
+    try:
+        result = serialize(root, dsl_executor)
+    finally:
+        murano_object.MuranoObject.to_dictionary = to_dictionary
+    containers = {}
+    collect_containers([result, outputs], containers)
+    # the two lists above are not allocated by the serializer
+    allocated = len(containers) - 2
+    return result, len(outputs), allocated
+
+
+def measure(serialize, root, dsl_executor, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        serialize(root, dsl_executor)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--applications', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    dsl_executor = executor.MuranoDslExecutor(object_memory.ModelLoader())
+    root = dsl_executor.load(
+        {'Objects': object_memory.build_model(args.applications)})
+
+    row = '{0:<8} {1:>10} {2:>15} {3:>16}'
+    print('model objects: {0}'.format(1 + 2 * args.applications))
+    print(row.format('', 'time, ms', 'to_dictionary()', 'containers'))
+    results = []
+    for title, serialize in (('legacy', legacy_serialize),
+                             ('current', results_serializer.serialize)):
+        result, calls, allocated = count_allocations(
+            serialize, root, dsl_executor)
+        elapsed = measure(serialize, root, dsl_executor, args.repeat)
+        results.append(result)
+        print(row.format(title, '%.1f' % (elapsed * 1000), calls,
+                         allocated))
+    assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
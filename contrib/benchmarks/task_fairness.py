@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Simulates an engine that receives a burst of deployments of one big tenant
+followed by one deployment of each of many small tenants. Every task spends
+some time waiting for remote services and some time on the CPU. Compares
+the legacy FIFO RPC greenthread pool with the engine task scheduler and
+reports completion latency of the big and of the small tenants.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import eventlet
+from eventlet import greenpool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.engine import task_scheduler  # noqa
+
+
+def make_task(latencies, tenant_id, args, submitted):
+    def run():
+        deadline = time.time() + args.cpu / 1000.0
+        while time.time() < deadline:
+            pass
+        eventlet.sleep(args.io / 1000.0)
+        latencies.setdefault(tenant_id, []).append(time.time() - submitted)
+    return run
+
+
+def tasks(args):
+    for _ in xrange(args.big_tasks):
+        yield 'big'
+    for index in xrange(args.small_tenants):
+        yield 'small-%d' % index
+
+
+def run_legacy(args):
+    latencies = {}
+    pool = greenpool.GreenPool(args.rpc_pool)
+    now = time.time()
+    for tenant_id in tasks(args):
+        pool.spawn_n(make_task(latencies, tenant_id, args, now))
+    pool.waitall()
+    return latencies
+
+
+def run_scheduler(args):
+    latencies = {}
+    scheduler = task_scheduler.TaskScheduler(args.max_tasks,
+                                             args.max_tasks_per_tenant)
+    now = time.time()
+    for tenant_id in tasks(args):
+        scheduler.submit(tenant_id,
+                         make_task(latencies, tenant_id, args, now))
+    scheduler.wait()
+    return latencies
+
+
+def summarize(latencies):
+    big = latencies.pop('big')
+    small = [value for values in latencies.itervalues() for value in values]
+    return (sum(small) / len(small), max(small), max(big))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--big-tasks', type=int, default=200)
+    parser.add_argument('--small-tenants', type=int, default=20)
+    parser.add_argument('--cpu', type=float, default=2,
+                        help='CPU time of a task, ms')
+    parser.add_argument('--io', type=float, default=50,
+                        help='remote call time of a task, ms')
+    parser.add_argument('--rpc-pool', type=int, default=64)
+    parser.add_argument('--max-tasks', type=int, default=16)
+    parser.add_argument('--max-tasks-per-tenant', type=int, default=4)
+    args = parser.parse_args()
+
+    row = '{0:<10} {1:>16} {2:>16} {3:>14}'
+    print(row.format('', 'small avg, ms', 'small max, ms', 'big max, ms'))
+    for title, run in (('legacy', run_legacy),
+                       ('scheduler', run_scheduler)):
+        print(row.format(title, *['%.1f' % (value * 1000)
+                                  for value in summarize(run(args))]))
+
+
+if __name__ == '__main__':
+    main()
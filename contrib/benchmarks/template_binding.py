@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares rendering of a Heat template fragment for a number of instances
+with bind() of the legacy implementation, which walked and copied the whole
+template on every call, and with compiled templates that fill in
+placeholders of an unmarshalled copy of the template.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.engine.system import yaql_functions  # noqa
+
+
+def legacy_transform_json(json, mappings):
+    if isinstance(json, types.ListType):
+        return [legacy_transform_json(t, mappings) for t in json]
+
+    if isinstance(json, types.DictionaryType):
+        result = {}
+        for key, value in json.items():
+            result[legacy_transform_json(key, mappings)] = \
+                legacy_transform_json(value, mappings)
+        return result
+
+    elif isinstance(json, types.StringTypes) and json.startswith('$'):
+        value = _legacy_convert_macro_parameter(json[1:], mappings)
+        if value is not None:
+            return value
+
+    return json
+
+
+def _legacy_convert_macro_parameter(macro, mappings):
+    replaced = [False]
+
+    def replace(match):
+        replaced[0] = True
+        return unicode(mappings.get(match.group(1)))
+
+    result = re.sub('{(\\w+?)}', replace, macro)
+    if replaced[0]:
+        return result
+    else:
+        return mappings[macro]
+
+
+def build_template(size):
+    resources = {
+        '$instanceName': {
+            'Type': 'OS::Nova::Server',
+            'Properties': {
+                'flavor': '$flavor',
+                'image': '$image',
+                'key_name': '$keyName',
+                'user_data': '$userData',
+                'networks': [{'port': {'Ref': '$instanceName-port'}}]
+            }
+        }
+    }
+    for index in range(size):
+        resources['rule%d' % index] = {
+            'Type': 'OS::Neutron::SecurityGroupRule',
+            'Properties': {
+                'direction': 'ingress',
+                'protocol': 'tcp',
+                'port_range_min': 1000 + index,
+                'port_range_max': 1000 + index,
+                'remote_ip_prefix': '0.0.0.0/0',
+                'description': 'rule %d' % index
+            }
+        }
+    return {'Resources': resources, 'Outputs': {}}
+
+
+def measure(transform, template, instances, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for index in xrange(instances):
+            transform(template, {
+                'instanceName': 'instance%d' % index,
+                'instanceName-port': 'port%d' % index,
+                'flavor': 'm1.small',
+                'image': 'ubuntu',
+                'keyName': 'key',
+                'userData': 'data'
+            })
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--instances', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    row = '{0:<16} {1:>12} {2:>12}'
+    print('instances: {0}'.format(args.instances))
+    print(row.format('template rules', 'legacy, ms', 'current, ms'))
+    for size in (0, 10, 100):
+        template = build_template(size)
+        timings = [measure(transform, template, args.instances, args.repeat)
+                   for transform in (legacy_transform_json,
+                                     yaql_functions._transform_json)]
+        print(row.format(size, '%.1f' % (timings[0] * 1000),
+                         '%.1f' % (timings[1] * 1000)))
+
+
+if __name__ == '__main__':
+    main()
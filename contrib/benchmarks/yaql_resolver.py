@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compares YAML class loading time with the legacy implicit !yaql resolver
+(regexp + yaql.parse() for every scalar, second parse in the constructor)
+and with the current one (lexical pre-filter + shared parse results).
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import types
+
+import yaml
+import yaql
+import yaql.exceptions
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir))
+
+from muranoapi.dsl import yaql_expression  # noqa
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir,
+                                    os.pardir))
+
+
+class LegacyExpression(object):
+    def __init__(self, expression):
+        self._expression = str(expression)
+        self._parsed_expression = yaql.parse(self._expression)
+
+    @staticmethod
+    def match(expr):
+        if not isinstance(expr, types.StringTypes):
+            return False
+        if re.match('^[\s\w\d.:]*$', expr):
+            return False
+        try:
+            yaql.parse(expr)
+            return True
+        except yaql.exceptions.YaqlGrammarException:
+            return False
+        except yaql.exceptions.YaqlLexicalException:
+            return False
+
+
+class LegacyLoader(yaml.Loader):
+    pass
+
+
+class CurrentLoader(yaml.Loader):
+    pass
+
+
+def _legacy_constructor(loader, node):
+    return LegacyExpression(loader.construct_scalar(node))
+
+
+def _current_constructor(loader, node):
+    return yaql_expression.YaqlExpression(loader.construct_scalar(node))
+
+
+yaml.add_constructor(u'!yaql', _legacy_constructor, LegacyLoader)
+yaml.add_implicit_resolver(u'!yaql', LegacyExpression, Loader=LegacyLoader)
+yaml.add_constructor(u'!yaql', _current_constructor, CurrentLoader)
+yaml.add_implicit_resolver(u'!yaql', yaql_expression.YaqlExpression,
+                           Loader=CurrentLoader)
+
+
+def core_library_sources():
+    classes_dir = os.path.join(ROOT, 'meta', 'io.murano', 'Classes')
+    sources = []
+    for path, _, files in os.walk(classes_dir):
+        for name in sorted(files):
+            if name.endswith('.yaml'):
+                with open(os.path.join(path, name)) as stream:
+                    sources.append(stream.read())
+    return sources
+
+
+def synthetic_class_source(lines):
+    result = [
+        'Namespaces:',
+        '  =: io.murano.benchmark',
+        '  std: io.murano',
+        'Name: Synthetic',
+        'Extends: std:Application',
+        'Properties:'
+    ]
+    index = 0
+    while len(result) < lines / 3:
+        result.extend([
+            '  property{0}:'.format(index),
+            '    Contract: $.string().notNull()',
+            '    Default: value{0}'.format(index),
+            '    Usage: InOut'
+        ])
+        index += 1
+    result.append('Workflow:')
+    index = 0
+    while len(result) < lines:
+        result.extend([
+            '  method{0}:'.format(index),
+            '    Arguments:',
+            '      - count:',
+            '          Contract: $.int().notNull()',
+            '    Body:',
+            '      - $.property{0}: format(\'{{0}}-{1}\', $.name)'.format(
+                index % 50, index),
+            '      - $template:',
+            '          Resources:',
+            '            Instance{0}:'.format(index),
+            '              Type: \'AWS::EC2::Instance\'',
+            '              Description: Plain text, with punctuation!',
+            '              Size: {0}'.format(index),
+            '      - $.environment.stack.updateTemplate($template)',
+            '      - If: $count > {0}'.format(index),
+            '        Then:',
+            '          - $.environment.stack.push()',
+        ])
+        index += 1
+    return '\n'.join(result[:lines]) + '\n'
+
+
+class ParseCounter(object):
+    def __init__(self, parse):
+        self._parse = parse
+        self.calls = 0
+
+    def __call__(self, expression):
+        self.calls += 1
+        return self._parse(expression)
+
+
+def measure(loader, sources, repeat, reset_cache):
+    best = None
+    counter = ParseCounter(yaql.parse)
+    yaql.parse = counter
+    try:
+        for _ in range(repeat):
+            if reset_cache:
+                yaql_expression.clear_cache()
+            start = time.time()
+            for source in sources:
+                yaml.load(source, loader)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        yaql.parse = counter._parse
+    return best, counter.calls / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--lines', type=int, default=5000)
+    args = parser.parse_args()
+
+    workloads = [
+        ('io.murano core library', core_library_sources()),
+        ('synthetic {0}-line class'.format(args.lines),
+         [synthetic_class_source(args.lines)])
+    ]
+    row = '{0:<28} {1:>8} {2:>10} {3:>10}'
+    print(row.format('workload', 'loader', 'time, ms', 'parses'))
+    for title, sources in workloads:
+        for name, loader, reset_cache in (
+                ('legacy', LegacyLoader, False),
+                ('cold', CurrentLoader, True),
+                ('warm', CurrentLoader, False)):
+            elapsed, parses = measure(loader, sources, args.repeat,
+                                      reset_cache)
+            print(row.format(title, name, '%.1f' % (elapsed * 1000), parses))
+    print('expressions cache: {0}'.format(yaql_expression.cache_stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -37,9 +37,8 @@ def main():
         config.parse_args()
         log.setup('muranoapi')
 
-        launcher = service.ServiceLauncher()
-        launcher.launch_service(engine.get_rpc_service())
-
+        launcher = service.launch(engine.EngineService(),
+                                  config.CONF.engine.workers)
         launcher.wait()
     except RuntimeError, e:
         sys.stderr.write("ERROR: %s\n" % e)
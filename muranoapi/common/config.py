@@ -100,6 +100,52 @@ stats_opt = [
                       'Default value is 5 minutes.'))
 ]
 
+engine_opts = [
+    cfg.IntOpt('workers', default=1,
+               help=_('Number of engine worker processes. Each of them '
+                      'consumes tasks from the shared queue and applies '
+                      'the limits below on its own.')),
+    cfg.IntOpt('max_tasks_per_worker', default=0,
+               help=_('Number of tasks after which a worker process is '
+                      'replaced by a fresh one. Only used when there are '
+                      'several workers. 0 means never.')),
+    cfg.IntOpt('max_worker_memory', default=0,
+               help=_('Resident memory (in megabytes) above which a worker '
+                      'process is replaced by a fresh one once a task '
+                      'completes. Only used when there are several workers. '
+                      '0 means no limit.')),
+    cfg.IntOpt('package_cache_size', default=1024,
+               help=_('Maximum size (in megabytes) of packages kept in the '
+                      'packages cache directory. Packages used during the '
+                      'last hour are never evicted.')),
+    cfg.IntOpt('max_model_objects', default=5000,
+               help=_('Maximum number of objects in an environment model. '
+                      'Larger models are rejected. 0 means no limit.')),
+    cfg.IntOpt('class_cache_size', default=500,
+               help=_('Maximum number of MuranoPL classes kept by the '
+                      'engine between deployments.')),
+    cfg.IntOpt('resource_cache_size', default=64,
+               help=_('Maximum size (in megabytes) of package resource '
+                      'files and their encodings kept by the engine.')),
+    cfg.IntOpt('max_parallel_per_task', default=64,
+               help=_('Maximum number of greenthreads spawned by parallel '
+                      'MuranoPL constructs (Parallel, pselect, psuper) of '
+                      'one deployment.')),
+    cfg.IntOpt('max_parallel', default=512,
+               help=_('Maximum number of greenthreads spawned by parallel '
+                      'MuranoPL constructs of all deployments in the engine '
+                      'process.')),
+    cfg.IntOpt('max_tasks', default=16,
+               help=_('Maximum number of tasks executed by the engine at '
+                      'the same time. Other received tasks are queued by '
+                      'the engine, at most rpc_thread_pool_size tasks are '
+                      'received at a time.')),
+    cfg.IntOpt('max_tasks_per_tenant', default=4,
+               help=_('Maximum number of deployments of one tenant executed '
+                      'by the engine at the same time. Environment '
+                      'deletions are not limited. 0 means no limit.'))
+]
+
 metadata_dir = cfg.StrOpt('metadata-dir', default='./meta')
 
 temp_pkg_cache = os.path.join(tempfile.gettempdir(), 'murano-packages-cache')
@@ -123,6 +169,7 @@ CONF.register_cli_opt(packages_cache)
 CONF.register_cli_opt(package_size_limit)
 CONF.register_opts(stats_opt, group='stats')
 CONF.register_opts(networking_opts, group='networking')
+CONF.register_opts(engine_opts, group='engine')
 
 CONF.import_opt('connection',
                 'muranoapi.openstack.common.db.options',
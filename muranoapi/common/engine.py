@@ -13,33 +13,123 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import signal
 import uuid
 
 import anyjson
+import eventlet.hubs
 from oslo import messaging
 from oslo.messaging import target
 
 from muranoapi.common import config
 from muranoapi.common.helpers import token_sanitizer
 from muranoapi.common import rpc
+from muranoapi.dsl import concurrency
 from muranoapi.dsl import executor
 from muranoapi.dsl import results_serializer
+from muranoapi.dsl import yaql_expression
 from muranoapi.engine import environment
+from muranoapi.engine import package_cache
 from muranoapi.engine import package_class_loader
 from muranoapi.engine import package_loader
+from muranoapi.engine.system import resource_manager
 from muranoapi.engine.system import status_reporter
 import muranoapi.engine.system.system_objects as system_objects
+from muranoapi.engine import task_scheduler
+from muranoapi.engine import worker_monitor
 from muranoapi.openstack.common.gettextutils import _  # noqa
 from muranoapi.openstack.common import log as logging
+from muranoapi.openstack.common import service
 
-RPC_SERVICE = None
+PARALLEL_BUDGET = None
+TASK_SCHEDULER = None
+WORKER_MONITOR = None
 
 LOG = logging.getLogger(__name__)
 
 
+def get_parallel_budget():
+    global PARALLEL_BUDGET
+
+    if PARALLEL_BUDGET is None:
+        PARALLEL_BUDGET = concurrency.Budget(config.CONF.engine.max_parallel)
+    return PARALLEL_BUDGET
+
+
+def get_task_scheduler():
+    global TASK_SCHEDULER
+
+    if TASK_SCHEDULER is None:
+        TASK_SCHEDULER = task_scheduler.TaskScheduler(
+            config.CONF.engine.max_tasks,
+            config.CONF.engine.max_tasks_per_tenant)
+    return TASK_SCHEDULER
+
+
+def get_worker_monitor():
+    global WORKER_MONITOR
+
+    if WORKER_MONITOR is None:
+        WORKER_MONITOR = worker_monitor.WorkerMonitor(
+            config.CONF.engine.max_tasks_per_worker,
+            config.CONF.engine.max_worker_memory << 20)
+    return WORKER_MONITOR
+
+
+def _is_delete_task(task):
+    return task['model'].get('Objects') is None
+
+
+def _count_objects(value):
+    if isinstance(value, dict):
+        result = 1 if 'id' in value.get('?', ()) else 0
+        return result + sum(_count_objects(t) for t in value.itervalues())
+    elif isinstance(value, list):
+        return sum(_count_objects(t) for t in value)
+    return 0
+
+
+def _check_model_size(model):
+    max_objects = config.CONF.engine.max_model_objects
+    if not max_objects:
+        return
+    objects = _count_objects(model.get('Objects'))
+    if objects > max_objects:
+        raise ValueError(_('Environment model has {0} objects, engine '
+                           'accepts at most {1}').format(objects,
+                                                         max_objects))
+
+
 class TaskProcessingEndpoint(object):
     @staticmethod
     def handle_task(context, task):
+        scheduler = get_task_scheduler()
+        done = scheduler.submit(
+            task['tenant_id'],
+            lambda: TaskProcessingEndpoint._process_task(task),
+            priority=_is_delete_task(task))
+        LOG.debug('Task scheduler stats: {0}'.format(scheduler.stats()))
+        # Messages are dispatched by the RPC executor pool, so waiting for
+        # the task bounds the number of tasks received by this worker and
+        # leaves the others on the broker for other workers.
+        done.wait()
+
+    @staticmethod
+    def _process_task(task):
+        monitor = get_worker_monitor()
+        memory = monitor.task_started()
+        try:
+            TaskProcessingEndpoint._execute_task(task)
+        finally:
+            monitor.task_finished(memory)
+            LOG.info(_('Task of tenant {0} completed, peak memory of the '
+                       'worker {1} MB ({2:+d} MB)').format(
+                     task['tenant_id'], memory.peak >> 20,
+                     memory.growth >> 20))
+
+    @staticmethod
+    def _execute_task(task):
         s_task = token_sanitizer.TokenSanitizer().sanitize(task)
         LOG.info(_('Starting processing task: {task_desc}').format(
             task_desc=anyjson.dumps(s_task)))
@@ -49,13 +139,17 @@ class TaskProcessingEndpoint(object):
         env.tenant_id = task['tenant_id']
         LOG.debug('Processing new task: {0}'.format(task))
         try:
+            _check_model_size(task['model'])
             with package_loader.ApiPackageLoader(env.token, env.tenant_id) as \
                     pkg_loader:
                 class_loader = package_class_loader.PackageClassLoader(
                     pkg_loader)
                 system_objects.register(class_loader, pkg_loader)
 
-                exc = executor.MuranoDslExecutor(class_loader, env)
+                scheduler = concurrency.ParallelScheduler(
+                    config.CONF.engine.max_parallel_per_task,
+                    get_parallel_budget())
+                exc = executor.MuranoDslExecutor(class_loader, env, scheduler)
                 obj = exc.load(task['model'])
 
                 try:
@@ -68,6 +162,10 @@ class TaskProcessingEndpoint(object):
                 finally:
                     s_res = results_serializer.serialize(obj, exc)
                     rpc.api().process_result(s_res)
+                    LOG.debug('Method lock stats: {0}'.format(
+                        exc.lock_manager.stats()))
+                    LOG.debug('Parallel scheduler stats: {0}'.format(
+                        scheduler.stats()))
         except Exception as e:
             # TODO(gokrokve) report error here
             # TODO(slagun) code below needs complete rewrite and redesign
@@ -76,6 +174,15 @@ class TaskProcessingEndpoint(object):
             reporter.initialize(msg_env)
             reporter.report_error(msg_env, '{0}'.format(e))
             rpc.api().process_result(task['model'])
+        finally:
+            LOG.debug('YAQL expressions cache stats: {0}'.format(
+                yaql_expression.cache_stats()))
+            LOG.debug('Class cache stats: {0}'.format(
+                package_class_loader.get_class_cache().stats()))
+            LOG.debug('Resource cache stats: {0}'.format(
+                resource_manager.get_resource_cache().stats()))
+            LOG.debug('Package cache stats: {0}'.format(
+                package_cache.get_package_cache().stats()))
 
 
 def _prepare_rpc_service(server_id):
@@ -86,12 +193,47 @@ def _prepare_rpc_service(server_id):
     return messaging.get_rpc_server(transport, s_target, endpoints, 'eventlet')
 
 
-def get_rpc_service():
-    global RPC_SERVICE
+class EngineService(service.Service):
+    """Consumes engine tasks from the shared tasks topic.
+
+    The RPC server is created when the service starts, i.e. in the worker
+    process when the engine runs several of them, so that every worker has
+    connections of its own. A task message is handled until the task is
+    completed, so a worker receives at most rpc_thread_pool_size tasks at a
+    time. Stopping the service stops consuming and then waits for all
+    received tasks to complete.
+    """
 
-    if RPC_SERVICE is None:
-        RPC_SERVICE = _prepare_rpc_service(str(uuid.uuid4()))
-    return RPC_SERVICE
+    def __init__(self):
+        super(EngineService, self).__init__()
+        self._rpc_service = None
+
+    def start(self):
+        super(EngineService, self).start()
+        if config.CONF.engine.workers > 1:
+            get_worker_monitor().set_recycle_callback(self._recycle)
+        self._rpc_service = _prepare_rpc_service(str(uuid.uuid4()))
+        self._rpc_service.start()
+
+    @staticmethod
+    def _recycle():
+        # The signal is sent from the hub so that SignalExit reaches the
+        # main greenthread, which stops the service and exits the worker.
+        # The launcher then starts a fresh one.
+        eventlet.hubs.get_hub().schedule_call_global(
+            0, os.kill, os.getpid(), signal.SIGTERM)
+
+    def stop(self):
+        if self._rpc_service is not None:
+            self._rpc_service.stop()
+            self._rpc_service.wait()
+            self._rpc_service = None
+            scheduler = get_task_scheduler()
+            LOG.info(_('Waiting for {0} running and {1} queued tasks to '
+                       'complete').format(scheduler.stats()['active'],
+                                          scheduler.stats()['queued']))
+            scheduler.wait()
+        super(EngineService, self).stop()
 
 
 class Environment:
@@ -14,11 +14,17 @@
 
 import collections
 import functools as func
+import threading
 import types
 
 import eventlet
 import jsonschema
 
+try:
+    from collections import OrderedDict  # noqa
+except ImportError:  # python2.6
+    from ordereddict import OrderedDict  # noqa
+
 from muranoapi.openstack.common.gettextutils import _  # noqa
 from muranoapi.openstack.common import log as logging
 
@@ -198,6 +204,76 @@ def is_different(obj1, obj2):
         return False
 
 
+class LruCache(object):
+    """
+    Bounded mapping with least-recently-used eviction policy.
+
+    Cache instances are meant to be shared by all (green)threads of the
+    process, so every operation is done under a lock. Lookups update
+    hit and miss counters that are reported by stats().
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self._misses += 1
+                return default
+            self._data[key] = value
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def items(self):
+        with self._lock:
+            return self._data.items()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._data),
+                'max_size': self._max_size
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
 def build_entity_map(value):
     def build_entity_map_recursive(value, id_map):
         if isinstance(value, types.DictionaryType):
@@ -25,6 +25,20 @@ import muranoapi.dsl.murano_object as murano_object
 import muranoapi.dsl.namespace_resolver as namespace_resolver
 import muranoapi.dsl.principal_objects as principal_objects
 import muranoapi.dsl.typespec as typespec
+import muranoapi.dsl.yaql_functions as yaql_functions
+
+# Function contexts shared by all class loaders of the same type
+_root_contexts = {}
+
+
+class FrozenContext(yaql.context.Context):
+    """Read-only context that is shared between DSL executors."""
+
+    def register_function(self, function, name):
+        raise RuntimeError('Shared context is read-only')
+
+    def set_data(self, data, path='$'):
+        raise RuntimeError('Shared context is read-only')
 
 
 class MuranoClassLoader(object):
@@ -74,6 +88,7 @@ class MuranoClassLoader(object):
         for property_name, property_spec in properties.iteritems():
             spec = typespec.PropertySpec(property_spec, ns_resolver)
             type_obj.add_property(property_name, spec)
+        type_obj.build_property_layout()
 
         for method_name, payload in data.get('Workflow', {}).iteritems():
             type_obj.add_method(method_name, payload)
@@ -93,6 +108,21 @@ class MuranoClassLoader(object):
     def create_root_context(self):
         return yaql.create_context(True)
 
+    def get_root_context(self):
+        """Returns the frozen function context of this class loader type.
+
+        The context is populated with the functions registered by
+        create_root_context() and the DSL functions once per process.
+        """
+        loader_type = type(self)
+        context = _root_contexts.get(loader_type)
+        if context is None:
+            context = self.create_root_context()
+            yaql_functions.register(context)
+            context = FrozenContext(parent_context=context)
+            _root_contexts[loader_type] = context
+        return context
+
     def create_local_context(self, parent_context, murano_class):
         return yaql.context.Context(parent_context=parent_context)
 
@@ -118,12 +148,17 @@ class MuranoClassLoader(object):
 
         m_class = self.get_class(name, create_missing=True)
         if inspect.isclass(cls):
+            if issubclass(m_class.object_class, cls):
+                # class object is shared with another loader (e.g. it was
+                # taken from a cache) and the import was already done
+                return
             if issubclass(cls, murano_object.MuranoObject):
                 m_class.object_class = cls
             else:
                 mpc_name = 'mpc' + helpers.generate_id()
                 bases = (cls, murano_object.MuranoObject)
-                m_class.object_class = type(mpc_name, bases, {})
+                m_class.object_class = type(mpc_name, bases,
+                                            {'__slots__': ()})
 
         for item in dir(cls):
             method = getattr(cls, item)
@@ -0,0 +1,148 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import sys
+import time
+
+import eventlet
+import six
+
+
+class Budget(object):
+    """Number of greenthreads that may be spawned.
+
+    A budget may draw from a parent budget (e.g. the budget of a task from
+    the budget of the process), in which case a greenthread needs a unit
+    of both.
+    """
+
+    def __init__(self, size=None, parent=None):
+        self._size = size
+        self._used = 0
+        self._parent = parent
+
+    @property
+    def used(self):
+        return self._used
+
+    def try_acquire(self):
+        if self._size is not None and self._used >= self._size:
+            return False
+        if self._parent is not None and not self._parent.try_acquire():
+            return False
+        self._used += 1
+        return True
+
+    def release(self):
+        self._used -= 1
+        if self._parent is not None:
+            self._parent.release()
+
+
+def _call_in_new_thread(func, item):
+    # the thread marker of the executor is reset so that a new one is
+    # assigned to the item the first time it is needed
+    current_thread = eventlet.greenthread.getcurrent()
+    thread_marker = getattr(current_thread, '_murano_dsl_thread_marker', None)
+    current_thread._murano_dsl_thread_marker = None
+    try:
+        return func(item)
+    finally:
+        current_thread._murano_dsl_thread_marker = thread_marker
+
+
+class ParallelScheduler(object):
+    """Runs items of parallel DSL constructs within a greenthread budget.
+
+    Items of a construct are queued and served by worker greenthreads that
+    are spawned as long as the budget allows. The calling greenthread
+    serves the queue too, so nested constructs make progress even when
+    the budget is exhausted. Every item runs as a DSL thread of its own
+    whichever greenthread serves it, so method locks held by the caller
+    or by other items are never reentrant for it.
+    """
+
+    def __init__(self, limit=None, process_budget=None):
+        self._budget = Budget(limit, process_budget)
+        self._queued = 0
+        self._max_queued = 0
+        self._started = 0
+        self._spawned = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def map(self, func, items, limit=None):
+        """Returns results of func for items, computed concurrently.
+
+        At most limit items are processed at the same time. The first
+        exception raised by func, in the order of items, is re-raised
+        after all items are processed.
+        """
+        queue = collections.deque(enumerate(items))
+        if not queue:
+            return []
+        results = [None] * len(queue)
+        errors = {}
+        max_workers = len(queue) if limit is None else min(limit, len(queue))
+        enqueued = time.time()
+        self._queued += len(queue)
+        self._max_queued = max(self._max_queued, self._queued)
+
+        def serve_one():
+            index, item = queue.popleft()
+            self._record_start(time.time() - enqueued)
+            try:
+                results[index] = _call_in_new_thread(func, item)
+            except Exception:
+                errors[index] = sys.exc_info()
+
+        def serve():
+            try:
+                while queue:
+                    serve_one()
+            finally:
+                self._budget.release()
+
+        workers = []
+        while queue:
+            while len(workers) + 1 < max_workers and \
+                    len(workers) + 1 < len(queue) and \
+                    self._budget.try_acquire():
+                workers.append(eventlet.spawn(serve))
+                self._spawned += 1
+            serve_one()
+        for worker in workers:
+            worker.wait()
+
+        if errors:
+            six.reraise(*errors[min(errors)])
+        return results
+
+    def _record_start(self, wait):
+        self._queued -= 1
+        self._started += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+    def stats(self):
+        return {
+            'started': self._started,
+            'spawned': self._spawned,
+            'running': self._budget.used,
+            'queued': self._queued,
+            'max_queued': self._max_queued,
+            'total_wait': self._total_wait,
+            'max_wait': self._max_wait
+        }
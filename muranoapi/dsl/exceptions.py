@@ -53,6 +53,19 @@ class AmbiguousMethodName(Exception):
             'Found more that one method %s' % name)
 
 
+class AmbiguousPropertyName(LookupError):
+    def __init__(self, name):
+        super(AmbiguousPropertyName, self).__init__(
+            'Found more than one property %s' % name)
+
+
+class DeadlockDetected(Exception):
+    def __init__(self, locks):
+        super(DeadlockDetected, self).__init__(
+            'Deadlock detected while waiting for %s' % ' -> '.join(
+                str(name) for name in locks))
+
+
 class NoWriteAccess(Exception):
     def __init__(self, name):
         super(NoWriteAccess, self).__init__(
@@ -15,36 +15,55 @@
 import collections
 import functools
 import inspect
+import itertools
 import types
-import uuid
 
 import eventlet
-import eventlet.event
 import yaql.context
 
 import muranoapi.dsl.attribute_store as attribute_store
+import muranoapi.dsl.concurrency as concurrency
 import muranoapi.dsl.exceptions as exceptions
 import muranoapi.dsl.expressions as expressions
 import muranoapi.dsl.helpers as helpers
+import muranoapi.dsl.lock_manager as lock_manager
 import muranoapi.dsl.murano_object as murano_object
 import muranoapi.dsl.object_store as object_store
-import muranoapi.dsl.yaql_functions as yaql_functions
+
+# Number of nested method calls executed on the stack of one greenthread.
+# Deeper call chains continue in a new greenthread to stay away from the
+# interpreter recursion limit.
+MAX_INLINE_DEPTH = 8
+
+_thread_markers = itertools.count()
+
+
+def _get_thread_marker():
+    current_thread = eventlet.greenthread.getcurrent()
+    marker = getattr(current_thread, '_murano_dsl_thread_marker', None)
+    if marker is None:
+        marker = current_thread._murano_dsl_thread_marker = next(
+            _thread_markers)
+    return marker
 
 
 class MuranoDslExecutor(object):
-    def __init__(self, class_loader, environment=None):
+    def __init__(self, class_loader, environment=None,
+                 parallel_scheduler=None):
         self._class_loader = class_loader
         self._object_store = object_store.ObjectStore(class_loader)
         self._attribute_store = attribute_store.AttributeStore()
-        self._root_context = class_loader.create_root_context()
+        self._root_context = yaql.context.Context(
+            parent_context=class_loader.get_root_context())
         self._root_context.set_data(self, '?executor')
         self._root_context.set_data(self._class_loader, '?classLoader')
         self._root_context.set_data(environment, '?environment')
         self._root_context.set_data(self._object_store, '?objectStore')
         self._root_context.set_data(self._attribute_store, '?attributeStore')
-        self._locks = {}
-        yaql_functions.register(self._root_context)
-        self._root_context = yaql.context.Context(self._root_context)
+        self._class_contexts = {}
+        self._lock_manager = lock_manager.LockManager()
+        self._parallel_scheduler = parallel_scheduler or \
+            concurrency.ParallelScheduler()
 
     @property
     def object_store(self):
@@ -54,6 +73,14 @@ class MuranoDslExecutor(object):
     def attribute_store(self):
         return self._attribute_store
 
+    @property
+    def lock_manager(self):
+        return self._lock_manager
+
+    @property
+    def parallel_scheduler(self):
+        return self._parallel_scheduler
+
     def to_yaql_args(self, args):
         if not args:
             return tuple()
@@ -70,19 +97,21 @@ class MuranoDslExecutor(object):
         if context is None:
             context = self._root_context
         implementations = this.type.find_method(name)
+        if not implementations:
+            raise exceptions.NoMethodFound(name)
+        try:
+            shape, values = self._evaluate_arguments(context, *args)
+        except TypeError:
+            raise exceptions.NoMethodFound(name)
+
         delegates = []
         for declaring_class, name in implementations:
             method = declaring_class.get_method(name)
             if not method:
                 continue
-            arguments_scheme = method.arguments_scheme
             try:
-                try:
-                    params = self._evaluate_parameters(
-                        arguments_scheme, context, this, *args)
-                except Exception:
-                    params = self._evaluate_parameters(
-                        arguments_scheme, context, this, *args)
+                params = self._evaluate_parameters(
+                    method, context, this, shape, values)
                 delegates.append(functools.partial(
                     self._invoke_method_implementation,
                     method, this, declaring_class, context, params))
@@ -101,37 +130,38 @@ class MuranoDslExecutor(object):
         if not body:
             return None
 
+        thread_marker = _get_thread_marker()
+        key = (id(body), this.object_id)
+        self._lock_manager.acquire(key, thread_marker, '{0}.{1}'.format(
+            murano_class.name, method.name))
+        try:
+            return self._invoke_method_body(
+                body, this, params, murano_class, context, thread_marker)
+        finally:
+            self._lock_manager.release(key, thread_marker)
+
+    def _invoke_method_body(self, body, this, params, murano_class, context,
+                            thread_marker):
         current_thread = eventlet.greenthread.getcurrent()
-        if not hasattr(current_thread, '_murano_dsl_thread_marker'):
-            thread_marker = current_thread._murano_dsl_thread_marker = \
-                uuid.uuid4().hex
-        else:
-            thread_marker = current_thread._murano_dsl_thread_marker
-
-        method_id = id(body)
-        this_id = this.object_id
-
-        event, marker = self._locks.get((method_id, this_id), (None, None))
-        if event:
-            if marker == thread_marker:
-                return self._invoke_method_implementation_gt(
-                    body, this, params, murano_class, context)
-            event.wait()
-
-        event = eventlet.event.Event()
-        self._locks[(method_id, this_id)] = (event, thread_marker)
-        gt = eventlet.spawn(self._invoke_method_implementation_gt, body,
-                            this, params, murano_class, context,
-                            thread_marker)
-        result = gt.wait()
-        del self._locks[(method_id, this_id)]
-        event.send()
-        return result
+        depth = getattr(current_thread, '_murano_dsl_depth', 0)
+        if depth >= MAX_INLINE_DEPTH:
+            # continue deep call chains on a fresh greenthread stack
+            gt = eventlet.spawn(self._invoke_method_implementation_gt, body,
+                                this, params, murano_class, context,
+                                thread_marker)
+            return gt.wait()
+
+        current_thread._murano_dsl_depth = depth + 1
+        try:
+            return self._invoke_method_implementation_gt(
+                body, this, params, murano_class, context)
+        finally:
+            current_thread._murano_dsl_depth = depth
 
     def _invoke_method_implementation_gt(self, body, this,
                                          params, murano_class, context,
                                          thread_marker=None):
-        if thread_marker:
+        if thread_marker is not None:
             current_thread = eventlet.greenthread.getcurrent()
             current_thread._murano_dsl_thread_marker = thread_marker
         if callable(body):
@@ -147,51 +177,46 @@ class MuranoDslExecutor(object):
         else:
             raise ValueError()
 
-    def _evaluate_parameters(self, arguments_scheme, context, this, *args):
-        arg_names = list(arguments_scheme.keys())
-        parameter_values = {}
-        i = 0
+    def _evaluate_arguments(self, context, *args):
+        shape = []
+        values = []
         for arg in args:
             value = helpers.evaluate(arg, context)
             if isinstance(value, types.TupleType) and len(value) == 2 and \
                     isinstance(value[0], types.StringTypes):
-                name = value[0]
+                shape.append(value[0])
                 value = value[1]
-                if name not in arguments_scheme:
-                    raise TypeError()
             else:
-                if i >= len(arg_names):
-                    raise TypeError()
-                name = arg_names[i]
-                i += 1
-
+                shape.append(None)
             if callable(value):
                 value = value()
+            values.append(value)
+        return tuple(shape), values
+
+    def _evaluate_parameters(self, method, context, this, shape, values):
+        arguments_scheme = method.arguments_scheme
+        targets, defaults = method.bind_arguments(shape)
+        parameter_values = {}
+        for name, value in itertools.izip(targets, values):
             arg_spec = arguments_scheme[name]
             parameter_values[name] = arg_spec.validate(
                 value, this, self._root_context, self._object_store)
 
-        for name, arg_spec in arguments_scheme.iteritems():
-            if name not in parameter_values:
-                if not arg_spec.has_default:
-                    raise TypeError()
-                parameter_context = self._create_context(
-                    this, this.type, context)
+        if defaults:
+            parameter_context = self._create_context(
+                this, this.type, context)
+            for name in defaults:
+                arg_spec = arguments_scheme[name]
                 parameter_values[name] = arg_spec.validate(
                     helpers.evaluate(arg_spec.default, parameter_context),
                     this, self._root_context, self._object_store)
 
         return parameter_values
 
-    def _create_context(self, this, murano_class, context, **kwargs):
-        new_context = self._class_loader.create_local_context(
-            parent_context=self._root_context,
-            murano_class=murano_class)
-        new_context.set_data(this)
-        new_context.set_data(this, 'this')
-        new_context.set_data(this, '?this')
-        new_context.set_data(murano_class, '?type')
-        new_context.set_data(context, '?callerContext')
+    def _get_class_context(self, murano_class):
+        context = self._class_contexts.get(murano_class)
+        if context is not None:
+            return context
 
         @yaql.context.EvalArg('obj', arg_type=murano_object.MuranoObject)
         @yaql.context.EvalArg('property_name', arg_type=str)
@@ -204,8 +229,22 @@ class MuranoDslExecutor(object):
             return murano_class.namespace_resolver.resolve_name(
                 '%s:%s' % (prefix, name))
 
-        new_context.register_function(obj_attribution, '#operator_.')
-        new_context.register_function(validate, '#validate')
+        context = self._class_loader.create_local_context(
+            parent_context=self._root_context,
+            murano_class=murano_class)
+        context.set_data(murano_class, '?type')
+        context.register_function(obj_attribution, '#operator_.')
+        context.register_function(validate, '#validate')
+        self._class_contexts[murano_class] = context
+        return context
+
+    def _create_context(self, this, murano_class, context, **kwargs):
+        new_context = yaql.context.Context(
+            parent_context=self._get_class_context(murano_class))
+        new_context.set_data(this)
+        new_context.set_data(this, 'this')
+        new_context.set_data(this, '?this')
+        new_context.set_data(context, '?callerContext')
         for key, value in kwargs.iteritems():
             new_context.set_data(value, key)
         return new_context
@@ -228,40 +267,141 @@ class MuranoDslExecutor(object):
         objects_copy = data.get('ObjectsCopy')
         if not objects_copy:
             return
+        deleted_ids = []
+        seen = set()
+        for object_id in self._list_objects(objects_copy):
+            if object_id not in seen and \
+                    not self._object_store.has(object_id):
+                deleted_ids.append(object_id)
+            seen.add(object_id)
+        if not deleted_ids:
+            return
+
+        # Deleted objects are loaded from the copy together with the
+        # objects they depend on, so that neither their initialize nor
+        # destroy methods change objects of the current model. Other
+        # objects are left out of the lists of the copy.
+        required_ids = _get_required_objects(objects_copy, deleted_ids)
         gc_object_store = object_store.ObjectStore(self._class_loader)
-        gc_object_store.load(objects_copy, None, self._root_context)
-        objects_to_clean = []
-        for object_id in self._list_potential_object_ids(objects_copy):
-            if gc_object_store.has(object_id) \
-                    and not self._object_store.has(object_id):
+        gc_object_store.load(_prune_objects(objects_copy, required_ids),
+                             None, self._root_context)
+
+        backup = self._object_store
+        try:
+            self._object_store = gc_object_store
+            for object_id in deleted_ids:
+                if not gc_object_store.has(object_id):
+                    continue
                 obj = gc_object_store.get(object_id)
-                objects_to_clean.append(obj)
-        if objects_to_clean:
-            backup = self._object_store
-            try:
-                self._object_store = gc_object_store
-                for obj in objects_to_clean:
-                    methods = obj.type.find_method('destroy')
-                    for cls, method in methods:
-                        try:
-                            cls.invoke(method, self, obj, {})
-                        except Exception:
-                            pass
-            finally:
-                self._object_store = backup
-
-    def _list_potential_object_ids(self, data):
+                methods = obj.type.find_method('destroy')
+                for cls, method in methods:
+                    try:
+                        cls.invoke(method, self, obj, {})
+                    except Exception:
+                        pass
+        finally:
+            self._object_store = backup
+
+    def _list_objects(self, data):
+        """Lists ids of serialized objects, owned objects first."""
         if isinstance(data, types.DictionaryType):
-            for val in data.values():
-                for res in self._list_potential_object_ids(val):
+            for val in data.itervalues():
+                for res in self._list_objects(val):
                     yield res
-            sys_dict = data.get('?')
-            if isinstance(sys_dict, types.DictionaryType) \
-                    and sys_dict.get('id') \
-                    and sys_dict.get('type'):
-                yield sys_dict['id']
+            object_id = _get_object_id(data)
+            if object_id:
+                yield object_id
         elif isinstance(data, collections.Iterable) and not isinstance(
                 data, types.StringTypes):
             for val in data:
-                for res in self._list_potential_object_ids(val):
+                for res in self._list_objects(val):
                     yield res
+
+
+def _get_object_id(data):
+    sys_dict = data.get('?')
+    if isinstance(sys_dict, types.DictionaryType) \
+            and sys_dict.get('type'):
+        return sys_dict.get('id')
+    return None
+
+
+def _index_objects(data, owner_id, index):
+    """Maps ids of serialized objects to their values and owner ids."""
+    if isinstance(data, types.DictionaryType):
+        object_id = _get_object_id(data)
+        if object_id:
+            index.setdefault(object_id, (data, owner_id))
+            owner_id = object_id
+        for val in data.itervalues():
+            _index_objects(val, owner_id, index)
+    elif isinstance(data, collections.Iterable) and not isinstance(
+            data, types.StringTypes):
+        for val in data:
+            _index_objects(val, owner_id, index)
+
+
+def _list_dependencies(data):
+    """Lists possible ids of objects required to load the object.
+
+    These are all strings of the object, which may be references, and
+    objects it owns other than as list items. Owned objects are not
+    looked into.
+    """
+    if isinstance(data, types.StringTypes):
+        yield data
+    elif isinstance(data, types.DictionaryType):
+        for val in data.itervalues():
+            if isinstance(val, types.DictionaryType):
+                object_id = _get_object_id(val)
+                if object_id:
+                    yield object_id
+                    continue
+            for res in _list_dependencies(val):
+                yield res
+    elif isinstance(data, collections.Iterable):
+        for val in data:
+            if isinstance(val, types.DictionaryType) and _get_object_id(val):
+                continue
+            for res in _list_dependencies(val):
+                yield res
+
+
+def _get_required_objects(data, object_ids):
+    """Returns ids of objects required to load the given ones.
+
+    Objects are required together with their owners, the objects they
+    refer to and the objects they own other than as list items.
+    """
+    index = {}
+    _index_objects(data, None, index)
+    result = set()
+    queue = list(object_ids)
+    while queue:
+        object_id = queue.pop()
+        if object_id in result or object_id not in index:
+            continue
+        result.add(object_id)
+        value, owner_id = index[object_id]
+        if owner_id is not None:
+            queue.append(owner_id)
+        queue.extend(_list_dependencies(value))
+    return result
+
+
+def _prune_objects(data, object_ids):
+    """Copies serialized objects leaving out list items not required."""
+    if isinstance(data, types.DictionaryType):
+        return dict((key, _prune_objects(val, object_ids))
+                    for key, val in data.iteritems())
+    elif isinstance(data, types.ListType):
+        return [_prune_objects(val, object_ids) for val in data
+                if _is_required(val, object_ids)]
+    return data
+
+
+def _is_required(data, object_ids):
+    if not isinstance(data, types.DictionaryType):
+        return True
+    object_id = _get_object_id(data)
+    return not object_id or object_id in object_ids
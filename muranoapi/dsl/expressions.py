@@ -12,17 +12,27 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import inspect
+import itertools
 import types
 
 import muranoapi.dsl.helpers as helpers
 import muranoapi.dsl.lhs_expression as lhs_expression
 import muranoapi.dsl.yaql_expression as yaql_expression
 
-_macros = []
+# Maps each set of keywords a macro may be written with to macro classes
+_macros = {}
 
 
 def register_macro(cls):
-    _macros.append(cls)
+    argspec = inspect.getargspec(cls.__init__)
+    optional_count = len(argspec.defaults or ())
+    required = argspec.args[1:len(argspec.args) - optional_count]
+    optional = argspec.args[len(argspec.args) - optional_count:]
+    for count in xrange(len(optional) + 1):
+        for keywords in itertools.combinations(optional, count):
+            _macros.setdefault(frozenset(required).union(keywords),
+                               []).append(cls)
 
 
 class DslExpression(object):
@@ -45,6 +55,7 @@ class Statement(DslExpression):
 
         self._destination = lhs_expression.LhsExpression(key) if key else None
         self._expression = value
+        self._plan = helpers.EvaluationPlan(value)
 
     @property
     def destination(self):
@@ -55,7 +66,7 @@ class Statement(DslExpression):
         return self._expression
 
     def execute(self, context, murano_class):
-        result = helpers.evaluate(self.expression, context)
+        result = self._plan(context)
         if self.destination:
             self.destination(result, context, murano_class)
 
@@ -77,7 +88,7 @@ def parse_expression(expr):
                 kwds[key] = value
 
         if result is None:
-            for cls in _macros:
+            for cls in _macros.get(frozenset(kwds), []):
                 try:
                     return cls(**kwds)
                 except TypeError:
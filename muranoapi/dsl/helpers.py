@@ -13,12 +13,12 @@
 #    under the License.
 
 import collections
+import marshal
 import re
 import sys
 import types
 import uuid
 
-import eventlet.greenpool
 import yaql.expressions
 
 from muranoapi.common import utils
@@ -92,6 +92,98 @@ def needs_evaluation(value):
     return False
 
 
+class EvaluationPlan(object):
+    """Evaluates a data tree the same way evaluate() does.
+
+    Plan is computed once for a value parsed from a class definition.
+    Expression-free subtrees are restored from a marshalled copy instead of
+    being rebuilt element by element, and only paths leading to
+    expressions are visited.
+    """
+
+    __slots__ = ('constant', '_evaluate')
+
+    def __init__(self, value):
+        self.constant = not needs_evaluation(value)
+        self._evaluate = _compile_plan(value)
+
+    def __call__(self, context):
+        return self._evaluate(context)
+
+
+_SCALAR_TYPES = frozenset([types.NoneType, types.BooleanType, types.IntType,
+                           types.LongType, types.FloatType,
+                           types.StringType, types.UnicodeType])
+
+
+_CONTAINER_TYPES = frozenset([types.DictionaryType, types.ListType,
+                              types.TupleType])
+
+
+def _is_plain(value):
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return True
+    elif value_type not in _CONTAINER_TYPES:
+        # marshal does not support subclasses of the built-in types
+        return False
+    elif isinstance(value, types.DictionaryType):
+        for key, item in value.iteritems():
+            if not _is_plain(key) or not _is_plain(item):
+                return False
+        return True
+    for item in value:
+        if not _is_plain(item):
+            return False
+    return True
+
+
+def _compile_plan(value):
+    if isinstance(value, (yaql_expression.YaqlExpression,
+                          yaql.expressions.Expression)):
+        return lambda context: evaluate(value.evaluate(context), context, 1)
+    elif not needs_evaluation(value):
+        return _compile_constant(value)
+    elif isinstance(value, types.DictionaryType):
+        return _compile_dict_plan(value)
+    elif isinstance(value, types.ListType):
+        plans = map(_compile_plan, value)
+        return lambda context: [plan(context) for plan in plans]
+    elif isinstance(value, types.TupleType):
+        plans = map(_compile_plan, value)
+        return lambda context: tuple([plan(context) for plan in plans])
+    else:
+        return lambda context: evaluate(value, context)
+
+
+def _compile_constant(value):
+    if type(value) in _SCALAR_TYPES:
+        return lambda context: value
+    elif _is_plain(value):
+        data = marshal.dumps(value)
+        return lambda context: marshal.loads(data)
+    else:
+        return lambda context: evaluate(value, context)
+
+
+def _compile_dict_plan(value):
+    constant_part = {}
+    plans = []
+    for key, item in value.iteritems():
+        if needs_evaluation(key) or needs_evaluation(item):
+            plans.append((_compile_plan(key), _compile_plan(item)))
+        else:
+            constant_part[key] = item
+    constant_plan = _compile_constant(constant_part)
+
+    def evaluate_dict(context):
+        result = constant_plan(context)
+        for key_plan, item_plan in plans:
+            result[key_plan(context)] = item_plan(context)
+        return result
+    return evaluate_dict
+
+
 def merge_lists(list1, list2):
     result = []
     for item in list1 + list2:
@@ -134,9 +226,9 @@ def generate_id():
     return uuid.uuid4().hex
 
 
-def parallel_select(collection, func):
-    gpool = eventlet.greenpool.GreenPool()
-    return list(gpool.imap(func, collection))
+def parallel_select(collection, func, context, limit=None):
+    return get_executor(context).parallel_scheduler.map(
+        func, collection, limit)
 
 
 def to_python_codestyle(name):
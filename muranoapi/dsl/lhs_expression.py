@@ -14,7 +14,6 @@
 
 import types
 
-import yaql
 import yaql.context
 import yaql.expressions
 
@@ -23,6 +22,114 @@ import muranoapi.dsl.type_scheme as type_scheme
 import muranoapi.dsl.yaql_expression as yaql_expression
 
 
+class _Assignment(object):
+    """State of a single assignment.
+
+    Keeps the last object property that was read on the way to the target
+    and the path from it to the target so that changes of dicts and lists
+    stored in the property can be validated against the property contract.
+    """
+
+    def __init__(self, murano_class):
+        self.murano_class = murano_class
+        self.current_obj = None
+        self.current_obj_name = None
+        self.current_path = []
+
+    def get_value(self, src, key):
+        if isinstance(src, types.DictionaryType):
+            self.current_path.append(key)
+            return src.get(key)
+        elif isinstance(src, types.ListType) and isinstance(
+                key, types.IntType):
+            self.current_path.append(key)
+            return src[key]
+        elif isinstance(src, murano_object.MuranoObject) and isinstance(
+                key, types.StringTypes):
+            self.current_obj = src
+            self.current_obj_name = key
+            self.current_path = []
+            return src.get_property(key, self.murano_class)
+        else:
+            raise TypeError()
+
+    def set_value(self, src, key, value):
+        if isinstance(src, types.DictionaryType):
+            old_value = src.get(key, type_scheme.NoValue)
+            src[key] = value
+            if self.current_obj is not None:
+                try:
+                    self._revalidate(src, key, value)
+                except Exception as e:
+                    if old_value is not type_scheme.NoValue:
+                        src[key] = old_value
+                    else:
+                        src.pop(key, None)
+                    raise e
+        elif isinstance(src, types.ListType) and isinstance(
+                key, types.IntType):
+            old_value = src[key]
+            src[key] = value
+            if self.current_obj is not None:
+                try:
+                    self._revalidate(src, key, value)
+                except Exception as e:
+                    src[key] = old_value
+                    raise e
+
+        elif isinstance(src, murano_object.MuranoObject) and isinstance(
+                key, types.StringTypes):
+            src.set_property(key, value, self.murano_class)
+        else:
+            raise TypeError()
+
+    def _revalidate(self, src, key, value):
+        value = self.current_obj.validate_property_item(
+            self.current_obj_name, self.current_path + [key], value,
+            self.murano_class)
+        if value is not type_scheme.NoValue:
+            src[key] = value
+            return
+        p_value = self.current_obj.get_property(
+            self.current_obj_name, self.murano_class)
+        self.current_obj.set_property(
+            self.current_obj_name, p_value, self.murano_class)
+
+
+def _set_context_data(context, path, value):
+    if not path or path == '$' or path == '$this':
+        raise ValueError()
+    context.set_data(value, path)
+
+
+def _compile(expression):
+    """Returns context path and keys of an assignment target.
+
+    Targets such as $.foo.bar or $var[$index].foo are reduced to the name
+    of the context variable and the chain of keys applied to it. Dynamic
+    indexes are kept as expressions to be evaluated in the method context.
+    None is returned for targets that have to be evaluated by YAQL.
+    """
+    keys = []
+    while isinstance(expression, (yaql.expressions.Att,
+                                  yaql.expressions.Filter)):
+        if len(expression.args) != 1:
+            return None
+        key = expression.args[0]
+        if isinstance(key, yaql.expressions.Constant):
+            keys.append(key.value)
+        elif isinstance(expression, yaql.expressions.Filter):
+            keys.append(key)
+        else:
+            return None
+        expression = expression.object
+    if not isinstance(expression, yaql.expressions.GetContextValue) or \
+            not isinstance(expression.path, yaql.expressions.Constant):
+        return None
+    keys.reverse()
+    return expression.path.value, tuple(keys)
+
+
 class LhsExpression(object):
     class Property(object):
         def __init__(self, getter, setter):
@@ -40,69 +147,18 @@ class LhsExpression(object):
                                    yaql.expressions.Expression)):
             self._expression = expression
         else:
-            self._expression = yaql.parse(str(expression))
-        self._current_obj = None
-        self._current_obj_name = None
-
-    def _create_context(self, root_context, murano_class):
-        def _get_value(src, key):
-            if isinstance(src, types.DictionaryType):
-                return src.get(key)
-            elif isinstance(src, types.ListType) and isinstance(
-                    key, types.IntType):
-                return src[key]
-            elif isinstance(src, murano_object.MuranoObject) and isinstance(
-                    key, types.StringTypes):
-                self._current_obj = src
-                self._current_obj_name = key
-                return src.get_property(key, murano_class)
-            else:
-                raise TypeError()
-
-        def _set_value(src, key, value):
-            if isinstance(src, types.DictionaryType):
-                old_value = src.get(key, type_scheme.NoValue)
-                src[key] = value
-                if self._current_obj is not None:
-                    try:
-                        p_value = self._current_obj.get_property(
-                            self._current_obj_name, murano_class)
-                        self._current_obj.set_property(
-                            self._current_obj_name, p_value, murano_class)
-                    except Exception as e:
-                        if old_value is not type_scheme.NoValue:
-                            src[key] = old_value
-                        else:
-                            src.pop(key, None)
-                        raise e
-            elif isinstance(src, types.ListType) and isinstance(
-                    key, types.IntType):
-                old_value = src[key]
-                src[key] = value
-                if self._current_obj is not None:
-                    try:
-                        p_value = self._current_obj.get_property(
-                            self._current_obj_name, murano_class)
-                        self._current_obj.set_property(
-                            self._current_obj_name, p_value, murano_class)
-                    except Exception as e:
-                        src[key] = old_value
-                        raise e
-
-            elif isinstance(src, murano_object.MuranoObject) and isinstance(
-                    key, types.StringTypes):
-                self._current_spec = src.type.find_property(key)
-                src.set_property(key, value, murano_class)
-            else:
-                raise TypeError()
+            self._expression = yaql_expression.parse(expression)
+        if isinstance(self._expression, yaql_expression.YaqlExpression):
+            self._target = _compile(self._expression.parsed_expression)
+        else:
+            self._target = _compile(self._expression)
 
+    def _create_context(self, root_context, assignment):
         def get_context_data(path):
             path = path()
 
             def set_data(value):
-                if not path or path == '$' or path == '$this':
-                    raise ValueError()
-                root_context.set_data(value, path)
+                _set_context_data(root_context, path, value)
 
             return LhsExpression.Property(
                 lambda: root_context.get_data(path), set_data)
@@ -111,14 +167,16 @@ class LhsExpression(object):
         def attribution(this, arg_name):
             arg_name = arg_name()
             return LhsExpression.Property(
-                lambda: _get_value(this.get(), arg_name),
-                lambda value: _set_value(this.get(), arg_name, value))
+                lambda: assignment.get_value(this.get(), arg_name),
+                lambda value: assignment.set_value(
+                    this.get(), arg_name, value))
 
         @yaql.context.EvalArg("this", LhsExpression.Property)
         def indexation(this, index):
             return LhsExpression.Property(
-                lambda: _get_value(this.get(), index()),
-                lambda value: _set_value(this.get(), index(), value))
+                lambda: assignment.get_value(this.get(), index()),
+                lambda value: assignment.set_value(
+                    this.get(), index(), value))
 
         context = yaql.context.Context()
         context.register_function(get_context_data, '#get_context_data')
@@ -127,9 +185,23 @@ class LhsExpression(object):
         return context
 
     def __call__(self, value, context, murano_class):
-        new_context = self._create_context(context, murano_class)
-        new_context.set_data(context.get_data('$'))
-        self._current_obj = None
-        self._current_obj_name = None
-        property = self._expression.evaluate(context=new_context)
-        property.set(value)
+        assignment = _Assignment(murano_class)
+        if self._target is None:
+            new_context = self._create_context(context, assignment)
+            new_context.set_data(context.get_data('$'))
+            property = self._expression.evaluate(context=new_context)
+            property.set(value)
+            return
+
+        path, keys = self._target
+        if not keys:
+            _set_context_data(context, path, value)
+            return
+        src = context.get_data(path)
+        for index, key in enumerate(keys):
+            if isinstance(key, yaql.expressions.Expression):
+                key = key.evaluate(context=context)
+            if index == len(keys) - 1:
+                assignment.set_value(src, key, value)
+            else:
+                src = assignment.get_value(src, key)
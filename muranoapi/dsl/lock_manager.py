@@ -0,0 +1,149 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import time
+
+import eventlet.event
+
+import muranoapi.dsl.exceptions as exceptions
+
+# Upper bounds (in seconds) of the wait time histogram buckets
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1, 10, 60)
+
+
+class _Lock(object):
+    __slots__ = ('name', 'owner', 'count', 'waiters')
+
+    def __init__(self, name, owner):
+        self.name = name
+        self.owner = owner
+        self.count = 1
+        self.waiters = collections.deque()
+
+
+class LockStats(object):
+    """Acquisition and wait time statistics of one lock name."""
+
+    def __init__(self):
+        self.acquired = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.histogram = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def record(self, wait):
+        self.acquired += 1
+        if wait is None:
+            return
+        self.contended += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        for index, bound in enumerate(WAIT_BUCKETS):
+            if wait <= bound:
+                break
+        else:
+            index = len(WAIT_BUCKETS)
+        self.histogram[index] += 1
+
+    def to_dictionary(self):
+        bounds = ['<={0}s'.format(bound) for bound in WAIT_BUCKETS]
+        bounds.append('>{0}s'.format(WAIT_BUCKETS[-1]))
+        return {
+            'acquired': self.acquired,
+            'contended': self.contended,
+            'total_wait': self.total_wait,
+            'max_wait': self.max_wait,
+            'histogram': dict(zip(bounds, self.histogram))
+        }
+
+
+class LockManager(object):
+    """Reentrant FIFO locks owned by DSL threads of execution.
+
+    Locks are identified by arbitrary hashable keys and owned by thread
+    markers. A lock is handed over to the longest waiting owner when
+    released. Waits that would close a cycle in the wait-for graph raise
+    DeadlockDetected instead of blocking forever. Wait times are collected
+    per lock name so that contended methods can be found in the logs.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._waiting = {}
+        self._stats = collections.defaultdict(LockStats)
+
+    def acquire(self, key, owner, name=None):
+        lock = self._locks.get(key)
+        if lock is None:
+            self._locks[key] = _Lock(name, owner)
+            self._stats[name].record(None)
+            return
+        if lock.owner == owner:
+            lock.count += 1
+            return
+
+        self._check_deadlock(lock, owner)
+        event = eventlet.event.Event()
+        lock.waiters.append((owner, event))
+        self._waiting[owner] = key
+        start = time.time()
+        try:
+            event.wait()
+        except BaseException:
+            # the waiting thread was killed: give the lock up
+            if lock.owner == owner:
+                self.release(key, owner)
+            else:
+                lock.waiters.remove((owner, event))
+            raise
+        finally:
+            self._waiting.pop(owner, None)
+        self._stats[name].record(time.time() - start)
+
+    def release(self, key, owner):
+        lock = self._locks.get(key)
+        if lock is None or lock.owner != owner:
+            raise RuntimeError('Lock is not owned by the caller')
+        lock.count -= 1
+        if lock.count:
+            return
+        if lock.waiters:
+            lock.owner, event = lock.waiters.popleft()
+            lock.count = 1
+            # the new owner is not waiting any more even though it has not
+            # been resumed yet
+            del self._waiting[lock.owner]
+            event.send()
+        else:
+            del self._locks[key]
+
+    def is_locked(self, key):
+        return key in self._locks
+
+    def _check_deadlock(self, lock, owner):
+        cycle = [lock.name]
+        while lock is not None:
+            if lock.owner == owner:
+                raise exceptions.DeadlockDetected(cycle)
+            key = self._waiting.get(lock.owner)
+            lock = None if key is None else self._locks.get(key)
+            if lock is not None:
+                cycle.append(lock.name)
+
+    def stats(self):
+        # locks that were never waited for do not serialize anything
+        return dict((name, stats.to_dictionary())
+                    for name, stats in self._stats.iteritems()
+                    if stats.contended)
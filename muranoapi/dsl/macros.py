@@ -14,7 +14,6 @@
 
 import types
 
-import eventlet.greenpool as greenpool
 import yaql.context
 
 import muranoapi.dsl.exceptions as exceptions
@@ -54,11 +53,10 @@ class MethodBlock(CodeBlock):
 
 class ReturnMacro(expressions.DslExpression):
     def __init__(self, Return):
-        self._value = Return
+        self._value = helpers.EvaluationPlan(Return)
 
     def execute(self, context, murano_class):
-        raise exceptions.ReturnException(
-            helpers.evaluate(self._value, context))
+        raise exceptions.ReturnException(self._value(context))
 
 
 class BreakMacro(expressions.DslExpression):
@@ -81,10 +79,10 @@ class ParallelMacro(CodeBlock):
     def execute(self, context, murano_class):
         if not self.code_block:
             return
-        gpool = greenpool.GreenPool(helpers.evaluate(self._limit, context))
-        for expr in self.code_block:
-            gpool.spawn_n(expr.execute, context, murano_class)
-        gpool.waitall()
+        helpers.parallel_select(
+            self.code_block,
+            lambda expr: expr.execute(context, murano_class),
+            context, helpers.evaluate(self._limit, context))
 
 
 class IfMacro(expressions.DslExpression):
@@ -132,10 +130,10 @@ class ForMacro(expressions.DslExpression):
             raise TypeError()
         self._code = CodeBlock(Do, breakable=True)
         self._var = For
-        self._collection = In
+        self._collection = helpers.EvaluationPlan(In)
 
     def execute(self, context, murano_class):
-        collection = helpers.evaluate(self._collection, context)
+        collection = self._collection(context)
         child_context = yaql.context.Context(context)
         for t in collection:
             child_context.set_data(t, self._var)
@@ -149,11 +147,11 @@ class RepeatMacro(expressions.DslExpression):
     def __init__(self, Repeat, Do):
         if not isinstance(Repeat, (int, yaql_expression.YaqlExpression)):
             raise SyntaxError()
-        self._count = Repeat
+        self._count = helpers.EvaluationPlan(Repeat)
         self._code = CodeBlock(Do, breakable=True)
 
     def execute(self, context, murano_class):
-        count = helpers.evaluate(self._count, context)
+        count = self._count(context)
         for t in range(0, count):
             try:
                 self._code.execute(context, murano_class)
@@ -165,17 +163,21 @@ class MatchMacro(expressions.DslExpression):
     def __init__(self, Match, Value, Default=None):
         if not isinstance(Match, types.DictionaryType):
             raise SyntaxError()
-        self._switch = Match
-        self._value = Value
+        self._switch = dict((key, CodeBlock(value))
+                            for key, value in Match.iteritems())
+        self._value = helpers.EvaluationPlan(Value)
         self._default = None if Default is None else CodeBlock(Default)
 
     def execute(self, context, murano_class):
-        match_value = helpers.evaluate(self._value, context)
-        for key, value in self._switch.iteritems():
-            if key == match_value:
-                CodeBlock(value).execute(context, murano_class)
-                return
-        if self._default is not None:
+        match_value = self._value(context)
+        try:
+            code = self._switch.get(match_value)
+        except TypeError:
+            # unhashable values cannot be equal to any of the keys
+            code = None
+        if code is not None:
+            code.execute(context, murano_class)
+        elif self._default is not None:
             self._default.execute(context, murano_class)
 
 
@@ -183,12 +185,13 @@ class SwitchMacro(expressions.DslExpression):
     def __init__(self, Switch, Default=None):
         if not isinstance(Switch, types.DictionaryType):
             raise SyntaxError()
-        self._switch = Switch
+        self._switch = [(key, CodeBlock(value))
+                        for key, value in Switch.iteritems()]
         self._default = None if Default is None else CodeBlock(Default)
 
     def execute(self, context, murano_class):
         matched = False
-        for key, value in self._switch.iteritems():
+        for key, code in self._switch:
             if not isinstance(key, (yaql_expression.YaqlExpression,
                                     types.BooleanType)):
                 raise SyntaxError()
@@ -198,7 +201,7 @@ class SwitchMacro(expressions.DslExpression):
             if res:
                 matched = True
                 child_context = yaql.context.Context(context)
-                CodeBlock(value).execute(child_context, murano_class)
+                code.execute(child_context, murano_class)
 
         if self._default is not None and not matched:
             self._default.execute(context, murano_class)
@@ -20,6 +20,13 @@ import muranoapi.dsl.murano_method as murano_method
 import muranoapi.dsl.murano_object as murano_object
 import muranoapi.dsl.typespec as typespec
 
+# Incremented each time a method is added to a class that already has
+# descendants, so that their method resolution tables get rebuilt
+_methods_generation = 0
+
+# Same as above for properties and property layouts
+_properties_generation = 0
+
 
 def classname(name):
     def wrapper(cls):
@@ -32,22 +39,29 @@ class MuranoClass(object):
     def __init__(self, class_loader, namespace_resolver, name, package,
                  parents=None):
         self._package = package
-        self._class_loader = class_loader
         self._methods = {}
         self._namespace_resolver = namespace_resolver
         self._name = namespace_resolver.resolve_name(name)
         self._properties = {}
+        self._method_resolution = {}
+        self._method_resolution_generation = _methods_generation
+        self._property_layout = None
+        self._property_layout_generation = _properties_generation
+        self._object_layout = None
+        self._has_descendants = False
         if self._name == 'io.murano.Object':
             self._parents = []
         else:
             self._parents = parents or [
                 class_loader.get_class('io.murano.Object')]
+        for parent in self._parents:
+            parent._has_descendants = True
 
         class_name = 'mc' + helpers.generate_id()
         parents_class = [p.object_class for p in self._parents]
         bases = tuple(parents_class) or (murano_object.MuranoObject,)
 
-        self.object_class = type(class_name, bases, {})
+        self.object_class = type(class_name, bases, {'__slots__': ()})
 
     @property
     def name(self):
@@ -73,9 +87,14 @@ class MuranoClass(object):
         return self._methods.get(name)
 
     def add_method(self, name, payload):
+        global _methods_generation
+
         method = murano_method.MuranoMethod(self._namespace_resolver,
                                             self, name, payload)
         self._methods[name] = method
+        self._method_resolution = {}
+        if self._has_descendants:
+            _methods_generation += 1
         return method
 
     @property
@@ -83,22 +102,70 @@ class MuranoClass(object):
         return self._properties.keys()
 
     def add_property(self, name, property_typespec):
+        global _properties_generation
+
         if not isinstance(property_typespec, typespec.PropertySpec):
             raise TypeError('property_typespec')
         self._properties[name] = property_typespec
+        self._property_layout = None
+        if self._has_descendants:
+            _properties_generation += 1
+
+    @property
+    def property_layout(self):
+        """Maps property names to names of the classes declaring them.
+
+        Properties declared by more than one class of the hierarchy (not
+        shadowed by the class itself) are mapped to None.
+        """
+        if self._property_layout is None or \
+                self._property_layout_generation != _properties_generation:
+            self.build_property_layout()
+        return self._property_layout
+
+    def build_property_layout(self):
+        layout = {}
+        for parent in self._parents:
+            for name, owner in parent.property_layout.iteritems():
+                if layout.get(name, owner) != owner:
+                    owner = None
+                layout[name] = owner
+        for name in self._properties:
+            layout[name] = self._name
+        self._property_layout = layout
+        self._property_layout_generation = _properties_generation
+        self._object_layout = None
+        return layout
+
+    @property
+    def object_layout(self):
+        # refreshing a stale property layout resets the object layout
+        if self.property_layout is not None and self._object_layout is None:
+            self._object_layout = murano_object.ObjectLayout(self)
+        return self._object_layout
 
     def get_property(self, name):
         return self._properties[name]
 
     def find_method(self, name):
-        #resolved_name = self._namespace_resolver.resolve_name(name, self.name)
+        if self._method_resolution_generation != _methods_generation:
+            self._method_resolution = {}
+            self._method_resolution_generation = _methods_generation
+        result = self._method_resolution.get(name)
+        if result is None:
+            result = self._method_resolution[name] = \
+                self._resolve_method(name)
+        return result
+
+    def _resolve_method(self, name):
         if name in self._methods:
-            return [(self, name)]
-        if not self._parents:
-            return []
-        return list(set(reduce(
-            lambda x, y: x + y,
-            [p.find_method(name) for p in self._parents])))
+            return ((self, name),)
+        result = []
+        for parent in self._parents:
+            for implementation in parent.find_method(name):
+                if implementation not in result:
+                    result.append(implementation)
+        return tuple(result)
 
     def find_property(self, name):
         types = collections.deque([self])
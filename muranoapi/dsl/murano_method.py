@@ -30,6 +30,7 @@ class MuranoMethod(object):
                  murano_class, name, payload):
         self._name = name
         self._namespace_resolver = namespace_resolver
+        self._bindings = {}
 
         if callable(payload):
             self._body = payload
@@ -68,6 +69,45 @@ class MuranoMethod(object):
     def body(self):
         return self._body
 
+    def bind_arguments(self, shape):
+        """Maps call arguments to the method arguments.
+
+        shape is a tuple with an argument name for each keyword argument
+        of the call and None for each positional one. Returns a tuple of
+        argument names the call values are assigned to and a tuple of
+        names that need to be initialized from default values. Raises
+        TypeError if the call cannot be bound to the method.
+        """
+        binding = self._bindings.get(shape)
+        if binding is None:
+            binding = self._bindings[shape] = self._bind_arguments(shape)
+        if binding is False:
+            raise TypeError()
+        return binding
+
+    def _bind_arguments(self, shape):
+        arg_names = list(self._arguments_scheme.keys())
+        targets = []
+        i = 0
+        for name in shape:
+            if name is not None:
+                if name not in self._arguments_scheme:
+                    return False
+            else:
+                if i >= len(arg_names):
+                    return False
+                name = arg_names[i]
+                i += 1
+            targets.append(name)
+
+        defaults = []
+        for name, arg_spec in self._arguments_scheme.iteritems():
+            if name not in targets:
+                if not arg_spec.has_default:
+                    return False
+                defaults.append(name)
+        return tuple(targets), tuple(defaults)
+
     def _generate_arguments_scheme(self, func):
         func_info = inspect.getargspec(func)
         data = [(name, {'Contract': yaql_expression.YaqlExpression('$')})
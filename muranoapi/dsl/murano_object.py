@@ -23,47 +23,120 @@ import muranoapi.dsl.type_scheme as type_scheme
 import muranoapi.dsl.typespec as typespec
 
 
+# Marks slots of properties that were not set yet
+_NO_VALUE = object()
+
+_CONTAINER_TYPES = (types.DictionaryType, types.ListType, types.TupleType)
+
+
+class ObjectLayout(object):
+    """Storage layout of objects of a class.
+
+    Values of properties declared by the class and all of its ancestors are
+    kept in a single list. The layout maps property names, as they are seen
+    from the class or from any of its ancestors, to positions in this list.
+    """
+
+    def __init__(self, murano_class):
+        self.hierarchy = _get_hierarchy(murano_class)
+        self.slots = {}
+        for cls in reversed(self.hierarchy):
+            for name in cls.properties:
+                spec = cls.get_property(name)
+                self.slots[(cls.name, name)] = (
+                    len(self.slots), cls, spec,
+                    muranoapi.dsl.helpers.EvaluationPlan(spec.default))
+        self.size = len(self.slots)
+        # each class initializes properties with constant defaults first
+        # as other defaults may depend on them
+        self.initialization_plan = []
+        for cls in self.hierarchy:
+            entries = [(name, self.slots[(cls.name, name)])
+                       for name in cls.properties]
+            self.initialization_plan.extend(
+                t for t in entries if t[1][3].constant)
+            self.initialization_plan.extend(
+                t for t in entries if not t[1][3].constant)
+        self._offsets = {}
+        self.offsets = self.get_offsets(murano_class)
+
+    def get_offsets(self, murano_class):
+        offsets = self._offsets.get(murano_class.name)
+        if offsets is None:
+            offsets = {}
+            for name, owner in murano_class.property_layout.iteritems():
+                offsets[name] = None if owner is None \
+                    else self.slots[(owner, name)]
+            self._offsets[murano_class.name] = offsets
+        return offsets
+
+
+def _get_hierarchy(murano_class):
+    # each class goes before all of its ancestors
+    result = []
+
+    def visit(cls):
+        if cls not in result:
+            for parent in cls.parents:
+                visit(parent)
+            result.append(cls)
+    visit(murano_class)
+    result.reverse()
+    return result
+
+
+def _has_references(value):
+    if isinstance(value, type_scheme.TypeScheme.ObjRef):
+        return True
+    elif isinstance(value, (types.ListType, types.TupleType)):
+        return any(_has_references(t) for t in value)
+    elif isinstance(value, types.DictionaryType):
+        return any(_has_references(t) for t in value.itervalues())
+    return False
+
+
 class MuranoObject(object):
-    def __init__(self, murano_class, parent_obj, object_store, context,
-                 object_id=None, known_classes=None, defaults=None):
+    # Objects of all ancestor classes share the same storage: casting an
+    # object to one of its ancestors creates a view with the same values
+    # and a different type
+    __slots__ = ('__type', '__object_id', '__parent_obj', '__object_store',
+                 '__context', '__defaults', '__values', '__offsets',
+                 '__internals', '__root', '__views')
 
-        if known_classes is None:
-            known_classes = {}
-        self.__parent_obj = parent_obj
-        self.__object_id = object_id or muranoapi.dsl.helpers.generate_id()
+    def __init__(self, murano_class, parent_obj, object_store, context,
+                 object_id=None, defaults=None):
+        layout = murano_class.object_layout
         self.__type = murano_class
-        self.__properties = {}
+        self.__object_id = object_id or muranoapi.dsl.helpers.generate_id()
+        self.__parent_obj = parent_obj
         self.__object_store = object_store
-        self.__parents = {}
         self.__context = context
         self.__defaults = defaults or {}
-        known_classes[murano_class.name] = self
-        for parent_class in murano_class.parents:
-            name = parent_class.name
-            if name not in known_classes:
-                obj = parent_class.new(parent_obj, object_store, context,
-                                       None, object_id=self.__object_id,
-                                       known_classes=known_classes,
-                                       defaults=defaults)
-
-                self.__parents[name] = known_classes[name] = obj
-            else:
-                self.__parents[name] = known_classes[name]
+        self.__values = [_NO_VALUE] * layout.size
+        self.__offsets = layout.offsets
+        self.__internals = None
+        self.__root = None
+        self.__views = None
 
     def initialize(self, **kwargs):
-        used_names = set()
-        for i in xrange(2):
-            for property_name in self.__type.properties:
-                spec = self.__type.get_property(property_name)
-                needs_evaluation = muranoapi.dsl.helpers.needs_evaluation
-                if i == 0 and needs_evaluation(spec.default) or i == 1\
-                        and property_name in used_names:
-                    continue
-                used_names.add(property_name)
-                property_value = kwargs.get(property_name, type_scheme.NoValue)
-                self.set_property(property_name, property_value)
-        for parent in self.__parents.values():
-            parent.initialize(**kwargs)
+        for property_name, entry in self.__initialization_plan:
+            self.__set_slot(entry, property_name, kwargs.get(
+                property_name, type_scheme.NoValue))
+
+    def resolve_references(self, **kwargs):
+        """Validates again properties that hold unresolved references."""
+        for property_name, entry in self.__initialization_plan:
+            if _has_references(self.__values[entry[0]]):
+                self.__set_slot(entry, property_name, kwargs.get(
+                    property_name, type_scheme.NoValue))
+
+    @property
+    def __initialization_plan(self):
+        plan = self.__root_object.__type.object_layout.initialization_plan
+        if self.__root is not None:
+            hierarchy = self.__type.object_layout.hierarchy
+            plan = [t for t in plan if t[1][1] in hierarchy]
+        return plan
 
     @property
     def object_id(self):
@@ -77,6 +150,10 @@ class MuranoObject(object):
     def parent(self):
         return self.__parent_obj
 
+    @property
+    def __root_object(self):
+        return self.__root or self
+
     def __getattr__(self, item):
         if item.startswith('__'):
             raise AttributeError('Access to internal attributes is '
@@ -84,99 +161,146 @@ class MuranoObject(object):
         return self.get_property(item)
 
     def get_property(self, item, caller_class=None):
-        try:
-            return self.__get_property(item, caller_class)
-        except AttributeError:
-            if not caller_class:
-                raise AttributeError(item)
-            try:
-                obj = self.cast(caller_class)
-                return obj.__properties[item]
-            except KeyError:
-                raise AttributeError(item)
-            except TypeError:
-                raise AttributeError(item)
-
-    def __get_property(self, item, caller_class=None):
-        if item in self.__properties:
-            return self.__properties[item]
-        i = 0
-        result = None
-        for parent in self.__parents.values():
-            try:
-                result = parent.__get_property(item, caller_class)
-                i += 1
-                if i > 1:
-                    raise LookupError()
-            except AttributeError:
-                continue
-        if not i:
-            raise AttributeError()
-        return result
+        entry = self.__offsets.get(item, _NO_VALUE)
+        if entry is _NO_VALUE:
+            return self.__get_internal_property(item)
+        if entry is None:
+            raise exceptions.AmbiguousPropertyName(item)
+        value = self.__values[entry[0]]
+        if value is _NO_VALUE:
+            raise AttributeError(item)
+        return value
+
+    def __get_internal_property(self, item):
+        internals = self.__root_object.__internals
+        hierarchy = self.__type.object_layout.hierarchy
+        if internals is not None:
+            for murano_class in hierarchy:
+                key = (murano_class.name, item)
+                if key in internals:
+                    return internals[key]
+        raise AttributeError(item)
 
     def set_property(self, key, value, caller_class=None):
-        try:
-            self.__set_property(key, value, caller_class)
-        except AttributeError as e:
-            if not caller_class:
-                raise e
-            try:
-                obj = self.cast(caller_class)
-                obj.__properties[key] = value
-            except TypeError:
-                raise AttributeError(key)
-
-    def __set_property(self, key, value, caller_class=None):
-        if key in self.__type.properties:
-            spec = self.__type.get_property(key)
-            if caller_class is not None \
-                    and (spec.usage not in typespec.PropertyUsages.Writable
-                         or not caller_class.is_compatible(self)):
-                raise exceptions.NoWriteAccess(key)
-
-            default = self.__defaults.get(key, spec.default)
-            child_context = yaql.context.Context(parent_context=self.__context)
-            child_context.set_data(self)
-            default = muranoapi.dsl.helpers.evaluate(default, child_context, 1)
-
-            self.__properties[key] = spec.validate(
-                value, self, self.__context, self.__object_store, default)
+        entry = self.__offsets.get(key, _NO_VALUE)
+        if entry is _NO_VALUE:
+            self.__set_internal_property(key, value, caller_class)
+        elif entry is None:
+            raise exceptions.AmbiguousPropertyName(key)
         else:
-            for parent in self.__parents.values():
-                try:
-                    parent.__set_property(key, value, caller_class)
-                    return
-                except AttributeError:
-                    continue
+            self.__set_slot(entry, key, value, caller_class)
+
+    def __set_internal_property(self, key, value, caller_class):
+        if caller_class is None or \
+                caller_class not in self.__type.object_layout.hierarchy:
             raise AttributeError(key)
+        root = self.__root_object
+        if root.__internals is None:
+            root.__internals = {}
+        root.__internals[(caller_class.name, key)] = value
+
+    def validate_property_item(self, key, path, value, caller_class=None):
+        """Validates value written at path inside a container property.
+
+        Returns NoValue if the whole property has to be set again.
+        """
+        entry = self.__offsets.get(key)
+        if entry is None:
+            return type_scheme.NoValue
+        self.__check_write_access(entry, key, caller_class)
+        return entry[2].validate_item(
+            path, value, self.__root_object, self.__context,
+            self.__object_store, self.__get_default(entry, key, value))
+
+    def __check_write_access(self, entry, key, caller_class):
+        offset, owner, spec, default_plan = entry
+        if caller_class is not None \
+                and (spec.usage not in typespec.PropertyUsages.Writable
+                     or not caller_class.is_compatible(owner)):
+            raise exceptions.NoWriteAccess(key)
+
+    def __get_default(self, entry, key, value):
+        default_plan = entry[3]
+        if value is not type_scheme.NoValue \
+                and not isinstance(value, _CONTAINER_TYPES):
+            # default is only used in place of a missing value or as
+            # defaults of objects loaded from a container
+            return None
+        elif key in self.__defaults:
+            default = self.__defaults[key]
+            child_context = None
+            if muranoapi.dsl.helpers.needs_evaluation(default):
+                child_context = yaql.context.Context(
+                    parent_context=self.__context)
+                child_context.set_data(self.__root_object)
+            return muranoapi.dsl.helpers.evaluate(default, child_context, 1)
+        elif default_plan.constant:
+            return default_plan(None)
+        else:
+            child_context = yaql.context.Context(
+                parent_context=self.__context)
+            child_context.set_data(self.__root_object)
+            return default_plan(child_context)
+
+    def __set_slot(self, entry, key, value, caller_class=None):
+        self.__check_write_access(entry, key, caller_class)
+        self.__values[entry[0]] = entry[2].validate(
+            value, self.__root_object, self.__context, self.__object_store,
+            self.__get_default(entry, key, value))
 
     def cast(self, type):
-        if self.type == type:
+        if self.__type is type:
             return self
-        for parent in self.__parents.values():
-            try:
-                return parent.cast(type)
-            except TypeError:
-                continue
-        raise TypeError('Cannot cast')
+        if type not in self.__type.object_layout.hierarchy:
+            raise TypeError('Cannot cast')
+        root = self.__root_object
+        if root.__type is type:
+            return root
+        if root.__views is None:
+            root.__views = {}
+        view = root.__views.get(type.name)
+        if view is None:
+            view = root.__views[type.name] = root.__create_view(type)
+        return view
+
+    def __create_view(self, murano_class):
+        view = object.__new__(murano_class.object_class)
+        view.__type = murano_class
+        view.__object_id = self.__object_id
+        view.__parent_obj = self.__parent_obj
+        view.__object_store = self.__object_store
+        view.__context = self.__context
+        view.__defaults = self.__defaults
+        view.__values = self.__values
+        view.__offsets = self.__type.object_layout.get_offsets(murano_class)
+        view.__internals = None
+        view.__root = self
+        view.__views = None
+        return view
 
     def __repr__(self):
         return yaml.safe_dump(muranoapi.dsl.helpers.serialize(self))
 
     def to_dictionary(self, include_hidden=False):
         result = {}
-        for parent in self.__parents.values():
-            result.update(parent.to_dictionary(include_hidden))
-        result.update({'?': {'type': self.type.name, 'id': self.object_id}})
-        if include_hidden:
-            result.update(self.__properties)
-        else:
-            for property_name in self.type.properties:
-                if property_name in self.__properties:
-                    spec = self.type.get_property(property_name)
-                    if spec.usage != typespec.PropertyUsages.Runtime:
-                        result[property_name] = \
-                            self.__properties[property_name]
+        root = self.__root_object
+        slots = root.__type.object_layout.slots
+        internals = root.__internals or {}
+        for murano_class in reversed(self.__type.object_layout.hierarchy):
+            for property_name in murano_class.properties:
+                offset, _, spec, _ = slots[(murano_class.name,
+                                            property_name)]
+                value = self.__values[offset]
+                if value is _NO_VALUE:
+                    continue
+                if include_hidden or \
+                        spec.usage != typespec.PropertyUsages.Runtime:
+                    result[property_name] = value
+            if include_hidden:
+                for (class_name, key), value in internals.iteritems():
+                    if class_name == murano_class.name:
+                        result[key] = value
+        result['?'] = {'type': self.type.name, 'id': self.object_id}
         return result
 
     def __merge_default(self, src, defaults):
@@ -16,6 +16,21 @@ import inspect
 
 import muranoapi.dsl.helpers as helpers
 
+try:
+    from collections import OrderedDict  # noqa
+except ImportError:  # python2.6
+    from ordereddict import OrderedDict  # noqa
+
+_arguments_cache = {}
+
+
+def _get_arguments(method):
+    func = method.im_func
+    arguments = _arguments_cache.get(func)
+    if arguments is None:
+        arguments = _arguments_cache[func] = inspect.getargspec(func).args
+    return arguments
+
 
 class ObjectStore(object):
     def __init__(self, class_loader, parent_store=None):
@@ -24,6 +39,9 @@ class ObjectStore(object):
         self._store = {}
         self._designer_attributes_store = {}
         self._initializing = False
+        # objects of the model being loaded with their serialized values
+        self._model_objects = None
+        self._unresolved_objects = None
 
     @property
     def initializing(self):
@@ -47,10 +65,48 @@ class ObjectStore(object):
         self._store[murano_object.object_id] = murano_object
 
     def load(self, value, parent, context, defaults=None):
-        #tmp_store = ObjectStore(self._class_loader, self)
-
+        """Loads object from its serialized form.
+
+        Object without a parent is the root of the model being loaded.
+        Such models are loaded in two phases: first all
+        objects are created and their properties are validated, with
+        references to objects that were not created yet left as ObjRef.
+        Then properties holding such references are validated again and
+        initialize methods run, owned objects first.
+        """
         if value is None:
             return None
+        if parent is None and self._model_objects is None:
+            return self._load_model(value, parent, context, defaults)
+        return self._load_object(value, parent, context, defaults)
+
+    def mark_unresolved(self, murano_object):
+        """Marks object that holds references to objects not loaded yet."""
+        self._unresolved_objects.add(murano_object.object_id)
+
+    def _load_model(self, value, parent, context, defaults):
+        self._model_objects = OrderedDict()
+        self._unresolved_objects = set()
+        try:
+            self._initializing = True
+            try:
+                result = self._load_object(value, parent, context, defaults)
+            finally:
+                self._initializing = False
+            for object_id, (obj, kwargs) in self._model_objects.iteritems():
+                if object_id in self._unresolved_objects:
+                    obj.resolve_references(**kwargs)
+        finally:
+            model_objects = self._model_objects
+            self._model_objects = None
+            self._unresolved_objects = None
+
+        executor = helpers.get_executor(context)
+        for obj, _ in model_objects.itervalues():
+            self._call_initializers(obj, executor)
+        return result
+
+    def _load_object(self, value, parent, context, defaults):
         if '?' not in value or 'type' not in value['?']:
             raise ValueError()
         system_key = value['?']
@@ -61,6 +117,10 @@ class ObjectStore(object):
             raise ValueError()
         if object_id in self._store:
             obj = self._store[object_id]
+            # every object of a model is initialized only once
+            if self._model_objects is not None \
+                    and object_id in self._model_objects:
+                return obj
         else:
             obj = class_obj.new(parent, self, context=context,
                                 object_id=object_id, defaults=defaults)
@@ -68,30 +128,25 @@ class ObjectStore(object):
             self._designer_attributes_store[object_id] = \
                 ObjectStore._get_designer_attributes(system_key)
 
-        argspec = inspect.getargspec(obj.initialize).args
+        argspec = _get_arguments(obj.initialize)
         if '_context' in argspec:
             value['_context'] = context
         if '_parent' in argspec:
             value['_parent'] = parent
 
-        try:
-            if parent is None:
-                self._initializing = True
-            obj.initialize(**value)
-            if parent is None:
-                self._initializing = False
-                obj.initialize(**value)
-        finally:
-            if parent is None:
-                self._initializing = False
-
-        if not self.initializing:
-            executor = helpers.get_executor(context)
-            methods = obj.type.find_method('initialize')
-            for cls, method in methods:
-                cls.invoke(method, executor, obj, {})
+        obj.initialize(**value)
+        if self._model_objects is not None:
+            self._model_objects[object_id] = (obj, value)
+        else:
+            self._call_initializers(obj, helpers.get_executor(context))
         return obj
 
+    @staticmethod
+    def _call_initializers(obj, executor):
+        methods = obj.type.find_method('initialize')
+        for cls, method in methods:
+            cls.invoke(method, executor, obj, {})
+
     @staticmethod
     def _get_designer_attributes(header):
         return dict((k, v) for k, v in header.iteritems()
@@ -18,6 +18,8 @@ import muranoapi.dsl.murano_class as murano_class
 
 @murano_class.classname('io.murano.Object')
 class SysObject(object):
+    __slots__ = ()
+
     def setAttr(self, _context, name, value, owner=None):
         if owner is None:
             owner = helpers.get_type(helpers.get_caller_context(_context))
@@ -23,11 +23,19 @@ class ObjRef(object):
 
 
 def _serialize_tree(root_object, designer_attributes):
+    """Serializes object graph into two trees in a single pass.
+
+    The first tree has designer attributes in the object headers, the
+    second one does not. Containers are never shared between the trees
+    while scalar values are.
+    """
     serialized_objects = set()
-    tree = _pass1_serialize(
-        root_object, None, serialized_objects, designer_attributes)
-    _pass2_serialize(tree, serialized_objects)
-    return tree, serialized_objects
+    references = []
+    tree, tree_copy = _serialize(
+        root_object, None, serialized_objects, designer_attributes,
+        references)
+    _resolve_references(references, serialized_objects)
+    return tree, tree_copy, serialized_objects
 
 
 def serialize(root_object, executor):
@@ -36,9 +44,8 @@ def serialize(root_object, executor):
         tree_copy = None
         attributes = []
     else:
-        tree, serialized_objects = _serialize_tree(
+        tree, tree_copy, serialized_objects = _serialize_tree(
             root_object, executor.object_store.designer_attributes)
-        tree_copy, _ = _serialize_tree(root_object, None)
         attributes = executor.attribute_store.serialize(serialized_objects)
 
     return {
@@ -56,62 +63,72 @@ def _cmp_objects(obj1, obj2):
     return obj1.object_id == obj2.object_id
 
 
-def _pass1_serialize(value, parent, serialized_objects,
-                     designer_attributes_getter):
+def _serialize(value, parent, serialized_objects, designer_attributes_getter,
+               references):
     if isinstance(value, (types.StringTypes, types.IntType, types.FloatType,
                           types.BooleanType, types.NoneType)):
-        return value
+        return value, value
     elif isinstance(value, murano_object.MuranoObject):
         if not _cmp_objects(value.parent, parent) \
                 or value.object_id in serialized_objects:
-            return ObjRef(value)
-        else:
-            result = value.to_dictionary()
-            if designer_attributes_getter is not None:
-                result['?'].update(designer_attributes_getter(value.object_id))
-            serialized_objects.add(value.object_id)
-            return _pass1_serialize(
-                result, value, serialized_objects, designer_attributes_getter)
-
+            ref = ObjRef(value)
+            return ref, ref
+        serialized_objects.add(value.object_id)
+        result, result_copy = _serialize(
+            value.to_dictionary(), value, serialized_objects,
+            designer_attributes_getter, references)
+        if designer_attributes_getter is not None:
+            attributes, _ = _serialize(
+                designer_attributes_getter(value.object_id), value,
+                serialized_objects, None, references)
+            result['?'].update(attributes)
+        return result, result_copy
     elif isinstance(value, types.DictionaryType):
         result = {}
+        result_copy = {}
         for d_key, d_value in value.iteritems():
             result_key = str(d_key)
-            result[result_key] = _pass1_serialize(
+            item, item_copy = _serialize(
                 d_value, parent, serialized_objects,
-                designer_attributes_getter)
-        return result
-    elif isinstance(value, types.ListType):
-        return [_pass1_serialize(t, parent, serialized_objects,
-                                 designer_attributes_getter) for t in value]
-    elif isinstance(value, types.TupleType):
-        return _pass1_serialize(
-            list(value), parent, serialized_objects,
-            designer_attributes_getter)
+                designer_attributes_getter, references)
+            result[result_key] = item
+            result_copy[result_key] = item_copy
+            if isinstance(item, ObjRef):
+                references.append((result, result_key))
+                references.append((result_copy, result_key))
+        return result, result_copy
+    elif isinstance(value, (types.ListType, types.TupleType)):
+        result = []
+        result_copy = []
+        has_references = False
+        for t in value:
+            item, item_copy = _serialize(
+                t, parent, serialized_objects, designer_attributes_getter,
+                references)
+            result.append(item)
+            result_copy.append(item_copy)
+            has_references = has_references or isinstance(item, ObjRef)
+        if has_references:
+            references.append((result, None))
+            references.append((result_copy, None))
+        return result, result_copy
     else:
         raise ValueError()
 
 
-def _pass2_serialize(value, serialized_objects):
-    if isinstance(value, types.DictionaryType):
-        for d_key, d_value in value.iteritems():
-            if isinstance(d_value, ObjRef):
-                if d_value.ref_obj.object_id in serialized_objects:
-                    value[d_key] = d_value.ref_obj.object_id
-                else:
-                    value[d_key] = None
-            else:
-                _pass2_serialize(d_value, serialized_objects)
-    elif isinstance(value, types.ListType):
-        index = 0
-        while index < len(value):
-            item = value[index]
-            if isinstance(item, ObjRef):
-                if item.ref_obj.object_id in serialized_objects:
-                    value[index] = item.ref_obj.object_id
-                else:
-                    value.pop(index)
-                    index -= 1
-            else:
-                _pass2_serialize(item, serialized_objects)
-            index += 1
+def _resolve_references(references, serialized_objects):
+    """Replaces ObjRef placeholders with object ids.
+
+    References to objects that did not get into the tree become None in
+    dictionaries and are dropped from lists.
+    """
+    for container, key in references:
+        if key is not None:
+            obj_id = container[key].ref_obj.object_id
+            container[key] = obj_id if obj_id in serialized_objects else None
+        else:
+            container[:] = [
+                item.ref_obj.object_id if isinstance(item, ObjRef) else item
+                for item in container
+                if not isinstance(item, ObjRef)
+                or item.ref_obj.object_id in serialized_objects]
@@ -12,11 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import sys
 import types
 import uuid
 
 import yaql.context
+import yaql.exceptions
+import yaql.expressions
 
 import muranoapi.dsl.helpers
 import muranoapi.dsl.murano_object
@@ -33,49 +36,26 @@ class TypeScheme(object):
 
     def __init__(self, spec):
         self._spec = spec
+        self._validator = None
+        self._namespace_resolver = None
 
     @staticmethod
     def prepare_context(root_context, this, object_store,
                         namespace_resolver, default):
+        env = _Environment(root_context, this, object_store,
+                           namespace_resolver, default)
+
         def _int(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            try:
-                return int(value)
-            except Exception:
-                raise TypeError()
+            return _validate_int(value(), env)
 
         def _string(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            try:
-                return unicode(value)
-            except Exception:
-                raise TypeError()
+            return _validate_string(value(), env)
 
         def _bool(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            return True if value else False
+            return _validate_bool(value(), env)
 
         def _not_null(value):
-            value = value()
-
-            if isinstance(value, TypeScheme.ObjRef):
-                return value
-
-            if value is None:
-                raise TypeError()
-            return value
+            return _validate_not_null(value(), env)
 
         def _error():
             raise TypeError()
@@ -87,37 +67,13 @@ class TypeScheme(object):
             else:
                 raise TypeError(value)
 
-        @yaql.context.EvalArg('obj', arg_type=(
-            muranoapi.dsl.murano_object.MuranoObject,
-            TypeScheme.ObjRef,
-            types.NoneType
-        ))
+        @yaql.context.EvalArg('obj', arg_type=_object_types())
         def _owned(obj):
-            if isinstance(obj, TypeScheme.ObjRef):
-                return obj
-
-            if obj is None:
-                return None
-            elif obj.parent is this:
-                return obj
-            else:
-                raise TypeError()
+            return _validate_owned(obj, env)
 
-        @yaql.context.EvalArg('obj', arg_type=(
-            muranoapi.dsl.murano_object.MuranoObject,
-            TypeScheme.ObjRef,
-            types.NoneType
-        ))
+        @yaql.context.EvalArg('obj', arg_type=_object_types())
         def _not_owned(obj):
-            if isinstance(obj, TypeScheme.ObjRef):
-                return obj
-
-            if obj is None:
-                return None
-            elif obj.parent is this:
-                raise TypeError()
-            else:
-                return obj
+            return _validate_not_owned(obj, env)
 
         @yaql.context.EvalArg('name', arg_type=str)
         def _class(value, name):
@@ -131,37 +87,7 @@ class TypeScheme(object):
                 default_name = name
             else:
                 default_name = namespace_resolver.resolve_name(default_name)
-            value = value()
-            if value is NoValue:
-                value = default
-                if isinstance(default, types.DictionaryType):
-                    value = {'?': {
-                        'id': uuid.uuid4().hex,
-                        'type': default_name
-                    }}
-            class_loader = muranoapi.dsl.helpers.get_class_loader(root_context)
-            murano_class = class_loader.get_class(name)
-            if not murano_class:
-                raise TypeError()
-            if value is None:
-                return None
-            if isinstance(value, muranoapi.dsl.murano_object.MuranoObject):
-                obj = value
-            elif isinstance(value, types.DictionaryType):
-                obj = object_store.load(value, this, root_context,
-                                        defaults=default)
-            elif isinstance(value, types.StringTypes):
-                obj = object_store.get(value)
-                if obj is None:
-                    if not object_store.initializing:
-                        raise TypeError('Object %s not found' % value)
-                    else:
-                        return TypeScheme.ObjRef(value)
-            else:
-                raise TypeError()
-            if not murano_class.is_compatible(obj):
-                raise TypeError()
-            return obj
+            return _validate_class(value(), env, name, default_name)
 
         @yaql.context.EvalArg('prefix', str)
         @yaql.context.EvalArg('name', str)
@@ -183,96 +109,407 @@ class TypeScheme(object):
         context.register_function(_not_owned, 'notOwned')
         return context
 
-    def _map_dict(self, data, spec, context):
+    def __call__(self, data, context, this, object_store,
+                 namespace_resolver, default):
+        # TODO(ativelkov, slagun): temporary fix, need a better way of handling
+        # composite defaults
+        # A bug (#1313694) has been filed
+
+        if data is NoValue:
+            data = default
+
+        result = self._get_validator(namespace_resolver)(
+            data, _Environment(context, this, object_store,
+                               namespace_resolver, default))
+        if result is NoValue:
+            raise TypeError('No type specified')
+        return result
+
+    def validate_item(self, path, data, context, this, object_store,
+                      namespace_resolver, default):
+        """Validates data written at path inside a valid value.
+
+        Returns NoValue if the contract cannot validate the item on its
+        own and the whole value has to be validated again.
+        """
+        env = _Environment(context, this, object_store,
+                           namespace_resolver, default)
+        validator = self._get_validator(namespace_resolver)
+        for key in path:
+            get_item_validator = getattr(validator, 'item_validator', None)
+            if get_item_validator is None:
+                return NoValue
+            validator = get_item_validator(key, env)
+            if validator is None:
+                return NoValue
+        result = validator(data, env)
+        if result is NoValue:
+            raise TypeError('No type specified')
+        return result
+
+    def _get_validator(self, namespace_resolver):
+        if self._namespace_resolver is not namespace_resolver:
+            self._validator = _compile(self._spec, namespace_resolver)
+            self._namespace_resolver = namespace_resolver
+        return self._validator
+
+
+def _object_types():
+    return (muranoapi.dsl.murano_object.MuranoObject,
+            TypeScheme.ObjRef, types.NoneType)
+
+
+class _Environment(object):
+    """Arguments of a single contract validation."""
+
+    __slots__ = ('root_context', 'this', 'object_store',
+                 'namespace_resolver', 'default', '_context')
+
+    def __init__(self, root_context, this, object_store,
+                 namespace_resolver, default):
+        self.root_context = root_context
+        self.this = this
+        self.object_store = object_store
+        self.namespace_resolver = namespace_resolver
+        self.default = default
+        self._context = None
+
+    @property
+    def context(self):
+        # yaql context is only needed for contracts that were not compiled
+        if self._context is None:
+            self._context = TypeScheme.prepare_context(
+                self.root_context, self.this, self.object_store,
+                self.namespace_resolver, self.default)
+        return self._context
+
+
+def _validate_int(value, env):
+    if value is NoValue:
+        value = env.default
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except Exception:
+        raise TypeError()
+
+
+def _validate_string(value, env):
+    if value is NoValue:
+        value = env.default
+    if value is None:
+        return None
+    try:
+        return unicode(value)
+    except Exception:
+        raise TypeError()
+
+
+def _validate_bool(value, env):
+    if value is NoValue:
+        value = env.default
+    if value is None:
+        return None
+    return True if value else False
+
+
+def _validate_not_null(value, env):
+    if isinstance(value, TypeScheme.ObjRef):
+        return value
+
+    if value is None:
+        raise TypeError()
+    return value
+
+
+def _validate_owned(obj, env):
+    if isinstance(obj, TypeScheme.ObjRef):
+        return obj
+
+    if obj is None:
+        return None
+    elif obj.parent is env.this:
+        return obj
+    else:
+        raise TypeError()
+
+
+def _validate_not_owned(obj, env):
+    if isinstance(obj, TypeScheme.ObjRef):
+        return obj
+
+    if obj is None:
+        return None
+    elif obj.parent is env.this:
+        raise TypeError()
+    else:
+        return obj
+
+
+def _validate_class(value, env, name, default_name):
+    if value is NoValue:
+        value = env.default
+        if isinstance(env.default, types.DictionaryType):
+            value = {'?': {
+                'id': uuid.uuid4().hex,
+                'type': default_name
+            }}
+    class_loader = muranoapi.dsl.helpers.get_class_loader(env.root_context)
+    murano_class = class_loader.get_class(name)
+    if not murano_class:
+        raise TypeError()
+    if value is None:
+        return None
+    if isinstance(value, muranoapi.dsl.murano_object.MuranoObject):
+        obj = value
+    elif isinstance(value, types.DictionaryType):
+        obj = env.object_store.load(value, env.this, env.root_context,
+                                    defaults=env.default)
+    elif isinstance(value, types.StringTypes):
+        obj = env.object_store.get(value)
+        if obj is None:
+            if not env.object_store.initializing:
+                raise TypeError('Object %s not found' % value)
+            else:
+                env.object_store.mark_unresolved(env.this)
+                return TypeScheme.ObjRef(value)
+    else:
+        raise TypeError()
+    if not murano_class.is_compatible(obj):
+        raise TypeError()
+    return obj
+
+
+def _compile(spec, namespace_resolver):
+    """Compiles contract into a function of (data, environment).
+
+    Contract expressions that are chains of type functions applied to $
+    (e.g. $.string().notNull()) are turned into Python calls. Other
+    expressions are evaluated by yaql.
+    """
+    if isinstance(spec, yaql_expression.YaqlExpression):
+        return _compile_expression(spec, namespace_resolver)
+    elif isinstance(spec, types.DictionaryType):
+        return _compile_dict(spec, namespace_resolver)
+    elif isinstance(spec, types.ListType):
+        return _compile_list(spec, namespace_resolver)
+    elif isinstance(spec, (types.IntType,
+                           types.StringTypes,
+                           types.NoneType)):
+        return functools.partial(_map_scalar, spec)
+    else:
+        return lambda data, env: None
+
+
+def _map_scalar(spec, data, env):
+    if data != spec:
+        raise TypeError()
+    else:
+        return data
+
+
+def _compile_dict(spec, namespace_resolver):
+    if not spec:
+        return _map_empty_dict
+    items = []
+    yaql_key = None
+    for key, value in spec.iteritems():
+        if isinstance(key, yaql_expression.YaqlExpression):
+            if yaql_key is not None:
+                raise SyntaxError()
+            yaql_key = key
+        else:
+            items.append((key, _compile(value, namespace_resolver)))
+    if yaql_key is None:
+        key_validator = value_validator = None
+    else:
+        key_validator = _compile(yaql_key, namespace_resolver)
+        value_validator = _compile(spec[yaql_key], namespace_resolver)
+
+    def validate(data, env):
         if data is None or data is NoValue:
             data = {}
         if not isinstance(data, types.DictionaryType):
             raise TypeError()
-        if not spec:
-            return data
         result = {}
-        yaql_key = None
-        for key, value in spec.iteritems():
-            if isinstance(key, yaql_expression.YaqlExpression):
-                if yaql_key is not None:
-                    raise SyntaxError()
-                else:
-                    yaql_key = key
-            else:
-                result[key] = self._map(data.get(key), value, context)
-
-        if yaql_key is not None:
-            yaql_value = spec[yaql_key]
+        for key, validator in items:
+            result[key] = validator(data.get(key), env)
+        if key_validator is not None:
             for key, value in data.iteritems():
                 if key in result:
                     continue
-                result[self._map(key, yaql_key, context)] = \
-                    self._map(value, yaql_value, context)
-
+                result[key_validator(key, env)] = value_validator(value, env)
         return result
 
-    def _map_list(self, data, spec, context):
+    item_validators = dict(items)
+
+    def item_validator(key, env):
+        if key in item_validators:
+            return item_validators[key]
+        # keys that the contract drops or converts need the full check
+        if key_validator is not None and key_validator(key, env) == key:
+            return value_validator
+        return None
+
+    validate.item_validator = item_validator
+    return validate
+
+
+def _map_empty_dict(data, env):
+    if data is None or data is NoValue:
+        data = {}
+    if not isinstance(data, types.DictionaryType):
+        raise TypeError()
+    return data
+
+
+def _map_any(data, env):
+    return data
+
+
+_map_empty_dict.item_validator = lambda key, env: _map_any
+
+
+def _compile_list(spec, namespace_resolver):
+    shift = 0
+    max_length = sys.maxint
+    min_length = 0
+    if spec and isinstance(spec[-1], types.IntType):
+        min_length = spec[-1]
+        shift += 1
+    if len(spec) >= 2 and isinstance(spec[-2], types.IntType):
+        max_length = min_length
+        min_length = spec[-2]
+        shift += 1
+    validators = [_compile(item, namespace_resolver)
+                  for item in spec[:len(spec) - shift]]
+
+    def validate(data, env):
         if not isinstance(data, types.ListType):
             if data is None or data is NoValue:
                 data = []
             else:
                 data = [data]
-        if len(spec) < 1:
+        if not spec:
             return data
-        result = []
-        shift = 0
-        max_length = sys.maxint
-        min_length = 0
-        if isinstance(spec[-1], types.IntType):
-            min_length = spec[-1]
-            shift += 1
-        if len(spec) >= 2 and isinstance(spec[-2], types.IntType):
-            max_length = min_length
-            min_length = spec[-2]
-            shift += 1
-
         if not min_length <= len(data) <= max_length:
             raise TypeError()
 
+        result = []
         for index, item in enumerate(data):
-            spec_item = spec[-1 - shift] \
-                if index >= len(spec) - shift else spec[index]
-            result.append(self._map(item, spec_item, context))
+            validator = validators[-1] \
+                if index >= len(validators) else validators[index]
+            result.append(validator(item, env))
         return result
 
-    def _map_scalar(self, data, spec):
-        if data != spec:
-            raise TypeError()
-        else:
-            return data
-
-    def _map(self, data, spec, context):
-        child_context = yaql.context.Context(parent_context=context)
-        if isinstance(spec, yaql_expression.YaqlExpression):
-            child_context.set_data(data)
-            return spec.evaluate(context=child_context)
-        elif isinstance(spec, types.DictionaryType):
-            return self._map_dict(data, spec, child_context)
-        elif isinstance(spec, types.ListType):
-            return self._map_list(data, spec, child_context)
-        elif isinstance(spec, (types.IntType,
-                               types.StringTypes,
-                               types.NoneType)):
-            return self._map_scalar(data, spec)
-
-    def __call__(self, data, context, this, object_store,
-                 namespace_resolver, default):
-        # TODO(ativelkov, slagun): temporary fix, need a better way of handling
-        # composite defaults
-        # A bug (#1313694) has been filed
-
-        if data is NoValue:
-            data = default
-
-        context = self.prepare_context(
-            context, this, object_store, namespace_resolver,
-            default)
-        result = self._map(data, self._spec, context)
-        if result is NoValue:
-            raise TypeError('No type specified')
-        return result
+    def item_validator(index, env):
+        if not spec:
+            return _map_any
+        if not validators:
+            return None
+        if index < 0:
+            return validators[-1] if len(validators) == 1 else None
+        return validators[-1] \
+            if index >= len(validators) else validators[index]
+
+    validate.item_validator = item_validator
+    return validate
+
+
+def _compile_expression(spec, namespace_resolver):
+    steps = []
+    node = spec.parsed_expression
+    while not isinstance(node, yaql.expressions.GetContextValue):
+        if not isinstance(node, yaql.expressions.Function):
+            return functools.partial(_evaluate_expression, spec)
+        step = _compile_step(node, namespace_resolver)
+        if step is None:
+            return functools.partial(_evaluate_expression, spec)
+        steps.append(step)
+        node = node.object
+    path = node.path
+    if not isinstance(path, yaql.expressions.Constant) or path.value != '$':
+        return functools.partial(_evaluate_expression, spec)
+    steps.reverse()
+
+    def validate(data, env):
+        for step in steps:
+            data = step(data, env)
+        return data
+    return validate
+
+
+def _evaluate_expression(spec, data, env):
+    child_context = yaql.context.Context(parent_context=env.context)
+    child_context.set_data(data)
+    return spec.evaluate(context=child_context)
+
+
+_SIMPLE_STEPS = {
+    'int': _validate_int,
+    'string': _validate_string,
+    'bool': _validate_bool,
+    'notNull': _validate_not_null
+}
+
+_OBJECT_STEPS = {
+    'owned': _validate_owned,
+    'notOwned': _validate_not_owned
+}
+
+
+def _compile_step(node, namespace_resolver):
+    if node.object is None:
+        return None
+    if node.name in _SIMPLE_STEPS and not node.args:
+        return _SIMPLE_STEPS[node.name]
+    if node.name in _OBJECT_STEPS and not node.args:
+        return functools.partial(_check_object, _OBJECT_STEPS[node.name])
+    if node.name == 'class' and 1 <= len(node.args) <= 2:
+        names = [_get_class_name(arg, namespace_resolver)
+                 for arg in node.args]
+        if None in names:
+            return None
+        name = namespace_resolver.resolve_name(names[0])
+        default_name = name if len(names) < 2 \
+            else namespace_resolver.resolve_name(names[1])
+        return lambda value, env: _validate_class(
+            value, env, name, default_name)
+    return None
+
+
+def _check_object(validator, obj, env):
+    if not isinstance(obj, _object_types()):
+        raise yaql.exceptions.YaqlExecutionException(
+            'Argument obj is invalid')
+    return validator(obj, env)
+
+
+def _get_constant_string(node):
+    if isinstance(node, yaql.expressions.Constant) and \
+            isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _get_namespace_prefix(node):
+    # yaql parses 'ns:Name' as #validate(#operator_:(ns), Name)
+    if isinstance(node, yaql.expressions.UnaryOperator) and \
+            node.name == '#operator_:':
+        return _get_constant_string(node.object)
+    return _get_constant_string(node)
+
+
+def _get_class_name(node, namespace_resolver):
+    if isinstance(node, yaql.expressions.Constant):
+        return _get_constant_string(node)
+    if isinstance(node, yaql.expressions.Function) and \
+            node.name == '#validate' and node.object is None and \
+            len(node.args) == 2:
+        prefix = _get_namespace_prefix(node.args[0])
+        name = _get_constant_string(node.args[1])
+        if prefix is not None and name is not None:
+            return namespace_resolver.resolve_name(
+                '%s:%s' % (prefix, name))
+    return None
@@ -42,6 +42,14 @@ class Spec(object):
         return self._contract(value, context, this, object_store,
                               self._namespace_resolver, default)
 
+    def validate_item(self, path, value, this, context, object_store,
+                      default=None):
+        if default is None:
+            default = self.default
+        return self._contract.validate_item(
+            path, value, context, this, object_store,
+            self._namespace_resolver, default)
+
     @property
     def default(self):
         return self._default
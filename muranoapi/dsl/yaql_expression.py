@@ -18,15 +18,53 @@ import types
 import yaql
 import yaql.exceptions
 
+from muranoapi.common import utils
+
+# The same expressions (e.g. "$.name") are used over and over again in
+# class definitions, so parsed expression trees are shared process-wide.
+# Parsed trees are never modified during evaluation thus sharing is safe.
+EXPRESSIONS_CACHE_SIZE = 10000
+
+_expressions_cache = utils.LruCache(EXPRESSIONS_CACHE_SIZE)
+# strings that passed lexical check but turned out not to be expressions
+_rejected_cache = utils.LruCache(EXPRESSIONS_CACHE_SIZE)
+
+_PLAIN_STRING = re.compile(r'^[\s\w\d.:]*$')
+_QUOTED_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+# characters that cannot start any YAQL token outside of quoted strings
+_NON_LEXICAL = re.compile(r'[^\w \t+\-*/.()\[\]><=,$:!]')
+
+
+def parse(expression):
+    expression = str(expression)
+    parsed_expression = _expressions_cache.get(expression)
+    if parsed_expression is None:
+        parsed_expression = yaql.parse(expression)
+        _expressions_cache.put(expression, parsed_expression)
+    return parsed_expression
+
+
+def cache_stats():
+    return _expressions_cache.stats()
+
+
+def clear_cache():
+    _expressions_cache.clear()
+    _rejected_cache.clear()
+
 
 class YaqlExpression(object):
     def __init__(self, expression):
         self._expression = str(expression)
-        self._parsed_expression = yaql.parse(self._expression)
+        self._parsed_expression = parse(self._expression)
 
     def expression(self):
         return self._expression
 
+    @property
+    def parsed_expression(self):
+        return self._parsed_expression
+
     def __repr__(self):
         return 'YAQL(%s)' % self._expression
 
@@ -37,15 +75,28 @@ class YaqlExpression(object):
     def match(expr):
         if not isinstance(expr, types.StringTypes):
             return False
-        if re.match('^[\s\w\d.:]*$', expr):
+        if _PLAIN_STRING.match(expr) or not _may_be_expression(expr):
+            return False
+        if expr in _rejected_cache:
             return False
         try:
-            yaql.parse(expr)
+            # successfully parsed expression is kept in the cache so that
+            # YAML constructor does not need to parse it once again
+            parse(expr)
             return True
-        except yaql.exceptions.YaqlGrammarException:
-            return False
-        except yaql.exceptions.YaqlLexicalException:
+        except (yaql.exceptions.YaqlGrammarException,
+                yaql.exceptions.YaqlLexicalException):
+            _rejected_cache.put(expr, True)
             return False
 
     def evaluate(self, context=None):
         return self._parsed_expression.evaluate(context=context)
+
+
+def _may_be_expression(expr):
+    """Cheap lexical check that rejects strings YAQL would fail to parse."""
+    unquoted = _QUOTED_STRING.sub('', expr)
+    if _NON_LEXICAL.search(unquoted):
+        return False
+    return (unquoted.count('(') == unquoted.count(')') and
+            unquoted.count('[') == unquoted.count(']'))
@@ -97,8 +97,9 @@ def _super2(value, func):
 
 
 @yaql.context.EvalArg('value', murano_object.MuranoObject)
-def _psuper2(value, func):
-    helpers.parallel_select(_super(value), func)
+@yaql.context.ContextAware()
+def _psuper2(context, value, func):
+    helpers.parallel_select(_super(value), func, context)
 
 
 @yaql.context.EvalArg('value', object)
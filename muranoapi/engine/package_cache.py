@@ -0,0 +1,287 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import errno
+import fcntl
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+
+import eventlet
+from oslo.config import cfg
+
+from muranoapi.openstack.common import log as logging
+from muranoapi.packages import exceptions as pkg_exc
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+PACKAGE_CACHE = None
+
+# Packages used during this time (in seconds) are never evicted because
+# tasks of other worker processes may still read their resources.
+MIN_IDLE_TIME = 3600
+
+# Interval (in seconds) of polling a package lock held by another task
+LOCK_POLL_INTERVAL = 0.05
+
+
+class _FileLock(object):
+    """Exclusive lock of a file that does not block other greenthreads.
+
+    Every lock opens the file anew, so it excludes both other processes
+    and other greenthreads of this process.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._path, 'a')
+        try:
+            while True:
+                try:
+                    fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return self
+                except IOError as e:
+                    if e.errno not in (errno.EACCES, errno.EAGAIN):
+                        raise
+                    eventlet.sleep(LOCK_POLL_INTERVAL)
+        except Exception:
+            self._file.close()
+            raise
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        return False
+
+
+class PackageCache(object):
+    """Persistent on-disk cache of packages shared by engine processes.
+
+    Extracted packages are stored under blobs/ by SHA-1 digest of the
+    package archive, refs/ maps package ids to the blob and to the
+    catalog 'updated' timestamp the package was downloaded at. Both are
+    populated in a temporary location and renamed into place, so readers
+    never see partial content. Downloads of a package are serialized by an
+    inter-process lock, so concurrent tasks wait for a download in progress
+    instead of repeating it. Least recently used packages are evicted when
+    the total size exceeds max_size, except packages in use by this process
+    or recently used by any process.
+    """
+
+    def __init__(self, root, max_size, min_idle_time=MIN_IDLE_TIME):
+        self._root = os.path.abspath(root)
+        self._max_size = max_size
+        self._min_idle_time = min_idle_time
+        self._pins = collections.defaultdict(int)
+        self._hits = 0
+        self._downloads = 0
+        self._evictions = 0
+        for name in ('blobs', 'refs', 'tmp', 'locks'):
+            path = os.path.join(self._root, name)
+            if not os.path.isdir(path):
+                try:
+                    os.makedirs(path)
+                except OSError:
+                    # created by another process in the meantime
+                    if not os.path.isdir(path):
+                        raise
+
+    def get(self, package_id, updated, download):
+        """Returns the directory of the package content.
+
+        download() is called to get the package archive when the package
+        is not cached or the cached one is older than updated. The
+        directory stays in the cache until release() is called.
+        """
+        path = self._lookup(package_id, updated)
+        if path is None:
+            with _FileLock(os.path.join(self._root, 'locks', package_id)):
+                path = self._lookup(package_id, updated)
+                if path is None:
+                    path = self._populate(package_id, updated, download())
+                    self._evict()
+        else:
+            self._hits += 1
+        self._pins[path] += 1
+        return path
+
+    def release(self, path):
+        self._pins[path] -= 1
+        if not self._pins[path]:
+            del self._pins[path]
+
+    def invalidate(self, package_id):
+        """Makes the next get() of the package download it again.
+
+        The download is extracted anew even if it has the same digest, so
+        that a damaged extraction is not reused. The old content is left
+        to tasks of other worker processes that may still read it and is
+        evicted once unused.
+        """
+        with _FileLock(os.path.join(self._root, 'locks', package_id)):
+            ref = self._read_ref(package_id)
+            if ref is not None:
+                ref['invalid'] = True
+                self._write_ref(package_id, ref)
+
+    def stats(self):
+        return {
+            'hits': self._hits,
+            'downloads': self._downloads,
+            'evictions': self._evictions,
+            'pinned': len(self._pins),
+            'max_size': self._max_size
+        }
+
+    def _ref_path(self, package_id):
+        return os.path.join(self._root, 'refs', package_id)
+
+    def _blob_path(self, blob):
+        return os.path.join(self._root, 'blobs', blob)
+
+    def _read_ref(self, package_id):
+        try:
+            with open(self._ref_path(package_id)) as ref_file:
+                ref = json.load(ref_file)
+        except (IOError, ValueError):
+            return None
+        if not isinstance(ref, dict) or 'digest' not in ref or \
+                'blob' not in ref:
+            return None
+        return ref
+
+    def _write_ref(self, package_id, ref):
+        tmp_dir = os.path.join(self._root, 'tmp')
+        with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as f:
+            json.dump(ref, f)
+        os.rename(f.name, self._ref_path(package_id))
+
+    def _lookup(self, package_id, updated):
+        ref = self._read_ref(package_id)
+        if ref is None or ref.get('invalid') or \
+                ref.get('updated') != str(updated):
+            return None
+        path = self._blob_path(ref['blob'])
+        if not os.path.isdir(path):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            # evicted in the meantime
+            return None
+        return path
+
+    def _populate(self, package_id, updated, data):
+        self._downloads += 1
+        digest = hashlib.sha1(data).hexdigest()
+        ref = self._read_ref(package_id)
+        if ref is not None and ref.get('invalid') and \
+                ref['digest'] == digest:
+            # the content extracted from the same archive is damaged
+            blob = '{0}-{1}'.format(digest, uuid.uuid4().hex)
+        else:
+            blob = digest
+        path = self._blob_path(blob)
+        if os.path.isdir(path):
+            os.utime(path, None)
+        else:
+            self._extract(data, path)
+
+        self._write_ref(package_id, {'updated': str(updated),
+                                     'digest': digest, 'blob': blob})
+        return path
+
+    def _extract(self, data, path):
+        archive = io.BytesIO(data)
+        if not zipfile.is_zipfile(archive):
+            raise pkg_exc.PackageFormatError(
+                "Uploading file should be a zip' archive")
+        target = tempfile.mkdtemp(dir=os.path.join(self._root, 'tmp'))
+        try:
+            zipfile.ZipFile(archive).extractall(path=target)
+            os.rename(target, path)
+        except OSError:
+            # the same content was added by another process
+            if not os.path.isdir(path):
+                raise
+        finally:
+            shutil.rmtree(target, ignore_errors=True)
+
+    def _evict(self):
+        blobs_dir = os.path.join(self._root, 'blobs')
+        blobs = []
+        total = 0
+        for digest in os.listdir(blobs_dir):
+            path = os.path.join(blobs_dir, digest)
+            try:
+                size = _get_size(path)
+                blobs.append((os.stat(path).st_mtime, size, path))
+            except OSError:
+                continue
+            total += size
+        if total <= self._max_size:
+            return
+
+        used_since = time.time() - self._min_idle_time
+        for mtime, size, path in sorted(blobs):
+            if total <= self._max_size:
+                break
+            if path in self._pins or mtime > used_since:
+                continue
+            if self._remove_blob(path):
+                total -= size
+                self._evictions += 1
+                LOG.debug('Package {0} is evicted from cache'.format(path))
+
+    def _remove_blob(self, path):
+        # the blob is moved out of blobs/ first, so that it disappears
+        # atomically for other processes
+        target = tempfile.mkdtemp(dir=os.path.join(self._root, 'tmp'))
+        try:
+            os.rename(path, os.path.join(target, 'blob'))
+            return True
+        except OSError:
+            # removed by another process
+            return False
+        finally:
+            shutil.rmtree(target, ignore_errors=True)
+
+
+def _get_size(path):
+    result = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            result += os.path.getsize(os.path.join(root, name))
+    return result
+
+
+def get_package_cache():
+    global PACKAGE_CACHE
+
+    if PACKAGE_CACHE is None:
+        PACKAGE_CACHE = PackageCache(CONF.packages_cache,
+                                     CONF.engine.package_cache_size << 20)
+    return PACKAGE_CACHE
@@ -15,6 +15,7 @@
 
 from oslo.config import cfg
 
+from muranoapi.common import utils
 from muranoapi.dsl import class_loader
 from muranoapi.dsl import exceptions
 from muranoapi.dsl import murano_package
@@ -24,16 +25,138 @@ from muranoapi.openstack.common import log as logging
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+CLASS_CACHE = None
+
+
+class ClassCache(object):
+    """Process-wide cache of classes built from catalog packages.
+
+    Each entry holds a fully built MuranoClass together with versions of
+    the packages of the class and all of its ancestors. An entry is only
+    valid while all of these packages stay unchanged.
+    """
+
+    def __init__(self, max_size):
+        self._classes = utils.LruCache(max_size)
+
+    def get(self, name):
+        return self._classes.get(name)
+
+    def put(self, murano_class, versions):
+        self._classes.put(murano_class.name, (murano_class, versions))
+
+    def invalidate_package(self, package_name):
+        for name, (_, versions) in self._classes.items():
+            if any(package == package_name
+                   for package, _ in versions.itervalues()):
+                self._classes.pop(name)
+
+    def clear(self):
+        self._classes.clear()
+
+    def stats(self):
+        return self._classes.stats()
+
+
+def get_class_cache():
+    global CLASS_CACHE
+
+    if CLASS_CACHE is None:
+        CLASS_CACHE = ClassCache(CONF.engine.class_cache_size)
+    return CLASS_CACHE
+
+
+def _get_hierarchy(murano_class):
+    result = [murano_class]
+    for parent in murano_class.parents:
+        for cls in _get_hierarchy(parent):
+            if cls not in result:
+                result.append(cls)
+    return result
+
 
 class PackageClassLoader(class_loader.MuranoClassLoader):
-    def __init__(self, package_loader):
+    def __init__(self, package_loader, class_cache=None):
         self.package_loader = package_loader
         self._packages_cache = {}
+        self._packages_by_class = {}
+        self._class_versions = {}
+        self._class_cache = class_cache or get_class_cache()
         super(PackageClassLoader, self).__init__()
 
+    def get_class(self, name, create_missing=False):
+        if name in self._loaded_types:
+            return self._loaded_types[name]
+
+        murano_class = self._get_cached_class(name)
+        if murano_class is None:
+            murano_class = super(PackageClassLoader, self).get_class(
+                name, create_missing)
+            self._cache_class(murano_class)
+        return murano_class
+
+    def _get_cached_class(self, name):
+        entry = self._class_cache.get(name)
+        if entry is None:
+            return None
+        murano_class, versions = entry
+        # validated per package by version only, so that packages of
+        # cached classes are not loaded
+        for package_name, version in set(versions.itervalues()):
+            if self.package_loader.get_package_version(
+                    package_name) != version:
+                LOG.debug('Package {0} was changed, invalidating cached '
+                          'classes'.format(package_name))
+                self._class_cache.invalidate_package(package_name)
+                return None
+
+        hierarchy = _get_hierarchy(murano_class)
+        for cls in hierarchy:
+            loaded_class = self._loaded_types.get(cls.name)
+            if loaded_class is not None and loaded_class is not cls:
+                return None
+        for cls in hierarchy:
+            self._loaded_types[cls.name] = cls
+            self._class_versions[cls.name] = dict(
+                (t.name, versions[t.name]) for t in _get_hierarchy(cls))
+        return murano_class
+
+    def _cache_class(self, murano_class):
+        version = self._get_class_version(murano_class.name)
+        versions = None
+        if version is not None:
+            versions = {murano_class.name: version}
+            for parent in murano_class.parents:
+                parent_versions = self._class_versions.get(parent.name)
+                if parent_versions is None:
+                    versions = None
+                    break
+                versions.update(parent_versions)
+        self._class_versions[murano_class.name] = versions
+        if versions is not None:
+            self._class_cache.put(murano_class, versions)
+
+    def _get_class_version(self, name):
+        package = self._get_package_by_class(name)
+        if package is None:
+            return None
+        version = self.package_loader.get_package_version(package.full_name)
+        if version is None:
+            return None
+        return package.full_name, version
+
+    def _get_package_by_class(self, name):
+        if name not in self._packages_by_class:
+            try:
+                package = self.package_loader.get_package_by_class(name)
+            except exceptions.NoPackageForClassFound:
+                package = None
+            self._packages_by_class[name] = package
+        return self._packages_by_class[name]
+
     def load_definition(self, name):
         try:
-            package = self.package_loader.get_package_by_class(name)
+            package = self._get_package_by_class(name)
             return package.get_class(name)
         except Exception:
             raise exceptions.NoClassFound(name)
@@ -44,7 +167,7 @@ class PackageClassLoader(class_loader.MuranoClassLoader):
         return package
 
     def find_package_name(self, class_name):
-        app_pkg = self.package_loader.get_package_by_class(class_name)
+        app_pkg = self._get_package_by_class(class_name)
         return None if app_pkg is None else app_pkg.full_name
 
     def create_root_context(self):
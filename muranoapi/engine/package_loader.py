@@ -15,9 +15,6 @@
 
 import abc
 import os
-import shutil
-import tempfile
-import uuid
 
 from keystoneclient.v2_0 import client as keystoneclient
 from muranoclient.common import exceptions as muranoclient_exc
@@ -28,6 +25,7 @@ import yaml
 from muranoapi.common import config
 from muranoapi.dsl import exceptions
 from muranoapi.dsl import yaql_expression
+from muranoapi.engine import package_cache
 from muranoapi.openstack.common import log as logging
 from muranoapi.packages import application_package as app_pkg
 from muranoapi.packages import exceptions as pkg_exc
@@ -57,11 +55,22 @@ class PackageLoader(six.with_metaclass(abc.ABCMeta)):
     def get_package_by_class(self, name):
         pass
 
+    def get_package_version(self, name):
+        """Returns current version of the package or None if unknown.
+
+        Version changes whenever the package content changes, so it can
+        be used to validate data cached between tasks without loading the
+        package.
+        """
+        return None
+
 
 class ApiPackageLoader(PackageLoader):
-    def __init__(self, token_id, tenant_id):
-        self._cache_directory = self._get_cache_directory()
+    def __init__(self, token_id, tenant_id, cache=None):
+        self._cache = cache or package_cache.get_package_cache()
+        self._used_directories = []
         self._client = self._get_murano_client(token_id, tenant_id)
+        self._package_versions = {}
 
     def get_package_by_class(self, name):
         filter_opts = {'class_name': name, 'limit': 1}
@@ -81,15 +90,20 @@ class ApiPackageLoader(PackageLoader):
         except(LookupError, pkg_exc.PackageLoadError):
             raise exceptions.NoPackageFound(name)
 
-    @staticmethod
-    def _get_cache_directory():
-        directory = os.path.join(config.CONF.packages_cache, str(uuid.uuid4()))
-        directory = os.path.abspath(directory)
-        os.makedirs(directory)
-
-        LOG.debug('Cache for package loader is located at: '
-                  '{0}'.format(directory))
-        return directory
+    def get_package_version(self, name):
+        if name not in self._package_versions:
+            try:
+                package_def = self._get_definition({'fqn': name, 'limit': 1})
+            except LookupError:
+                self._package_versions[name] = None
+            else:
+                self._set_package_version(package_def)
+        return self._package_versions[name]
+
+    def _set_package_version(self, package_def):
+        self._package_versions[package_def.fully_qualified_name] = \
+            '{0}@{1}'.format(package_def.id,
+                             getattr(package_def, 'updated', None))
 
     @staticmethod
     def _get_murano_client(token_id, tenant_id):
@@ -142,44 +156,45 @@ class ApiPackageLoader(PackageLoader):
 
     def _get_package_by_definition(self, package_def):
         package_id = package_def.id
-        package_name = package_def.fully_qualified_name
-        package_directory = os.path.join(self._cache_directory, package_name)
+        updated = getattr(package_def, 'updated', None)
+        self._set_package_version(package_def)
 
-        if os.path.exists(package_directory):
-            try:
-                return app_pkg.load_from_dir(package_directory, preload=True,
-                                             loader=YaqlYamlLoader)
-            except pkg_exc.PackageLoadError:
-                LOG.exception('Unable to load package from cache. Clean-up...')
-                shutil.rmtree(package_directory, ignore_errors=True)
+        # failed downloads are raised, only content that fails to load
+        # is downloaded again
+        package_directory = self._get_cached(package_id, updated)
+        try:
+            return self._load_from_cache(package_directory)
+        except pkg_exc.PackageLoadError:
+            LOG.exception('Unable to load package from cache. Clean-up...')
+            self._cache.invalidate(package_id)
+        return self._load_from_cache(self._get_cached(package_id, updated))
+
+    def _get_cached(self, package_id, updated):
+        return self._cache.get(package_id, updated,
+                               lambda: self._download(package_id))
 
+    def _load_from_cache(self, package_directory):
         try:
-            package_data = self._client.packages.download(package_id)
+            package = app_pkg.load_from_dir(package_directory, preload=True,
+                                            loader=YaqlYamlLoader)
+        except pkg_exc.PackageLoadError:
+            self._cache.release(package_directory)
+            raise
+        self._used_directories.append(package_directory)
+        return package
+
+    def _download(self, package_id):
+        try:
+            return self._client.packages.download(package_id)
         except muranoclient_exc.HTTPException:
             LOG.exception('Unable to download '
                           'package with id {0}'.format(package_id))
             raise pkg_exc.PackageLoadError()
-        try:
-            with tempfile.NamedTemporaryFile(delete=False) as package_file:
-                package_file.write(package_data)
-
-            return app_pkg.load_from_file(
-                package_file.name,
-                target_dir=package_directory,
-                drop_dir=False,
-                loader=YaqlYamlLoader
-            )
-        except IOError:
-            LOG.exception('Unable to write package file')
-            raise pkg_exc.PackageLoadError()
-        finally:
-            try:
-                os.remove(package_file.name)
-            except OSError:
-                pass
 
     def cleanup(self):
-        shutil.rmtree(self._cache_directory, ignore_errors=True)
+        for directory in self._used_directories:
+            self._cache.release(directory)
+        self._used_directories = []
 
     def __enter__(self):
         return self
@@ -145,40 +145,48 @@ class Agent(murano_object.MuranoObject):
         else:
             return self._build_v2_execution_plan(template, resources)
 
+    # The template belongs to the caller, which may keep it in a variable
+    # or property and send it again, so plans are built from copies of the
+    # parts that are changed instead of filling the template in place.
     def _build_v1_execution_plan(self, template, resources):
         scripts_folder = 'scripts'
         script_files = template.get('Scripts', [])
         scripts = []
         for script in script_files:
             script_path = os.path.join(scripts_folder, script)
-            scripts.append(resources.string(
-                script_path).encode('base64'))
+            scripts.append(resources.base64(script_path))
+        template = dict(template)
         template['Scripts'] = scripts
         return template
 
     def _build_v2_execution_plan(self, template, resources):
         scripts_folder = 'scripts'
         plan_id = uuid.uuid4().hex
+        template = dict(template)
         template['ID'] = plan_id
         if 'Action' not in template:
             template['Action'] = 'Execute'
-        if 'Files' not in template:
-            template['Files'] = {}
+        template['Files'] = dict(template.get('Files', {}))
 
         files = {}
         for file_id, file_descr in template['Files'].items():
             files[file_descr['Name']] = file_id
-        for name, script in template.get('Scripts', {}).items():
-            if 'EntryPoint' not in script:
-                raise ValueError('No entry point in script ' + name)
-            script['EntryPoint'] = self._place_file(
-                scripts_folder, script['EntryPoint'],
-                template, files, resources)
-            if 'Files' in script:
-                for i in range(0, len(script['Files'])):
-                    script['Files'][i] = self._place_file(
-                        scripts_folder, script['Files'][i],
-                        template, files, resources)
+        if 'Scripts' in template:
+            scripts = {}
+            for name, script in template['Scripts'].items():
+                if 'EntryPoint' not in script:
+                    raise ValueError('No entry point in script ' + name)
+                script = dict(script)
+                script['EntryPoint'] = self._place_file(
+                    scripts_folder, script['EntryPoint'],
+                    template, files, resources)
+                if 'Files' in script:
+                    script['Files'] = [
+                        self._place_file(scripts_folder, script_file,
+                                         template, files, resources)
+                        for script_file in script['Files']]
+                scripts[name] = script
+            template['Scripts'] = scripts
 
         return template
 
@@ -192,9 +200,10 @@ class Agent(murano_object.MuranoObject):
 
         file_id = uuid.uuid4().hex
         body_type = 'Base64' if use_base64 else 'Text'
-        body = resources.string(os.path.join(folder, name))
         if use_base64:
-            body = body.encode('base64')
+            body = resources.base64(os.path.join(folder, name))
+        else:
+            body = resources.string(os.path.join(folder, name))
 
         template['Files'][file_id] = {
             'Name': name,
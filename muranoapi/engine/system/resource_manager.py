@@ -13,11 +13,141 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import json as jsonlib
+import os
+import threading
+
+from oslo.config import cfg
 import yaml as yamllib
 
+from muranoapi.common import utils
 import muranoapi.dsl.murano_object as murano_object
 
+CONF = cfg.CONF
+
+RESOURCE_CACHE = None
+
+# Number of resource file paths remembered by the cache. Contents of the
+# files are bounded separately by [engine] resource_cache_size.
+MAX_CACHED_FILES = 10000
+
+
+class ResourceContent(object):
+    """Content of a resource file and its base64 encoding."""
+
+    __slots__ = ('data', 'digest', '_base64')
+
+    def __init__(self, data, digest):
+        self.data = data
+        self.digest = digest
+        self._base64 = None
+
+    @property
+    def size(self):
+        return len(self.data) + len(self._base64 or '')
+
+
+class ResourceCache(object):
+    """Process-wide cache of package resource files.
+
+    Files are identified by path, inode, size, modification and change
+    times and their contents by SHA-1 digest, so the same file found in
+    different packages or in different package directories is kept once.
+    Contents and their base64 encodings are evicted in least-recently-used
+    order when their total size exceeds the limit.
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._files = utils.LruCache(MAX_CACHED_FILES)
+        self._contents = utils.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, path):
+        stat = os.stat(path)
+        # ctime changes on every write even when the file is rewritten at
+        # the same size within the mtime granularity or gets its mtime
+        # restored, inode changes when the file is replaced by rename
+        version = (stat.st_ino, stat.st_size, stat.st_mtime, stat.st_ctime)
+        entry = self._files.get(path)
+        if entry is not None and entry[0] == version:
+            content = self._touch(entry[1])
+            if content is not None:
+                return content
+
+        with open(path) as file:
+            data = file.read()
+        digest = hashlib.sha1(data).hexdigest()
+        self._files.put(path, (version, digest))
+        with self._lock:
+            self._misses += 1
+            content = self._contents.get(digest)
+            if content is None:
+                content = ResourceContent(data, digest)
+                self._add(content)
+        return content
+
+    def get_base64(self, path):
+        content = self.get(path)
+        if content._base64 is None:
+            encoded = content.data.encode('base64')
+            with self._lock:
+                if content._base64 is None:
+                    content._base64 = encoded
+                    if self._contents.get(content.digest) is content:
+                        self._size += len(encoded)
+                        self._evict()
+        return content._base64
+
+    def clear(self):
+        self._files.clear()
+        with self._lock:
+            self._contents.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': self._size,
+                'max_size': self._max_size
+            }
+
+    def _touch(self, digest):
+        with self._lock:
+            content = self._contents.pop(digest, None)
+            if content is not None:
+                self._contents[digest] = content
+                self._hits += 1
+            return content
+
+    def _add(self, content):
+        self._contents[content.digest] = content
+        self._size += content.size
+        self._evict()
+
+    def _evict(self):
+        # the most recently used content is kept even if it is too large
+        while self._size > self._max_size and len(self._contents) > 1:
+            _, content = self._contents.popitem(last=False)
+            self._size -= content.size
+
+
+def get_resource_cache():
+    global RESOURCE_CACHE
+
+    if RESOURCE_CACHE is None:
+        RESOURCE_CACHE = ResourceCache(
+            CONF.engine.resource_cache_size * 1024 * 1024)
+    return RESOURCE_CACHE
+
 
 class ResourceManager(murano_object.MuranoObject):
     def initialize(self, package_loader, _context, _class):
@@ -26,9 +156,12 @@ class ResourceManager(murano_object.MuranoObject):
         self._package = package_loader.get_package(_class.type.package.name)
 
     def string(self, name):
-        path = self._package.get_resource(name)
-        with open(path) as file:
-            return file.read()
+        return get_resource_cache().get(
+            self._package.get_resource(name)).data
+
+    def base64(self, name):
+        return get_resource_cache().get_base64(
+            self._package.get_resource(name))
 
     def json(self, name):
         return jsonlib.loads(self.string(name))
@@ -14,6 +14,8 @@
 # limitations under the License.
 
 import base64
+import hashlib
+import marshal
 import re
 import types
 
@@ -23,46 +25,136 @@ import yaql.context
 import yaql.functions.builtin as yaql_builtin
 
 import muranoapi.common.config as cfg
+from muranoapi.common import utils
 import muranoapi.dsl.helpers as helpers
 
 
+# Compiled bind() templates are kept by digest of the marshalled template,
+# so templates parsed anew from the same resource file share an entry.
+TEMPLATES_CACHE_SIZE = 100
+
+_templates_cache = utils.LruCache(TEMPLATES_CACHE_SIZE)
+
+_MACRO_PARAMETER = re.compile('{(\\w+?)}')
+
+
 def _transform_json(json, mappings):
+    """Substitutes mappings into the placeholders of the template.
+
+    The result is rendered into a copy of the template, so it shares no
+    containers with the template or with other results. Templates are
+    compiled on first use.
+    """
+    if not isinstance(json, (types.DictionaryType, types.ListType)):
+        render = _compile_template(json)
+        return json if render is None else render(json, mappings)
+
+    render, copy = _get_compiled_template(json)
+    result = copy()
+    return result if render is None else render(result, mappings)
+
+
+def _get_compiled_template(json):
+    try:
+        data = marshal.dumps(json)
+    except ValueError:
+        # templates with objects other than plain data are not cached
+        return _compile_template(json), lambda: _copy_containers(json)
+
+    key = hashlib.sha1(data).digest()
+    entry = _templates_cache.get(key)
+    if entry is None:
+        entry = (_compile_template(json), lambda: marshal.loads(data))
+        _templates_cache.put(key, entry)
+    return entry
+
+
+def _copy_containers(json):
     if isinstance(json, types.ListType):
-        return [_transform_json(t, mappings) for t in json]
+        return [_copy_containers(item) for item in json]
+    elif isinstance(json, types.DictionaryType):
+        return dict((key, _copy_containers(value))
+                    for key, value in json.iteritems())
+    return json
 
-    if isinstance(json, types.DictionaryType):
-        result = {}
-        for key, value in json.items():
-            result[_transform_json(key, mappings)] = \
-                _transform_json(value, mappings)
-        return result
 
-    elif isinstance(json, types.ListType):
-        result = []
-        for value in json:
-            result.append(_transform_json(value, mappings))
-        return result
+def _compile_template(json):
+    """Returns function that renders a copy of the template.
 
+    The function takes the copy and mappings, fills in the placeholders of
+    the copy in place and returns the result. None is returned for parts
+    of the template without placeholders.
+    """
+    if isinstance(json, types.ListType):
+        return _compile_list(json)
+    elif isinstance(json, types.DictionaryType):
+        return _compile_dict(json)
     elif isinstance(json, types.StringTypes) and json.startswith('$'):
-        value = _convert_macro_parameter(json[1:], mappings)
-        if value is not None:
-            return value
+        render = _compile_macro_parameter(json)
+        return lambda value, mappings: render(mappings)
+    return None
 
-    return json
 
+def _compile_list(json):
+    slots = []
+    for index, item in enumerate(json):
+        render = _compile_template(item)
+        if render is not None:
+            slots.append((index, render))
+    if not slots:
+        return None
 
-def _convert_macro_parameter(macro, mappings):
-    replaced = [False]
+    def render_list(result, mappings):
+        for index, render in slots:
+            result[index] = render(result[index], mappings)
+        return result
+    return render_list
 
-    def replace(match):
-        replaced[0] = True
-        return unicode(mappings.get(match.group(1)))
 
-    result = re.sub('{(\\w+?)}', replace, macro)
-    if replaced[0]:
+def _compile_dict(json):
+    slots = []
+    for key, value in json.iteritems():
+        render_key = _compile_template(key)
+        render_value = _compile_template(value)
+        if render_key is not None or render_value is not None:
+            slots.append((key, render_key, render_value))
+    if not slots:
+        return None
+
+    def render_dict(result, mappings):
+        # renamed keys are removed before any of the new keys is set
+        values = [result.pop(key) if render_key is not None else result[key]
+                  for key, render_key, _ in slots]
+        for (key, render_key, render_value), value in zip(slots, values):
+            if render_value is not None:
+                value = render_value(value, mappings)
+            if render_key is not None:
+                key = render_key(key, mappings)
+            result[key] = value
         return result
-    else:
-        return mappings[macro]
+    return render_dict
+
+
+def _compile_macro_parameter(json):
+    macro = json[1:]
+    parts = _MACRO_PARAMETER.split(macro)
+    if len(parts) == 1:
+        def render_value(mappings):
+            value = mappings[macro]
+            return json if value is None else value
+        return render_value
+
+    # parts are literals interleaved with names of the mappings
+    literals = parts[::2]
+    names = parts[1::2]
+
+    def render_string(mappings):
+        result = [literals[0]]
+        for name, literal in zip(names, literals[1:]):
+            result.append(unicode(mappings.get(name)))
+            result.append(literal)
+        return ''.join(result)
+    return render_string
 
 
 @yaql.context.EvalArg('format', types.StringTypes)
@@ -187,8 +279,9 @@ def _int(value):
     return int(value)
 
 
-def _pselect(collection, composer):
-    return helpers.parallel_select(collection(), composer)
+@yaql.context.ContextAware()
+def _pselect(context, collection, composer):
+    return helpers.parallel_select(collection(), composer, context)
 
 
 def _patch(obj, patch):
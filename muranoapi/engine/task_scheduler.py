@@ -0,0 +1,171 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import time
+
+import eventlet
+import eventlet.event
+
+from muranoapi.common import utils
+from muranoapi.openstack.common.gettextutils import _  # noqa
+from muranoapi.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+
+class _Task(object):
+    __slots__ = ('tenant_id', 'func', 'priority', 'enqueued', 'done')
+
+    def __init__(self, tenant_id, func, priority):
+        self.tenant_id = tenant_id
+        self.func = func
+        self.priority = priority
+        self.enqueued = time.time()
+        self.done = eventlet.event.Event()
+
+
+class TaskStats(object):
+    """Queue wait and run time statistics of one kind of tasks."""
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, wait, elapsed, failed):
+        self.completed += 1
+        if failed:
+            self.failed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+    def to_dictionary(self):
+        return {
+            'completed': self.completed,
+            'failed': self.failed,
+            'total_wait': self.total_wait,
+            'max_wait': self.max_wait,
+            'total_time': self.total_time,
+            'max_time': self.max_time
+        }
+
+
+class TaskScheduler(object):
+    """Runs engine tasks on a bounded number of greenthreads.
+
+    Tasks of every tenant are queued separately and tenants are served
+    round-robin, so a tenant with many queued deployments delays other
+    tenants by at most one task per turn. A tenant runs at most
+    max_tasks_per_tenant tasks at a time. Priority tasks (environment
+    deletions) are queued in a lane of their own which is served first
+    and is not subject to the per-tenant limit.
+    """
+
+    def __init__(self, workers, max_tasks_per_tenant=None):
+        self._workers = workers
+        self._max_tasks_per_tenant = max_tasks_per_tenant
+        self._priority = collections.deque()
+        self._queues = utils.OrderedDict()
+        self._queued = 0
+        self._max_queued = 0
+        self._running = collections.defaultdict(int)
+        self._active = 0
+        self._idle = None
+        self._stats = {'priority': TaskStats(), 'normal': TaskStats()}
+
+    def submit(self, tenant_id, func, priority=False):
+        """Queues the task and returns event sent when it is completed."""
+        task = _Task(tenant_id, func, priority)
+        if priority:
+            self._priority.append(task)
+        else:
+            self._queues.setdefault(tenant_id, collections.deque()).append(
+                task)
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        self._dispatch()
+        return task.done
+
+    def wait(self):
+        """Blocks until all submitted tasks are completed."""
+        while self._active or self._queued:
+            if self._idle is None:
+                self._idle = eventlet.event.Event()
+            self._idle.wait()
+
+    def _next_task(self):
+        if self._priority:
+            return self._priority.popleft()
+        for tenant_id in self._queues.keys():
+            if self._max_tasks_per_tenant and self._running[tenant_id] >= \
+                    self._max_tasks_per_tenant:
+                continue
+            queue = self._queues.pop(tenant_id)
+            task = queue.popleft()
+            if queue:
+                # the tenant goes to the end of the round
+                self._queues[tenant_id] = queue
+            return task
+        return None
+
+    def _dispatch(self):
+        while self._active < self._workers:
+            task = self._next_task()
+            if task is None:
+                break
+            self._queued -= 1
+            self._active += 1
+            self._running[task.tenant_id] += 1
+            eventlet.spawn_n(self._run, task)
+
+    def _run(self, task):
+        started = time.time()
+        failed = False
+        try:
+            task.func()
+        except Exception:
+            failed = True
+            LOG.exception(_('Task of tenant {0} failed').format(
+                task.tenant_id))
+        finally:
+            self._stats['priority' if task.priority else 'normal'].record(
+                started - task.enqueued, time.time() - started, failed)
+            self._active -= 1
+            self._running[task.tenant_id] -= 1
+            if not self._running[task.tenant_id]:
+                del self._running[task.tenant_id]
+            self._dispatch()
+            task.done.send()
+            if self._idle is not None and not self._active and \
+                    not self._queued:
+                self._idle.send()
+                self._idle = None
+
+    def stats(self):
+        return {
+            'active': self._active,
+            'queued': self._queued,
+            'queued_priority': len(self._priority),
+            'max_queued': self._max_queued,
+            'tenants_queued': len(self._queues),
+            'tasks': dict((kind, stats.to_dictionary())
+                          for kind, stats in self._stats.iteritems())
+        }
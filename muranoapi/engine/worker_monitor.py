@@ -0,0 +1,127 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import eventlet
+import psutil
+
+from muranoapi.openstack.common.gettextutils import _  # noqa
+from muranoapi.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+
+def get_rss():
+    return psutil.Process(os.getpid()).get_memory_info().rss
+
+
+class TaskMemory(object):
+    """Resident memory of the worker process while a task runs.
+
+    The process is shared by concurrently running tasks, so the peak is
+    the peak of the whole process during the task.
+    """
+
+    def __init__(self, rss):
+        self.start = rss
+        self.peak = rss
+
+    def update(self, rss):
+        self.peak = max(self.peak, rss)
+
+    @property
+    def growth(self):
+        return self.peak - self.start
+
+
+class WorkerMonitor(object):
+    """Tracks tasks and memory of an engine worker process.
+
+    While tasks run, the resident memory of the process is sampled every
+    interval seconds. The worker is due for recycling once it completed
+    max_tasks tasks or its resident memory exceeds max_rss bytes (zero
+    disables a limit). The recycle callback is invoked once when that
+    happens.
+    """
+
+    def __init__(self, max_tasks=0, max_rss=0, interval=1.0,
+                 get_rss=get_rss):
+        self._max_tasks = max_tasks
+        self._max_rss = max_rss
+        self._interval = interval
+        self._get_rss = get_rss
+        self._active = set()
+        self._sampler = None
+        self._completed = 0
+        self._peak = 0
+        self._recycle = None
+        self._recycling = False
+
+    def set_recycle_callback(self, callback):
+        self._recycle = callback
+
+    @property
+    def recycling(self):
+        return self._recycling
+
+    def task_started(self):
+        memory = TaskMemory(self._sample())
+        self._active.add(memory)
+        if self._sampler is None:
+            self._sampler = eventlet.spawn(self._sample_loop)
+        return memory
+
+    def task_finished(self, memory):
+        self._active.discard(memory)
+        rss = self._sample()
+        memory.update(rss)
+        self._completed += 1
+        if self._recycle is not None and not self._recycling:
+            reason = self._recycle_reason(rss)
+            if reason:
+                self._recycling = True
+                LOG.info(_('Recycling engine worker: {0}').format(reason))
+                self._recycle()
+
+    def _recycle_reason(self, rss):
+        if self._max_tasks and self._completed >= self._max_tasks:
+            return _('{0} tasks completed').format(self._completed)
+        if self._max_rss and rss > self._max_rss:
+            return _('resident memory is {0} MB').format(rss >> 20)
+        return None
+
+    def _sample(self):
+        rss = self._get_rss()
+        self._peak = max(self._peak, rss)
+        for memory in self._active:
+            memory.update(rss)
+        return rss
+
+    def _sample_loop(self):
+        try:
+            while self._active:
+                eventlet.sleep(self._interval)
+                self._sample()
+        finally:
+            self._sampler = None
+
+    def stats(self):
+        return {
+            'completed': self._completed,
+            'active': len(self._active),
+            'peak_rss': self._peak,
+            'recycling': self._recycling
+        }
@@ -0,0 +1,99 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import eventlet.event
+import mock
+import unittest2 as unittest
+
+from muranoapi.common import engine
+from muranoapi.engine import task_scheduler
+
+
+class EngineServiceTests(unittest.TestCase):
+    def setUp(self):
+        scheduler = task_scheduler.TaskScheduler(2)
+        patcher = mock.patch.object(engine, 'TASK_SCHEDULER', scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = scheduler
+
+    @mock.patch.object(engine, '_prepare_rpc_service')
+    def test_stop_drains_tasks(self, prepare_rpc_service):
+        completed = []
+        service = engine.EngineService()
+        service.start()
+        rpc_service = prepare_rpc_service.return_value
+        rpc_service.start.assert_called_once_with()
+
+        for index in range(3):
+            self.scheduler.submit(
+                'tenant', lambda index=index: (eventlet.sleep(0.001),
+                                               completed.append(index)))
+        service.stop()
+
+        rpc_service.stop.assert_called_once_with()
+        rpc_service.wait.assert_called_once_with()
+        self.assertEqual([0, 1, 2], sorted(completed))
+
+    @mock.patch.object(engine.TaskProcessingEndpoint, '_process_task')
+    def test_task_is_handled_until_completed(self, process_task):
+        release = eventlet.event.Event()
+        process_task.side_effect = lambda task: release.wait()
+        task = {'tenant_id': 'tenant', 'model': {'Objects': {}}}
+
+        handler = eventlet.spawn(
+            engine.TaskProcessingEndpoint.handle_task, None, task)
+        eventlet.sleep(0.001)
+        self.assertFalse(handler.dead)
+        self.assertEqual(1, self.scheduler.stats()['active'])
+
+        release.send()
+        handler.wait()
+        process_task.assert_called_once_with(task)
+        self.assertEqual(0, self.scheduler.stats()['active'])
+
+    @mock.patch.object(engine, '_prepare_rpc_service')
+    def test_workers_use_own_rpc_servers(self, prepare_rpc_service):
+        for _ in range(2):
+            engine.EngineService().start()
+
+        server_ids = set(call[0][0]
+                         for call in prepare_rpc_service.call_args_list)
+        self.assertEqual(2, len(server_ids))
+
+
+class ModelSizeTests(unittest.TestCase):
+    def _model(self, applications):
+        return {'Objects': {
+            '?': {'id': 'env', 'type': 'io.murano.Environment'},
+            'applications': [{'?': {'id': str(index), 'type': 'App'},
+                              'name': {'?': {'type': 'NotAnObject'}}}
+                             for index in range(applications)]
+        }}
+
+    def test_count_objects(self):
+        self.assertEqual(4, engine._count_objects(self._model(3)))
+        self.assertEqual(0, engine._count_objects({'Objects': None}))
+
+    @mock.patch.object(engine.config.CONF, 'engine')
+    def test_oversized_model(self, engine_conf):
+        engine_conf.max_model_objects = 4
+        engine._check_model_size(self._model(3))
+        self.assertRaises(ValueError, engine._check_model_size,
+                          self._model(4))
+
+        engine_conf.max_model_objects = 0
+        engine._check_model_size(self._model(4))
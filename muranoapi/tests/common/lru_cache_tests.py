@@ -0,0 +1,55 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest2 as unittest
+
+from muranoapi.common import utils
+
+
+class LruCacheTests(unittest.TestCase):
+    def test_get_missing(self):
+        cache = utils.LruCache(2)
+
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual('default', cache.get('key', 'default'))
+        self.assertEqual(2, cache.stats()['misses'])
+
+    def test_put_and_get(self):
+        cache = utils.LruCache(2)
+        cache.put('key', 'value')
+
+        self.assertEqual('value', cache.get('key'))
+        self.assertEqual(1, cache.stats()['hits'])
+
+    def test_evicts_least_recently_used(self):
+        cache = utils.LruCache(2)
+        cache.put('first', 1)
+        cache.put('second', 2)
+        cache.get('first')
+        cache.put('third', 3)
+
+        self.assertIn('first', cache)
+        self.assertNotIn('second', cache)
+        self.assertIn('third', cache)
+        self.assertEqual(2, len(cache))
+
+    def test_clear(self):
+        cache = utils.LruCache(2)
+        cache.put('key', 'value')
+        cache.get('key')
+        cache.clear()
+
+        self.assertEqual(
+            {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 2},
+            cache.stats())
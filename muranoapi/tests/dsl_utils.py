@@ -0,0 +1,82 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import yaml
+
+from muranoapi.dsl import class_loader
+from muranoapi.dsl import exceptions
+from muranoapi.dsl import executor
+from muranoapi.dsl import murano_package
+from muranoapi.dsl import yaql_expression
+from muranoapi.engine.system import yaql_functions
+
+OBJECT_CLASS = """
+Namespaces:
+  =: io.murano
+Name: Object
+"""
+
+
+class YaqlYamlLoader(yaml.Loader):
+    pass
+
+
+def yaql_constructor(loader, node):
+    value = loader.construct_scalar(node)
+    return yaql_expression.YaqlExpression(value)
+
+yaml.add_constructor(u'!yaql', yaql_constructor, YaqlYamlLoader)
+yaml.add_implicit_resolver(u'!yaql', yaql_expression.YaqlExpression,
+                           Loader=YaqlYamlLoader)
+
+
+class TestClassLoader(class_loader.MuranoClassLoader):
+    """Loads classes from YAML sources kept in memory."""
+
+    def __init__(self, classes):
+        self._classes = {'io.murano.Object': OBJECT_CLASS}
+        self._classes.update(classes)
+        super(TestClassLoader, self).__init__()
+
+    def load_definition(self, name):
+        if name not in self._classes:
+            raise exceptions.NoClassFound(name)
+        return yaml.load(self._classes[name], YaqlYamlLoader)
+
+    def find_package_name(self, class_name):
+        return 'tests' if class_name in self._classes else None
+
+    def load_package(self, name):
+        package = murano_package.MuranoPackage()
+        package.name = name
+        return package
+
+    def create_root_context(self):
+        context = super(TestClassLoader, self).create_root_context()
+        yaql_functions.register(context)
+        return context
+
+
+def new_object(class_name, object_id, **properties):
+    result = {'?': {'id': object_id, 'type': class_name}}
+    result.update(properties)
+    return result
+
+
+def load_model(classes, objects):
+    loader = TestClassLoader(classes)
+    dsl_executor = executor.MuranoDslExecutor(loader)
+    root = dsl_executor.load({'Objects': objects})
+    return dsl_executor, root
@@ -0,0 +1,98 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import unittest2 as unittest
+
+from muranoapi.dsl import concurrency
+from muranoapi.dsl import executor
+
+
+class TestParallelScheduler(unittest.TestCase):
+    def setUp(self):
+        self.running = 0
+        self.max_running = 0
+
+    def _work(self, value):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        eventlet.sleep(0.001)
+        self.running -= 1
+        return value * 2
+
+    def test_results_are_ordered(self):
+        scheduler = concurrency.ParallelScheduler()
+
+        self.assertEqual([0, 2, 4, 6], scheduler.map(self._work, range(4)))
+        self.assertEqual(4, self.max_running)
+        self.assertEqual([], scheduler.map(self._work, []))
+
+    def test_limit(self):
+        scheduler = concurrency.ParallelScheduler()
+
+        scheduler.map(self._work, range(10), 3)
+
+        self.assertEqual(3, self.max_running)
+
+    def test_budget(self):
+        process_budget = concurrency.Budget(3)
+        schedulers = [concurrency.ParallelScheduler(2, process_budget)
+                      for _ in range(2)]
+
+        threads = [eventlet.spawn(scheduler.map, self._work, range(10))
+                   for scheduler in schedulers]
+        for thread in threads:
+            thread.wait()
+
+        # every caller serves its items too
+        self.assertEqual(5, self.max_running)
+        self.assertEqual(0, process_budget.used)
+        self.assertEqual(10, schedulers[0].stats()['started'])
+        self.assertEqual(0, schedulers[0].stats()['queued'])
+
+    def test_nested_maps_share_budget(self):
+        scheduler = concurrency.ParallelScheduler(1)
+
+        result = scheduler.map(
+            lambda value: scheduler.map(self._work, range(value)), range(4))
+
+        self.assertEqual([[], [0], [0, 2], [0, 2, 4]], result)
+        self.assertEqual(2, self.max_running)
+
+    def test_first_error_is_raised(self):
+        scheduler = concurrency.ParallelScheduler()
+        done = []
+
+        def fail(value):
+            eventlet.sleep(0.001 * (3 - value))
+            done.append(value)
+            if value:
+                raise ValueError(value)
+
+        with self.assertRaisesRegexp(ValueError, '1'):
+            scheduler.map(fail, range(3))
+        self.assertEqual([0, 1, 2], sorted(done))
+
+    def test_items_run_as_new_threads(self):
+        scheduler = concurrency.ParallelScheduler()
+        caller = executor._get_thread_marker()
+
+        for limit in (None, 1):
+            markers = scheduler.map(
+                lambda _: executor._get_thread_marker(), range(4), limit)
+
+            self.assertNotIn(caller, markers)
+            self.assertEqual(4, len(set(markers)))
+        self.assertEqual(caller, executor._get_thread_marker())
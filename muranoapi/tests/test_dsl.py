@@ -0,0 +1,813 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import mock
+import unittest2 as unittest
+import yaql.exceptions
+import yaql.expressions
+
+import muranoapi.dsl.exceptions as exceptions
+import muranoapi.dsl.executor as executor
+import muranoapi.dsl.expressions as expressions
+import muranoapi.dsl.lhs_expression as lhs_expression
+import muranoapi.dsl.macros as macros
+import muranoapi.dsl.murano_object as murano_object
+import muranoapi.dsl.object_store as object_store
+import muranoapi.dsl.results_serializer as results_serializer
+from muranoapi.dsl.yaql_expression import YaqlExpression
+from muranoapi.tests import dsl_utils
+
+CLASSES = {
+    'Greeter': """
+Name: Greeter
+Properties:
+  name:
+    Contract: $.string().notNull()
+Workflow:
+  greet:
+    Arguments:
+      - who:
+          Contract: $.string().notNull()
+      - greeting:
+          Contract: $.string()
+          Default: Hello
+    Body:
+      - Return: format('{0}, {1} from {2}', $greeting, $who, $.name)
+""",
+    'PoliteGreeter': """
+Name: PoliteGreeter
+Extends: Greeter
+Workflow:
+  greetAll:
+    Arguments:
+      - names:
+          Contract: [$.string()]
+    Body:
+      - Return: $names.select($this.greet($, greeting => 'Dear'))
+"""
+}
+
+
+class TestMethodInvocation(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            CLASSES, dsl_utils.new_object('PoliteGreeter', 'obj', name='me'))
+
+    def _invoke(self, name, args):
+        return self.obj.type.invoke(name, self.executor, self.obj, args)
+
+    def test_keyword_arguments_with_default(self):
+        self.assertEqual('Hello, bob from me',
+                         self._invoke('greet', {'who': 'bob'}))
+
+    def test_positional_arguments(self):
+        self.assertEqual('Hi, bob from me',
+                         self._invoke('greet', ['bob', 'Hi']))
+
+    def test_inherited_method_from_dsl(self):
+        self.assertEqual(['Dear, a from me', 'Dear, b from me'],
+                         list(self._invoke('greetAll', [['a', 'b']])))
+
+    def test_wrong_arguments(self):
+        self.assertRaises(exceptions.NoMethodFound,
+                          self._invoke, 'greet', ['a', 'b', 'c'])
+        self.assertRaises(exceptions.NoMethodFound,
+                          self._invoke, 'greet', {'unknown': 'a'})
+        self.assertRaises(exceptions.NoMethodFound,
+                          self._invoke, 'greet', [])
+
+    def test_method_resolution_is_memoized(self):
+        resolution = self.obj.type.find_method('greet')
+
+        self.assertEqual('Greeter', resolution[0][0].name)
+        self.assertIs(resolution, self.obj.type.find_method('greet'))
+
+    def test_resolution_follows_added_methods(self):
+        self.obj.type.find_method('farewell')
+        parent = self.obj.type.parents[0]
+        parent.add_method('farewell', {'Body': [{'Return': 'bye'}]})
+
+        self.assertEqual('bye', self._invoke('farewell', {}))
+
+
+RECURSIVE = {
+    'Recursive': """
+Name: Recursive
+Properties:
+  trace:
+    Contract: [$.string()]
+    Usage: InOut
+    Default: []
+Workflow:
+  countDown:
+    Arguments:
+      - n:
+          Contract: $.int()
+    Body:
+      - If: $n > 0
+        Then:
+          - Return: $.countDown($n - 1) + 1
+      - Return: 0
+  exclusive:
+    Arguments:
+      - tag:
+          Contract: $.string()
+    Body:
+      - $.trace: $.trace + list($tag)
+      - sleep(0)
+      - $.trace: $.trace + list($tag)
+"""
+}
+
+
+class TestMethodExecution(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            RECURSIVE, dsl_utils.new_object('Recursive', 'obj'))
+
+    def _invoke(self, name, args):
+        return self.obj.type.invoke(name, self.executor, self.obj, args)
+
+    def test_shallow_calls_run_inline(self):
+        with mock.patch.object(executor.eventlet, 'spawn',
+                               wraps=eventlet.spawn) as spawn:
+            self.assertEqual(3, self._invoke('countDown', [3]))
+        self.assertFalse(spawn.called)
+
+    def test_deep_recursion(self):
+        with mock.patch.object(executor.eventlet, 'spawn',
+                               wraps=eventlet.spawn) as spawn:
+            self.assertEqual(300, self._invoke('countDown', [300]))
+        self.assertTrue(spawn.called)
+
+    def test_method_lock(self):
+        threads = [eventlet.spawn(self._invoke, 'exclusive', [tag])
+                   for tag in ('a', 'b')]
+        for thread in threads:
+            thread.wait()
+
+        self.assertEqual(['a', 'a', 'b', 'b'],
+                         self.obj.get_property('trace'))
+        stats = self.executor.lock_manager.stats()
+        self.assertEqual(1, stats['Recursive.exclusive']['contended'])
+
+
+HIERARCHY = {
+    'Base': """
+Name: Base
+Properties:
+  id:
+    Contract: $.string()
+    Default: base
+""",
+    'Left': """
+Name: Left
+Extends: Base
+Properties:
+  name:
+    Contract: $.string()
+    Usage: InOut
+Workflow:
+  rename:
+    Arguments:
+      - name:
+          Contract: $.string()
+    Body:
+      - $.name: $name
+      - $.counter: $name
+      - Return: [$.id, $.name, $.counter]
+""",
+    'Right': """
+Name: Right
+Extends: Base
+Properties:
+  name:
+    Contract: $.int()
+""",
+    'Diamond': """
+Name: Diamond
+Extends: [Left, Right]
+""",
+    'Leaf': """
+Name: Leaf
+Extends: Left
+Properties:
+  id:
+    Contract: $.string()
+    Default: leaf
+"""
+}
+
+
+class TestPropertyLayout(unittest.TestCase):
+    def _load(self, class_name):
+        return dsl_utils.load_model(
+            HIERARCHY, dsl_utils.new_object(class_name, 'obj'))
+
+    def test_layout_maps_properties_to_owners(self):
+        _, obj = self._load('Leaf')
+
+        self.assertEqual({'id': 'Leaf', 'name': 'Left'},
+                         obj.type.property_layout)
+
+    def test_inherited_property_access(self):
+        executor, obj = self._load('Leaf')
+
+        self.assertEqual(['leaf', 'x', 'x'],
+                         obj.type.invoke('rename', executor, obj, ['x']))
+        self.assertEqual('x', obj.get_property('name'))
+        self.assertEqual('leaf', obj.id)
+        self.assertEqual('x', obj.get_property('counter', obj.type))
+        self.assertRaises(AttributeError, obj.get_property, 'unknown')
+
+    def test_ambiguity_is_detected_at_class_build(self):
+        _, obj = self._load('Diamond')
+
+        self.assertEqual({'id': 'Base', 'name': None},
+                         obj.type.property_layout)
+        self.assertEqual('base', obj.id)
+        self.assertRaises(exceptions.AmbiguousPropertyName,
+                          obj.get_property, 'name')
+        self.assertRaises(exceptions.AmbiguousPropertyName,
+                          obj.set_property, 'name', 'x')
+
+    def test_layout_follows_added_properties(self):
+        _, obj = self._load('Leaf')
+        base = obj.type.parents[0].parents[0]
+        base.add_property('extra', base.get_property('id'))
+
+        self.assertEqual('Base', obj.type.property_layout['extra'])
+
+
+class TestObjectLayout(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            HIERARCHY, dsl_utils.new_object('Leaf', 'obj', name='me'))
+        self.left = self.obj.type.parents[0]
+        self.base = self.left.parents[0]
+
+    def test_single_instance_per_object(self):
+        self.assertFalse(hasattr(self.obj, '__dict__'))
+        self.assertEqual(['Leaf', 'Left', 'Base', 'io.murano.Object'],
+                         [cls.name for cls in
+                          self.obj.type.object_layout.hierarchy])
+
+    def test_cast_shares_storage(self):
+        base = self.obj.cast(self.base)
+
+        self.assertIs(base, self.obj.cast(self.base))
+        self.assertIs(base, self.obj.cast(self.left).cast(self.base))
+        self.assertEqual('obj', base.object_id)
+        self.assertEqual('base', base.id)
+        self.assertEqual('leaf', self.obj.id)
+        self.obj.set_property('name', 'you')
+        self.assertEqual('you', self.obj.cast(self.left).name)
+        self.assertRaises(TypeError, base.cast, self.left)
+
+    def test_to_dictionary(self):
+        self.assertEqual({'?': {'type': 'Leaf', 'id': 'obj'},
+                          'id': 'leaf', 'name': 'me'},
+                         self.obj.to_dictionary())
+        self.assertEqual({'?': {'type': 'Base', 'id': 'obj'}, 'id': 'base'},
+                         self.obj.cast(self.base).to_dictionary())
+
+    def test_internal_properties(self):
+        self.obj.set_property('counter', 1, self.left)
+
+        self.assertEqual(1, self.obj.get_property('counter', self.left))
+        self.assertEqual(1, self.obj.get_property('counter'))
+        self.assertRaises(AttributeError, self.obj.cast(self.base).
+                          get_property, 'counter')
+        self.assertRaises(AttributeError, self.obj.cast(self.base).
+                          set_property, 'counter', 2, self.left)
+        self.assertEqual(1, self.obj.to_dictionary(True)['counter'])
+        self.assertNotIn('counter', self.obj.to_dictionary())
+
+
+MACROS = {
+    'Selector': """
+Name: Selector
+Workflow:
+  match:
+    Arguments:
+      - value:
+          Contract: $
+    Body:
+      - $result: null
+      - Match:
+          1:
+            - $result: one
+          two:
+            - $result: 2
+        Value: $value
+        Default:
+          - $result: default
+      - Return: $result
+  switch:
+    Arguments:
+      - value:
+          Contract: $.int()
+    Body:
+      - Switch:
+          $value > 1:
+            - Return: big
+          $value < 0 - 1:
+            - Return: negative
+        Default:
+          - Return: small
+"""
+}
+
+
+class TestMacros(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            MACROS, dsl_utils.new_object('Selector', 'obj'))
+
+    def _invoke(self, name, value):
+        return self.obj.type.invoke(name, self.executor, self.obj, [value])
+
+    def test_match(self):
+        self.assertEqual('one', self._invoke('match', 1))
+        self.assertEqual(2, self._invoke('match', 'two'))
+        self.assertEqual('default', self._invoke('match', 3))
+        self.assertEqual('default', self._invoke('match', [1]))
+
+    def test_switch(self):
+        self.assertEqual('small', self._invoke('switch', 0))
+        self.assertEqual('big', self._invoke('switch', 5))
+        self.assertEqual('negative', self._invoke('switch', -5))
+
+    def test_macro_dispatch(self):
+        condition = YaqlExpression('$value > 1')
+
+        self.assertIsInstance(expressions.parse_expression(
+            {'If': condition, 'Then': []}), macros.IfMacro)
+        self.assertIsInstance(expressions.parse_expression(
+            {'If': condition, 'Then': [], 'Else': []}), macros.IfMacro)
+        self.assertIsInstance(expressions.parse_expression(
+            {'While': condition, 'Do': []}), macros.WhileDoMacro)
+        self.assertIsInstance(expressions.parse_expression(
+            {'Do': []}), macros.DoMacro)
+        self.assertRaises(SyntaxError, expressions.parse_expression,
+                          {'Do': [], 'Unknown': 1})
+        self.assertRaises(SyntaxError, expressions.parse_expression,
+                          {'If': 'not an expression', 'Then': []})
+
+
+NODES = {
+    'Node': """
+Name: Node
+Properties:
+  children:
+    Contract: [$.class(Node)]
+    Default: []
+  link:
+    Contract: $.class(Node)
+  links:
+    Contract: [$.class(Node)]
+    Default: []
+"""
+}
+
+
+class TestResultsSerializer(unittest.TestCase):
+    def setUp(self):
+        model = dsl_utils.new_object('Node', 'root', children=[
+            dsl_utils.new_object('Node', 'a', link='b', links=['b']),
+            dsl_utils.new_object('Node', 'b')])
+        model['?']['_position'] = 1
+        self.executor, self.root = dsl_utils.load_model(NODES, model)
+
+    def _node(self, object_id, **properties):
+        result = {'children': [], 'link': None, 'links': []}
+        result.update(properties)
+        result['?'] = {'id': object_id, 'type': 'Node'}
+        return result
+
+    def test_serialize(self):
+        orphan = self.root.type.new(None, self.executor.object_store, None,
+                                    object_id='orphan')
+        node = self.executor.object_store.get('a')
+        node.set_property('links', [orphan, 'b'])
+        self.root.set_property('link', orphan)
+
+        result = results_serializer.serialize(self.root, self.executor)
+
+        expected = self._node('root', children=[
+            self._node('a', link='b', links=['b']), self._node('b')])
+        self.assertEqual(expected, result['ObjectsCopy'])
+        expected['?']['_position'] = 1
+        self.assertEqual(expected, result['Objects'])
+        self.assertIsNot(result['Objects']['children'][0],
+                         result['ObjectsCopy']['children'][0])
+
+    def test_serialize_none(self):
+        self.assertEqual(
+            {'Objects': None, 'ObjectsCopy': None, 'Attributes': []},
+            results_serializer.serialize(None, self.executor))
+
+
+GARBAGE = {
+    'Root': """
+Name: Root
+Properties:
+  children:
+    Contract: [$.class(Child)]
+    Default: []
+  removed:
+    Contract: [$.string()]
+    Usage: InOut
+    Default: []
+  loaded:
+    Contract: [$.string()]
+    Usage: InOut
+    Default: []
+Workflow:
+  markRemoved:
+    Arguments:
+      - name:
+          Contract: $.string()
+    Body:
+      - $.removed: $.removed + list($name)
+  markLoaded:
+    Arguments:
+      - name:
+          Contract: $.string()
+    Body:
+      - $.loaded: $.loaded + list($name)
+""",
+    'Child': """
+Name: Child
+Properties:
+  name:
+    Contract: $.string()
+  peer:
+    Contract: $.class(Child)
+  sub:
+    Contract: $.class(Child)
+Workflow:
+  initialize:
+    Body:
+      - $.find(Root).require().markLoaded($.name)
+  destroy:
+    Body:
+      - $.find(Root).require().markRemoved($.name)
+"""
+}
+
+
+class TestGarbageCollection(unittest.TestCase):
+    def _child(self, name, **properties):
+        return dsl_utils.new_object('Child', name, name=name, **properties)
+
+    def _model(self, *children):
+        return dsl_utils.new_object('Root', 'root', children=list(children))
+
+    def test_destroy_deleted_objects(self):
+        objects_copy = self._model(
+            self._child('a', peer='b', sub=self._child('d')),
+            self._child('b', peer='c'), self._child('c'), self._child('e'))
+        loader = dsl_utils.TestClassLoader(GARBAGE)
+        dsl_executor = executor.MuranoDslExecutor(loader)
+        stores = []
+
+        def create_store(*args):
+            store = store_class(*args)
+            stores.append(store)
+            return store
+
+        store_class = object_store.ObjectStore
+        with mock.patch.object(object_store, 'ObjectStore',
+                               side_effect=create_store):
+            root = dsl_executor.load({
+                'Objects': self._model(self._child('c'), self._child('e')),
+                'ObjectsCopy': objects_copy
+            })
+
+        # deleted objects are initialized and destroyed with copies of the
+        # objects of the current model, objects they do not depend on are
+        # not loaded
+        gc_store = stores[0]
+        gc_root = gc_store.get('root')
+        self.assertEqual(['d', 'a', 'b'], gc_root.get_property('removed'))
+        self.assertEqual(['a', 'b', 'c', 'd'],
+                         sorted(gc_root.get_property('loaded')))
+        self.assertFalse(gc_store.has('e'))
+        self.assertIsNot(root, gc_root)
+        self.assertEqual([], root.get_property('removed'))
+        self.assertEqual(['c', 'e'], sorted(root.get_property('loaded')))
+        self.assertFalse(dsl_executor.object_store.has('a'))
+
+    def test_nothing_deleted(self):
+        model = self._model(self._child('a'), self._child('b'))
+        dsl_executor, root = dsl_utils.load_model(GARBAGE, model)
+
+        with mock.patch.object(object_store, 'ObjectStore') as store:
+            dsl_executor.cleanup({'ObjectsCopy': self._model(
+                self._child('a'), self._child('b'))})
+        self.assertFalse(store.called)
+
+
+ITEMS = {
+    'Item': """
+Name: Item
+Properties:
+  ref:
+    Contract: $.class(Item)
+  items:
+    Contract: [$.class(Item)]
+    Default: []
+  readyItems:
+    Contract: $.int()
+    Usage: Runtime
+  initialized:
+    Contract: $.int()
+    Usage: Runtime
+    Default: 0
+Workflow:
+  initialize:
+    Body:
+      - $.readyItems: len(list($.items.where($.initialized > 0)))
+      - $.initialized: $.initialized + 1
+"""
+}
+
+
+class TestModelLoading(unittest.TestCase):
+    def _item(self, object_id, **properties):
+        return dsl_utils.new_object('Item', object_id, **properties)
+
+    def test_forward_references(self):
+        model = self._item('root', ref='b', items=[
+            self._item('a', ref='b'),
+            self._item('b', ref='a', items=[self._item('c')])])
+        dsl_executor, root = dsl_utils.load_model(ITEMS, model)
+        store = dsl_executor.object_store
+
+        self.assertIs(store.get('b'), root.get_property('ref'))
+        self.assertIs(store.get('b'), store.get('a').get_property('ref'))
+        self.assertIs(store.get('a'), store.get('b').get_property('ref'))
+
+    def test_initialize_order(self):
+        model = self._item('root', items=[
+            self._item('a'), self._item('b', items=[self._item('c')])])
+        dsl_executor, root = dsl_utils.load_model(ITEMS, model)
+        store = dsl_executor.object_store
+
+        for object_id, ready_items in (('root', 2), ('b', 1), ('c', 0)):
+            obj = store.get(object_id)
+            self.assertEqual(1, obj.get_property('initialized'))
+            self.assertEqual(ready_items, obj.get_property('readyItems'))
+
+    def test_missing_reference(self):
+        model = self._item('root', items=[self._item('a', ref='missing')])
+        self.assertRaises(TypeError, dsl_utils.load_model, ITEMS, model)
+
+
+DEFAULTS = {
+    'Server': """
+Name: Server
+Properties:
+  hostname:
+    Contract: $.string()
+    Default: $.name
+  name:
+    Contract: $.string().notNull()
+  port:
+    Contract: $.int()
+    Default: 8080
+  networks:
+    Contract:
+      useFlatNetwork: $.bool().notNull()
+      customNetworks: [$.string()]
+    Default:
+      useFlatNetwork: false
+      customNetworks: []
+"""
+}
+
+
+class TestPropertyDefaults(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            DEFAULTS, dsl_utils.new_object('Server', 'obj', name='web'))
+
+    def _new(self, **kwargs):
+        obj = self.obj.type.new(None, self.executor.object_store,
+                                self.executor._root_context)
+        obj.initialize(**kwargs)
+        return obj
+
+    def test_initialization_plan(self):
+        plan = self.obj.type.object_layout.initialization_plan
+
+        self.assertEqual('hostname', plan[-1][0])
+        self.assertEqual(set(['name', 'port', 'networks']),
+                         set(name for name, _ in plan[:-1]))
+
+    def test_defaults(self):
+        self.assertEqual('web', self.obj.get_property('hostname'))
+        self.assertEqual(8080, self.obj.get_property('port'))
+        self.assertEqual({'useFlatNetwork': False, 'customNetworks': []},
+                         self.obj.get_property('networks'))
+
+    def test_given_values(self):
+        obj = self._new(name='db', hostname='db.local', port=5432)
+
+        self.assertEqual('db.local', obj.get_property('hostname'))
+        self.assertEqual(5432, obj.get_property('port'))
+
+    def test_constant_defaults_are_not_shared(self):
+        self.obj.get_property('networks')['customNetworks'].append('net')
+
+        self.assertEqual([], self._new(name='db').get_property(
+            'networks')['customNetworks'])
+
+
+class TestContexts(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            DEFAULTS, dsl_utils.new_object('Server', 'obj', name='web'))
+
+    def test_root_context_is_shared(self):
+        other, _ = dsl_utils.load_model(
+            DEFAULTS, dsl_utils.new_object('Server', 'obj', name='db'))
+
+        shared = self.executor._root_context.parent_context
+        self.assertIs(shared, other._root_context.parent_context)
+        self.assertTrue(shared.get_functions('new', 2))
+        self.assertRaises(RuntimeError, shared.set_data, 1, 'key')
+        self.assertRaises(RuntimeError, shared.register_function,
+                          lambda: None, 'function')
+
+    def test_call_context_holds_only_data(self):
+        first = self.executor._create_context(
+            self.obj, self.obj.type, None, value=1)
+        second = self.executor._create_context(
+            self.obj, self.obj.type, None)
+
+        self.assertEqual({}, first.functions)
+        self.assertIs(first.parent_context, second.parent_context)
+        self.assertEqual(1, first.get_data('$value'))
+        self.assertIs(self.obj.type, second.get_data('$?type'))
+        self.assertEqual('web', YaqlExpression('$.name').evaluate(second))
+
+
+ASSIGNMENTS = {
+    'Settings': """
+Name: Settings
+Properties:
+  settings:
+    Contract:
+      port: $.int().notNull()
+    Usage: InOut
+    Default:
+      port: 80
+  names:
+    Contract: [$.string()]
+    Usage: InOut
+    Default: [a, b]
+Workflow:
+  setPort:
+    Arguments:
+      - port:
+          Contract: $
+    Body:
+      - $.settings.port: $port
+  setName:
+    Arguments:
+      - index:
+          Contract: $.int()
+      - name:
+          Contract: $.string()
+    Body:
+      - $.names[1]: $name
+      - $.names[$index]: $name.toUpper()
+  local:
+    Body:
+      - $data: {values: [1, 2]}
+      - $data.values[0]: 3
+      - Return: $data
+"""
+}
+
+
+class TestAssignment(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            ASSIGNMENTS, dsl_utils.new_object('Settings', 'obj'))
+
+    def _invoke(self, name, args):
+        return self.obj.type.invoke(name, self.executor, self.obj, args)
+
+    def test_compile(self):
+        self.assertEqual(('$', ('names', 1)),
+                         lhs_expression._compile(
+                             YaqlExpression('$.names[1]').parsed_expression))
+        self.assertEqual(('$data', ()), lhs_expression._compile(
+            YaqlExpression('$data').parsed_expression))
+        path, keys = lhs_expression._compile(
+            YaqlExpression('$.names[$index]').parsed_expression)
+        self.assertEqual(('$', 'names'), (path, keys[0]))
+        self.assertIsInstance(keys[1], yaql.expressions.Expression)
+        self.assertIsNone(lhs_expression._compile(
+            YaqlExpression('len($.names)').parsed_expression))
+
+    def test_object_property(self):
+        self._invoke('setPort', ['8080'])
+
+        self.assertEqual({'port': 8080}, self.obj.get_property('settings'))
+
+    def test_item_is_validated_without_property(self):
+        with mock.patch.object(murano_object.MuranoObject,
+                               'set_property') as set_property:
+            self._invoke('setName', [0, 'c'])
+
+        self.assertFalse(set_property.called)
+        self.assertEqual(['C', 'c'], self.obj.get_property('names'))
+
+    def test_invalid_value_is_rolled_back(self):
+        self.assertRaises(Exception, self._invoke, 'setPort', ['http'])
+
+        self.assertEqual({'port': 80}, self.obj.get_property('settings'))
+
+    def test_static_and_dynamic_indexes(self):
+        self._invoke('setName', [0, 'c'])
+
+        self.assertEqual(['C', 'c'], self.obj.get_property('names'))
+
+    def test_local_variable(self):
+        self.assertEqual({'values': [3, 2]}, self._invoke('local', []))
+
+
+PARALLEL = {
+    'Worker': """
+Name: Worker
+Properties:
+  trace:
+    Contract: [$.int()]
+    Usage: InOut
+    Default: []
+Workflow:
+  add:
+    Arguments:
+      - value:
+          Contract: $.int()
+    Body:
+      - sleep(0)
+      - $.trace: $.trace + list($value)
+  run:
+    Body:
+      - Parallel:
+          - $.add(1)
+          - $.add(2)
+          - $.add(3)
+        Limit: 2
+  select:
+    Body:
+      - Return: list(1, 2, 3).pselect($ * 2)
+  fail:
+    Body:
+      - Parallel:
+          - $.add(1)
+          - $.add(text)
+"""
+}
+
+
+class TestParallelExecution(unittest.TestCase):
+    def setUp(self):
+        self.executor, self.obj = dsl_utils.load_model(
+            PARALLEL, dsl_utils.new_object('Worker', 'obj'))
+
+    def _invoke(self, name):
+        return self.obj.type.invoke(name, self.executor, self.obj, [])
+
+    def test_parallel(self):
+        self._invoke('run')
+
+        self.assertEqual([1, 2, 3], sorted(self.obj.get_property('trace')))
+        self.assertEqual(
+            3, self.executor.parallel_scheduler.stats()['started'])
+
+    def test_pselect(self):
+        self.assertEqual([2, 4, 6], self._invoke('select'))
+
+    def test_errors_are_raised(self):
+        self.assertRaises(yaql.exceptions.YaqlExecutionException,
+                          self._invoke, 'fail')
+        self.assertEqual([1], self.obj.get_property('trace'))
@@ -13,7 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+import os
 import re
+import shutil
+import tempfile
 
 import mock
 import unittest2 as unittest
@@ -21,11 +25,15 @@ import yaql
 
 import muranoapi.dsl.exceptions as exceptions
 import muranoapi.dsl.helpers as helpers
+import muranoapi.dsl.lhs_expression as lhs_expression
 import muranoapi.dsl.murano_class as murano_class
 import muranoapi.dsl.murano_object as murano_object
 import muranoapi.dsl.namespace_resolver as ns_resolver
 import muranoapi.dsl.typespec as typespec
 import muranoapi.dsl.yaql_expression as yaql_expression
+import muranoapi.engine.system.agent as agent
+import muranoapi.engine.system.resource_manager as resource_manager
+import muranoapi.engine.system.yaql_functions as system_functions
 
 ROOT_CLASS = 'io.murano.Object'
 
@@ -227,9 +235,8 @@ class TestClassesManipulation(unittest.TestCase):
 class TestObjectsManipulation(unittest.TestCase):
     def setUp(self):
         self.resolver = mock.Mock(resolve_name=lambda name: name)
-        self.cls = mock.Mock()
-        self.cls.name = ROOT_CLASS
-        self.cls.parents = []
+        self.cls = murano_class.MuranoClass(None, self.resolver, ROOT_CLASS,
+                                            None)
 
     def test_object_valid_type_instantiation(self):
         obj = murano_object.MuranoObject(self.cls, None, None, None)
@@ -246,15 +253,16 @@ class TestObjectsManipulation(unittest.TestCase):
         root = murano_class.MuranoClass(None, self.resolver, ROOT_CLASS, None)
         cls = murano_class.MuranoClass(None, self.resolver,
                                        'SomeClass', None, [root])
-        root.new = mock.Mock()
-        init_kwargs = {'theArg': 0}
-        obj = murano_object.MuranoObject(cls, None, None, None)
-        expected_calls = [mock.call().initialize(**init_kwargs)]
+        root.add_property('theArg', typespec.PropertySpec(
+            {'Contract': yaql_expression.YaqlExpression('$')}, self.resolver))
+        obj = murano_object.MuranoObject(cls, None, None,
+                                         yaql.create_context())
 
-        obj.initialize(**init_kwargs)
+        obj.initialize(theArg=0)
 
-        # each object should also initialize his parent objects
-        self.assertEqual(expected_calls, root.new.mock_calls[1:])
+        # properties of parent classes are stored in the object itself
+        self.assertEqual(0, obj.get_property('theArg'))
+        self.assertEqual(0, obj.cast(root).get_property('theArg'))
 
     def test_object_id(self):
         _id = 'some_id'
@@ -336,7 +344,6 @@ class TestObjectsManipulation(unittest.TestCase):
     def test_set_undeclared_property_as_internal(self):
         cls = murano_class.MuranoClass(None, self.resolver, ROOT_CLASS, None)
         obj = cls.new(None, None, None, {})
-        obj.cast = mock.Mock(return_value=obj)
         prop_value = 10
 
         obj.set_property('internalProp', prop_value, caller_class=cls)
@@ -451,8 +458,51 @@ class TestHelperFunctions(unittest.TestCase):
         self.assertTrue(testee({'label': yaql_expr}))
         self.assertTrue(testee([yaql_expr]))
 
+    def test_evaluation_plan(self):
+        yaql_value = mock.Mock(spec=yaql_expression.YaqlExpression,
+                               evaluate=lambda context: 'atom')
+        complex_value = {yaql_value: ['some', (1, yaql_value), lambda: 'hi!'],
+                         'sample': [yaql_value, xrange(5)],
+                         'constant': {'list': [1, 2.5, None], 'tuple': (1,)}}
+
+        plan = helpers.EvaluationPlan(complex_value)
+
+        self.assertFalse(plan.constant)
+        self.assertEqual(helpers.evaluate(complex_value, None), plan(None))
+
+    def test_constant_evaluation_plan(self):
+        value = {'Resources': {'name': [u'value', 1, True, None, (1, 2)]}}
+
+        plan = helpers.EvaluationPlan(value)
+        result = plan(None)
+
+        self.assertTrue(plan.constant)
+        self.assertEqual(value, result)
+        self.assertIsNot(value['Resources'], result['Resources'])
+        self.assertIsNot(result['Resources'], plan(None)['Resources'])
+
+    def test_constant_subclasses(self):
+        class Dict(dict):
+            pass
+
+        class List(list):
+            pass
+
+        value = {'dict': Dict(a=1), 'list': List([1, 2])}
+
+        plan = helpers.EvaluationPlan(value)
+
+        self.assertEqual(value, plan(None))
+        self.assertIsNot(value['list'], plan(None)['list'])
+
 
 class TestYaqlExpression(unittest.TestCase):
+    def setUp(self):
+        yaql_expression.clear_cache()
+
+    def tearDown(self):
+        yaql_expression.clear_cache()
+
     def test_expression(self):
         yaql_expr = yaql_expression.YaqlExpression('string')
 
@@ -483,3 +533,144 @@ class TestYaqlExpression(unittest.TestCase):
         with mock.patch('yaql.parse') as parse_mock:
             parse_mock.side_effect = yaql.exceptions.YaqlLexicalException
             self.assertFalse(expr.match(''))
+
+    def test_parsed_expressions_are_shared(self):
+        expr1 = yaql_expression.YaqlExpression('$.name')
+        expr2 = yaql_expression.YaqlExpression('$.name')
+
+        self.assertIs(expr1._parsed_expression, expr2._parsed_expression)
+        self.assertEqual(1, yaql_expression.cache_stats()['misses'])
+        self.assertEqual(1, yaql_expression.cache_stats()['hits'])
+
+    def test_lhs_expression_uses_cache(self):
+        expr = yaql_expression.YaqlExpression('$.name')
+        lhs_expression.LhsExpression('$.name')
+
+        with mock.patch('yaql.parse') as mock_parse:
+            lhs = lhs_expression.LhsExpression('$.name')
+
+        self.assertFalse(mock_parse.called)
+        self.assertIs(expr._parsed_expression, lhs._expression)
+
+    def test_match_rejects_non_lexical_strings_without_parsing(self):
+        with mock.patch('yaql.parse') as mock_parse:
+            self.assertFalse(yaql_expression.YaqlExpression.match(
+                '%RABBITMQ_HOST%'))
+            self.assertFalse(yaql_expression.YaqlExpression.match(
+                'format(\'{0}\', $.name'))
+
+        self.assertFalse(mock_parse.called)
+
+    def test_matched_expression_is_parsed_once(self):
+        with mock.patch('yaql.parse') as mock_parse:
+            self.assertTrue(yaql_expression.YaqlExpression.match(
+                "format('{0}-PublicIp', $.name)"))
+            yaql_expression.YaqlExpression("format('{0}-PublicIp', $.name)")
+
+        self.assertEqual(1, mock_parse.call_count)
+
+
+class TestBind(unittest.TestCase):
+    def setUp(self):
+        self.template = {
+            'Resources': {
+                '$name': {
+                    'Properties': {
+                        'Flavor': '$flavor',
+                        'Name': '$prefix-{name}-{index}',
+                        'Networks': [{'Port': '$port'}, 'static']
+                    }
+                }
+            },
+            'Outputs': {'static': {'Value': 1}}
+        }
+        self.mappings = {'name': 'server', 'flavor': 'm1.small',
+                         'port': 'port1', 'index': 1, 'missing': None}
+
+    def test_bind(self):
+        self.assertEqual({
+            'Resources': {
+                'server': {
+                    'Properties': {
+                        'Flavor': 'm1.small',
+                        'Name': 'prefix-server-1',
+                        'Networks': [{'Port': 'port1'}, 'static']
+                    }
+                }
+            },
+            'Outputs': {'static': {'Value': 1}}
+        }, system_functions._transform_json(self.template, self.mappings))
+        self.assertEqual('$missing', system_functions._transform_json(
+            '$missing', self.mappings))
+        self.assertRaises(KeyError, system_functions._transform_json,
+                          ['$unknown'], self.mappings)
+
+    def test_results_do_not_share_containers(self):
+        first = system_functions._transform_json(
+            self.template, self.mappings)
+        second = system_functions._transform_json(
+            self.template, self.mappings)
+
+        first['Outputs']['static']['Value'] = 2
+        first['Resources']['server']['Properties']['Networks'].append('new')
+        self.assertEqual({'static': {'Value': 1}}, self.template['Outputs'])
+        self.assertEqual({'static': {'Value': 1}}, second['Outputs'])
+        self.assertEqual([{'Port': 'port1'}, 'static'], second['Resources'][
+            'server']['Properties']['Networks'])
+        self.assertEqual('$flavor', self.template['Resources']['$name'][
+            'Properties']['Flavor'])
+
+    def test_same_resource_is_compiled_once(self):
+        path = os.path.join(tempfile.mkdtemp(), 'server.template')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, 'w') as template_file:
+            json.dump(self.template, template_file)
+        resources = object.__new__(resource_manager.ResourceManager)
+        resources._package = mock.Mock()
+        resources._package.get_resource.return_value = path
+
+        first = system_functions._transform_json(
+            resources.json('server.template'), self.mappings)
+        with mock.patch.object(system_functions,
+                               '_compile_template') as compile_template:
+            second = system_functions._transform_json(
+                resources.json('server.template'), self.mappings)
+
+        self.assertFalse(compile_template.called)
+        self.assertEqual(first, second)
+        first['Outputs']['static']['Value'] = 2
+        self.assertEqual({'static': {'Value': 1}}, second['Outputs'])
+
+    def test_template_is_compiled_once(self):
+        system_functions._transform_json(self.template, self.mappings)
+
+        with mock.patch.object(system_functions,
+                               '_compile_template') as compile_template:
+            self.mappings['name'] = 'db'
+            result = system_functions._transform_json(
+                self.template, self.mappings)
+
+        self.assertFalse(compile_template.called)
+        self.assertEqual(['db'], result['Resources'].keys())
+
+
+class TestAgentPlan(unittest.TestCase):
+    def test_template_is_not_modified(self):
+        template = {
+            'FormatVersion': '2.0.0',
+            'Scripts': {
+                'deploy': {'EntryPoint': 'deploy.sh', 'Files': ['<lib.bin>']}
+            }
+        }
+        resources = mock.Mock()
+        resources.string.return_value = 'body'
+
+        plan = object.__new__(agent.Agent).buildExecutionPlan(
+            template, resources)
+
+        self.assertEqual({'deploy': {'EntryPoint': 'deploy.sh',
+                                     'Files': ['<lib.bin>']}},
+                         template['Scripts'])
+        self.assertNotIn('Files', template)
+        self.assertEqual(2, len(plan['Files']))
+        self.assertIn(plan['Scripts']['deploy']['EntryPoint'], plan['Files'])
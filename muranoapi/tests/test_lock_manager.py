@@ -0,0 +1,105 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import unittest2 as unittest
+
+from muranoapi.dsl import exceptions
+from muranoapi.dsl import lock_manager
+
+
+class TestLockManager(unittest.TestCase):
+    def setUp(self):
+        self.locks = lock_manager.LockManager()
+        self.order = []
+
+    def _locked(self, key, owner, name='lock'):
+        self.locks.acquire(key, owner, name)
+        self.order.append(owner)
+        eventlet.sleep(0)
+        self.locks.release(key, owner)
+
+    def test_reentrant(self):
+        self.locks.acquire('key', 1)
+        self.locks.acquire('key', 1)
+        self.locks.release('key', 1)
+        self.assertTrue(self.locks.is_locked('key'))
+        self.locks.release('key', 1)
+        self.assertFalse(self.locks.is_locked('key'))
+
+    def test_release_by_other_owner(self):
+        self.locks.acquire('key', 1)
+        self.assertRaises(RuntimeError, self.locks.release, 'key', 2)
+
+    def test_fifo_order(self):
+        self.locks.acquire('key', 0)
+        threads = [eventlet.spawn(self._locked, 'key', owner)
+                   for owner in range(1, 5)]
+        eventlet.sleep(0)
+        self.locks.release('key', 0)
+        for thread in threads:
+            thread.wait()
+
+        self.assertEqual([1, 2, 3, 4], self.order)
+        self.assertFalse(self.locks.is_locked('key'))
+
+    def test_stats(self):
+        self.locks.acquire('key', 0, 'busy')
+        thread = eventlet.spawn(self._locked, 'key', 1, 'busy')
+        eventlet.sleep(0)
+        self.locks.release('key', 0)
+        thread.wait()
+        self._locked('other', 0, 'idle')
+
+        stats = self.locks.stats()
+        self.assertEqual(['busy'], stats.keys())
+        self.assertEqual(2, stats['busy']['acquired'])
+        self.assertEqual(1, stats['busy']['contended'])
+        self.assertEqual(1, sum(stats['busy']['histogram'].values()))
+
+    def test_deadlock_detection(self):
+        self.locks.acquire('a', 1, 'A.first')
+        self.locks.acquire('b', 2, 'B.second')
+        thread = eventlet.spawn(self.locks.acquire, 'b', 1, 'B.second')
+        eventlet.sleep(0)
+
+        self.assertRaises(exceptions.DeadlockDetected,
+                          self.locks.acquire, 'a', 2, 'A.first')
+        self.locks.release('b', 2)
+        thread.wait()
+        self.locks.release('b', 1)
+        self.locks.release('a', 1)
+        self.assertFalse(self.locks.is_locked('a'))
+        self.assertFalse(self.locks.is_locked('b'))
+
+    def test_acquire_after_hand_off(self):
+        self.locks.acquire('key', 0)
+        thread = eventlet.spawn(self._locked, 'key', 1)
+        eventlet.sleep(0)
+        self.locks.release('key', 0)
+        # the lock is handed to 1, which has not been resumed yet
+        self._locked('key', 0)
+        thread.wait()
+
+        self.assertEqual([1, 0], self.order)
+
+    def test_killed_waiter(self):
+        self.locks.acquire('key', 0)
+        thread = eventlet.spawn(self.locks.acquire, 'key', 1)
+        eventlet.sleep(0)
+        thread.kill()
+        self.locks.release('key', 0)
+
+        self.assertFalse(self.locks.is_locked('key'))
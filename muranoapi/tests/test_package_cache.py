@@ -0,0 +1,224 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+
+import mock
+from muranoclient.common import exceptions as muranoclient_exc
+import unittest2 as unittest
+
+from muranoapi.engine import package_cache
+from muranoapi.engine import package_loader
+from muranoapi.packages import application_package as app_pkg
+from muranoapi.packages import exceptions as pkg_exc
+
+META_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                        'meta', 'io.murano')
+
+
+def _archive(**files):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as archive:
+        for name, content in files.iteritems():
+            archive.writestr(name, content)
+    return data.getvalue()
+
+
+class TestPackageCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = package_cache.PackageCache(self.directory, 1000, 0)
+        self.download = mock.Mock(return_value=_archive(manifest='a' * 100))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _read(self, path):
+        with open(os.path.join(path, 'manifest')) as manifest:
+            return manifest.read()
+
+    def test_package_is_downloaded_once(self):
+        path = self.cache.get('pkg', 'v1', self.download)
+        self.assertEqual('a' * 100, self._read(path))
+
+        other_cache = package_cache.PackageCache(self.directory, 1000, 0)
+        self.assertEqual(path, other_cache.get('pkg', 'v1', self.download))
+        self.assertEqual(1, self.download.call_count)
+        self.assertEqual(1, other_cache.stats()['hits'])
+
+    def test_updated_package_is_downloaded_again(self):
+        path = self.cache.get('pkg', 'v1', self.download)
+        self.download.return_value = _archive(manifest='b')
+
+        new_path = self.cache.get('pkg', 'v2', self.download)
+        self.assertEqual('b', self._read(new_path))
+        self.assertNotEqual(path, new_path)
+        self.assertEqual(2, self.download.call_count)
+
+    def test_same_content_is_stored_once(self):
+        path = self.cache.get('pkg', 'v1', self.download)
+
+        self.assertEqual(path, self.cache.get('pkg', 'v2', self.download))
+        self.assertEqual(path, self.cache.get('copy', 'v1', self.download))
+        self.assertEqual(
+            1, len(os.listdir(os.path.join(self.directory, 'blobs'))))
+
+    def test_invalidate_replaces_damaged_content(self):
+        path = self.cache.get('pkg', 'v1', self.download)
+        os.remove(os.path.join(path, 'manifest'))
+        self.cache.release(path)
+
+        self.cache.invalidate('pkg')
+        new_path = self.cache.get('pkg', 'v1', self.download)
+        self.assertNotEqual(path, new_path)
+        self.assertEqual('a' * 100, self._read(new_path))
+        self.assertEqual(2, self.download.call_count)
+
+        other_cache = package_cache.PackageCache(self.directory, 1000, 0)
+        self.assertEqual(new_path,
+                         other_cache.get('pkg', 'v1', self.download))
+
+    def test_invalidate_keeps_content_for_other_processes(self):
+        path = self.cache.get('pkg', 'v1', self.download)
+        self.cache.release(path)
+        # a task of another worker process still reads the package
+        other_cache = package_cache.PackageCache(self.directory, 1000)
+        self.assertEqual(path, other_cache.get('pkg', 'v1', self.download))
+
+        self.cache.invalidate('pkg')
+        self.assertEqual('a' * 100, self._read(path))
+        self.cache.get('pkg', 'v1', self.download)
+        self.assertEqual('a' * 100, self._read(path))
+        self.assertEqual(2, self.download.call_count)
+
+    def test_invalid_archive(self):
+        self.download.return_value = 'not a zip'
+        self.assertRaises(pkg_exc.PackageFormatError, self.cache.get,
+                          'pkg', 'v1', self.download)
+        self.assertEqual([], os.listdir(os.path.join(self.directory, 'tmp')))
+
+    def test_lru_eviction(self):
+        cache = package_cache.PackageCache(self.directory, 1300, 0)
+        paths = []
+        for index in range(3):
+            self.download.return_value = _archive(
+                manifest=str(index) * 400)
+            paths.append(cache.get(str(index), 'v1', self.download))
+            cache.release(paths[-1])
+            os.utime(paths[-1], (index, index))
+        # package 0 becomes the most recently used one
+        cache.release(cache.get('0', 'v1', self.download))
+
+        self.download.return_value = _archive(manifest='3' * 400)
+        cache.get('3', 'v1', self.download)
+
+        self.assertTrue(os.path.isdir(paths[0]))
+        self.assertFalse(os.path.isdir(paths[1]))
+        self.assertTrue(os.path.isdir(paths[2]))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_recently_used_packages_are_kept(self):
+        cache = package_cache.PackageCache(self.directory, 100, 3600)
+        for index in range(3):
+            self.download.return_value = _archive(manifest=str(index) * 400)
+            cache.release(cache.get(str(index), 'v1', self.download))
+
+        self.assertEqual(
+            3, len(os.listdir(os.path.join(self.directory, 'blobs'))))
+
+    def test_concurrent_downloads_are_deduplicated(self):
+        def download():
+            time.sleep(0.1)
+            return _archive(manifest='a')
+
+        def get():
+            cache = package_cache.PackageCache(self.directory, 1000)
+            results.append(cache.get('pkg', 'v1', download))
+
+        download = mock.Mock(side_effect=download)
+        results = []
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, download.call_count)
+        self.assertEqual(1, len(set(results)))
+
+
+class TestApiPackageLoader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = package_cache.PackageCache(self.directory, 1 << 30)
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, 'w') as archive:
+            app_pkg._zipdir(META_DIR, archive)
+        self.client = mock.Mock()
+        self.client.packages.download.return_value = data.getvalue()
+        self.package_def = mock.Mock(
+            id='pkg', fully_qualified_name='io.murano', updated='v1')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _load(self):
+        with mock.patch.object(package_loader.ApiPackageLoader,
+                               '_get_murano_client',
+                               return_value=self.client):
+            with package_loader.ApiPackageLoader(
+                    None, None, self.cache) as loader:
+                return loader._get_package_by_definition(self.package_def)
+
+    def test_damaged_package_is_downloaded_again(self):
+        package = self._load()
+        os.remove(os.path.join(package._source_directory, 'manifest.yaml'))
+
+        package = self._load()
+        self.assertEqual('io.murano', package.full_name)
+        self.assertEqual(2, self.client.packages.download.call_count)
+        self.assertEqual(0, self.cache.stats()['pinned'])
+
+    def test_package_version_is_queried_once(self):
+        self.client.packages.filter.return_value = [self.package_def]
+        with mock.patch.object(package_loader.ApiPackageLoader,
+                               '_get_murano_client',
+                               return_value=self.client):
+            with package_loader.ApiPackageLoader(
+                    None, None, self.cache) as loader:
+                self.assertEqual('pkg@v1',
+                                 loader.get_package_version('io.murano'))
+                self.assertEqual('pkg@v1',
+                                 loader.get_package_version('io.murano'))
+        self.assertEqual(1, self.client.packages.filter.call_count)
+        self.assertFalse(self.client.packages.download.called)
+
+    def test_failed_download_keeps_cached_package(self):
+        package = self._load()
+        self.package_def.updated = 'v2'
+        self.client.packages.download.side_effect = \
+            muranoclient_exc.HTTPException()
+
+        with mock.patch.object(self.cache, 'invalidate') as invalidate:
+            self.assertRaises(pkg_exc.PackageLoadError, self._load)
+        self.assertFalse(invalidate.called)
+        self.assertTrue(os.path.isfile(
+            os.path.join(package._source_directory, 'manifest.yaml')))
@@ -0,0 +1,119 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import unittest2 as unittest
+
+from muranoapi.dsl import exceptions
+from muranoapi.engine import package_class_loader
+
+ROOT_CLASS = 'io.murano.Object'
+
+
+class FakePackage(object):
+    def __init__(self, full_name, classes):
+        self.full_name = full_name
+        self._classes = classes
+
+    def get_class(self, name):
+        return self._classes[name]
+
+
+class FakePackageLoader(object):
+    def __init__(self, packages, versions):
+        self._packages = packages
+        self._versions = versions
+
+    def get_package_by_class(self, name):
+        for package in self._packages:
+            if name in package._classes:
+                return package
+        raise exceptions.NoPackageForClassFound(name)
+
+    def get_package_version(self, name):
+        return self._versions.get(name)
+
+
+class TestClassCache(unittest.TestCase):
+    def setUp(self):
+        self.class_cache = package_class_loader.ClassCache(100)
+        self.core = FakePackage('io.murano', {
+            ROOT_CLASS: {'Name': ROOT_CLASS}
+        })
+        self.app = FakePackage('com.example', {
+            'com.example.App': {
+                'Name': 'App',
+                'Namespaces': {'=': 'com.example'},
+                'Properties': {'name': {'Contract': 'name'}}
+            }
+        })
+
+    def _create_loader(self, versions):
+        package_loader = FakePackageLoader([self.core, self.app], versions)
+        return package_class_loader.PackageClassLoader(
+            package_loader, self.class_cache)
+
+    def test_classes_are_shared_between_loaders(self):
+        versions = {'io.murano': '1', 'com.example': '1'}
+        app1 = self._create_loader(versions).get_class('com.example.App')
+        loader2 = self._create_loader(versions)
+        app2 = loader2.get_class('com.example.App')
+
+        self.assertIs(app1, app2)
+        self.assertIs(app2.parents[0], loader2.get_class(ROOT_CLASS))
+
+    def test_cached_classes_do_not_load_packages(self):
+        versions = {'io.murano': '1', 'com.example': '1'}
+        self._create_loader(versions).get_class('com.example.App')
+        package_loader = mock.Mock(
+            wraps=FakePackageLoader([self.core, self.app], versions))
+        loader = package_class_loader.PackageClassLoader(
+            package_loader, self.class_cache)
+        loader.get_class('com.example.App')
+
+        self.assertFalse(package_loader.get_package_by_class.called)
+        self.assertEqual(
+            set(['com.example', 'io.murano']),
+            set(call[0][0] for call in
+                package_loader.get_package_version.call_args_list))
+
+    def test_changed_package_invalidates_classes(self):
+        app1 = self._create_loader(
+            {'io.murano': '1', 'com.example': '1'}).get_class(
+                'com.example.App')
+        app2 = self._create_loader(
+            {'io.murano': '2', 'com.example': '1'}).get_class(
+                'com.example.App')
+
+        self.assertIsNot(app1, app2)
+        self.assertIsNot(app1.parents[0], app2.parents[0])
+
+    def test_classes_without_version_are_not_cached(self):
+        versions = {'io.murano': '1'}
+        app1 = self._create_loader(versions).get_class('com.example.App')
+        app2 = self._create_loader(versions).get_class('com.example.App')
+
+        self.assertIsNot(app1, app2)
+        self.assertIs(app1.parents[0], app2.parents[0])
+
+    def test_principal_objects_are_imported_once(self):
+        versions = {'io.murano': '1', 'com.example': '1'}
+        root1 = self._create_loader(versions).get_class(ROOT_CLASS)
+        object_class = root1.object_class
+        root2 = self._create_loader(versions).get_class(ROOT_CLASS)
+
+        self.assertIs(root1, root2)
+        self.assertIs(object_class, root2.object_class)
+        self.assertIn('setAttr', root2.methods)
@@ -0,0 +1,93 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+
+import mock
+import unittest2 as unittest
+
+from muranoapi.engine.system import resource_manager
+
+
+class TestResourceCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = resource_manager.ResourceCache(100)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as file:
+            file.write(data)
+        return path
+
+    def test_file_is_read_once(self):
+        path = self._write('script.sh', 'echo 1')
+
+        self.assertEqual('echo 1', self.cache.get(path).data)
+        with mock.patch('__builtin__.open') as mock_open:
+            self.assertEqual('echo 1', self.cache.get(path).data)
+            self.assertEqual('ZWNobyAx\n', self.cache.get_base64(path))
+        self.assertFalse(mock_open.called)
+        self.assertEqual(1, self.cache.stats()['misses'])
+        self.assertEqual(15, self.cache.stats()['size'])
+
+    def test_same_content_is_shared(self):
+        first = self.cache.get(self._write('a.sh', 'echo 1'))
+        second = self.cache.get(self._write('b.sh', 'echo 1'))
+
+        self.assertIs(first, second)
+        self.assertEqual(6, self.cache.stats()['size'])
+
+    def test_changed_file_is_read_again(self):
+        path = self._write('script.sh', 'echo 1')
+        self.cache.get(path)
+        self._write('script.sh', 'echo 22')
+
+        self.assertEqual('echo 22', self.cache.get(path).data)
+
+    def test_rewritten_file_with_same_size_and_mtime(self):
+        path = self._write('script.sh', 'echo 1')
+        os.utime(path, (1000, 1000))
+        self.cache.get(path)
+        self._write('script.sh', 'echo 2')
+        os.utime(path, (1000, 1000))
+
+        self.assertEqual('echo 2', self.cache.get(path).data)
+
+    def test_replaced_file_is_read_again(self):
+        path = self._write('script.sh', 'echo 1')
+        os.utime(path, (1000, 1000))
+        self.cache.get(path)
+        new_path = self._write('new.sh', 'echo 2')
+        os.utime(new_path, (1000, 1000))
+        os.rename(new_path, path)
+
+        self.assertEqual('echo 2', self.cache.get(path).data)
+
+    def test_size_limit(self):
+        paths = [self._write('%d.sh' % index, str(index) * 40)
+                 for index in range(3)]
+        for path in paths:
+            self.cache.get(path)
+
+        self.assertEqual(80, self.cache.stats()['size'])
+        with mock.patch('__builtin__.open', wraps=open) as mock_open:
+            self.cache.get(paths[0])
+        self.assertTrue(mock_open.called)
@@ -0,0 +1,100 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import unittest2 as unittest
+
+from muranoapi.engine import task_scheduler
+
+
+class TestTaskScheduler(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+        self.running = {}
+        self.max_running = {}
+
+    def _task(self, tenant_id, name):
+        def run():
+            self.order.append(name)
+            running = self.running.get(tenant_id, 0) + 1
+            self.running[tenant_id] = running
+            self.max_running[tenant_id] = max(
+                self.max_running.get(tenant_id, 0), running)
+            eventlet.sleep(0.001)
+            self.running[tenant_id] -= 1
+        return run
+
+    def _submit(self, scheduler, tenant_id, name, priority=False):
+        scheduler.submit(tenant_id, self._task(tenant_id, name), priority)
+
+    def test_tenants_are_served_round_robin(self):
+        scheduler = task_scheduler.TaskScheduler(1)
+        # occupies the only worker while the queues are filled
+        self._submit(scheduler, 'x', 'x')
+        for name in ('a1', 'a2', 'a3'):
+            self._submit(scheduler, 'a', name)
+        for name in ('b1', 'b2'):
+            self._submit(scheduler, 'b', name)
+        self._submit(scheduler, 'c', 'c1')
+        scheduler.wait()
+
+        self.assertEqual(['x', 'a1', 'b1', 'c1', 'a2', 'b2', 'a3'],
+                         self.order)
+
+    def test_priority_lane(self):
+        scheduler = task_scheduler.TaskScheduler(1)
+        for name in ('a1', 'a2', 'a3'):
+            self._submit(scheduler, 'a', name)
+        self._submit(scheduler, 'b', 'delete', priority=True)
+        scheduler.wait()
+
+        self.assertEqual(['a1', 'delete', 'a2', 'a3'], self.order)
+        self.assertEqual(1, scheduler.stats()['tasks']['priority'][
+            'completed'])
+
+    def test_max_tasks_per_tenant(self):
+        scheduler = task_scheduler.TaskScheduler(4, 2)
+        for index in range(5):
+            self._submit(scheduler, 'a', 'a%d' % index)
+        self._submit(scheduler, 'b', 'b0')
+        self.assertEqual(3, scheduler.stats()['active'])
+        self.assertEqual(3, scheduler.stats()['queued'])
+        scheduler.wait()
+
+        self.assertEqual({'a': 2, 'b': 1}, self.max_running)
+        self.assertEqual(6, scheduler.stats()['tasks']['normal'][
+            'completed'])
+        self.assertEqual(0, scheduler.stats()['active'])
+
+    def test_submit_returns_completion_event(self):
+        scheduler = task_scheduler.TaskScheduler(1)
+        first = scheduler.submit('a', self._task('a', 'a1'))
+        second = scheduler.submit('a', lambda: 1 / 0)
+        self.assertFalse(first.ready())
+        second.wait()
+
+        self.assertTrue(first.ready())
+        self.assertEqual(['a1'], self.order)
+
+    def test_failed_task(self):
+        scheduler = task_scheduler.TaskScheduler(1)
+        scheduler.submit('a', lambda: 1 / 0)
+        self._submit(scheduler, 'a', 'a1')
+        scheduler.wait()
+
+        self.assertEqual(['a1'], self.order)
+        stats = scheduler.stats()['tasks']['normal']
+        self.assertEqual(2, stats['completed'])
+        self.assertEqual(1, stats['failed'])
@@ -0,0 +1,112 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import unittest2 as unittest
+
+import muranoapi.dsl.murano_object  # noqa
+import muranoapi.dsl.namespace_resolver as ns_resolver
+import muranoapi.dsl.type_scheme as type_scheme
+from muranoapi.dsl.yaql_expression import YaqlExpression
+from muranoapi.tests import dsl_utils
+
+
+class TestContracts(unittest.TestCase):
+    def setUp(self):
+        self.resolver = ns_resolver.NamespaceResolver({'=': 'io.murano'})
+        self.executor, self.obj = dsl_utils.load_model(
+            {}, dsl_utils.new_object('io.murano.Object', 'obj'))
+        self.context = self.executor._root_context
+
+    def _validate(self, spec, data, default=None):
+        contract = type_scheme.TypeScheme(spec)
+        return contract(data, self.context, None, self.executor.object_store,
+                        self.resolver, default)
+
+    def test_compiled_contracts_do_not_use_yaql_context(self):
+        with mock.patch.object(type_scheme.TypeScheme,
+                               'prepare_context') as prepare_context:
+            self.assertEqual(
+                u'5', self._validate(YaqlExpression('$.string().notNull()'),
+                                     5))
+            self.assertEqual(
+                [self.obj],
+                self._validate([YaqlExpression('$.class(Object).notNull()')],
+                               'obj'))
+            self.assertEqual(
+                {'a': 1, u'b': True},
+                self._validate({'a': YaqlExpression('$.int()'),
+                                YaqlExpression('$.string()'):
+                                YaqlExpression('$.bool()')},
+                               {'a': '1', 'b': 'yes'}))
+            self.assertFalse(prepare_context.called)
+
+    def test_namespaced_class_contract_is_compiled(self):
+        self.resolver = ns_resolver.NamespaceResolver(
+            {'=': 'io.murano', 'std': 'io.murano'})
+        with mock.patch.object(type_scheme, '_evaluate_expression') as \
+                evaluate_expression:
+            self.assertEqual(
+                self.obj,
+                self._validate(YaqlExpression('$.class(std:Object)'), 'obj'))
+            self.assertEqual(
+                self.obj,
+                self._validate(
+                    YaqlExpression('$.class(std:Object, std:Object)'
+                                   '.notNull()'), 'obj'))
+            self.assertFalse(evaluate_expression.called)
+
+    def test_contract_errors(self):
+        self.assertRaises(TypeError, self._validate,
+                          YaqlExpression('$.string().notNull()'), None)
+        self.assertRaises(TypeError, self._validate,
+                          YaqlExpression('$.int()'), 'abc')
+        self.assertRaises(TypeError, self._validate,
+                          [YaqlExpression('$.int()'), 1, 2], [1, 2, 3])
+        self.assertRaises(TypeError, self._validate,
+                          YaqlExpression('$.class(Object)'), 'unknown')
+        self.assertRaises(TypeError, self._validate, 'const', 'other')
+
+    def test_default_is_used_for_missing_value(self):
+        self.assertEqual(5, self._validate(YaqlExpression('$.int()'),
+                                           type_scheme.NoValue, 5))
+
+    def test_not_compiled_contract_falls_back_to_yaql(self):
+        spec = [YaqlExpression('$.int().check($ > 1)')]
+
+        self.assertEqual([2, 3], self._validate(spec, ['2', 3]))
+        self.assertRaises(TypeError, self._validate, spec, [2, 1])
+
+    def test_item_validation(self):
+        spec = {
+            'ports': [YaqlExpression('$.int()')],
+            'tags': {YaqlExpression('$.string()'): YaqlExpression('$.int()')},
+            'extra': {},
+            'raw': YaqlExpression('$')
+        }
+        contract = type_scheme.TypeScheme(spec)
+
+        def validate_item(path, data):
+            return contract.validate_item(
+                path, data, self.context, None, self.executor.object_store,
+                self.resolver, None)
+
+        self.assertEqual(80, validate_item(['ports', 3], '80'))
+        self.assertEqual(1, validate_item(['tags', 'a'], '1'))
+        self.assertEqual([1], validate_item(['extra', 'a'], [1]))
+        self.assertRaises(TypeError, validate_item, ['ports', 0], 'abc')
+        self.assertIs(type_scheme.NoValue, validate_item(['tags', 1], 1))
+        self.assertIs(type_scheme.NoValue, validate_item(['raw', 'a'], 1))
+        self.assertIs(type_scheme.NoValue, validate_item(['other'], 1))
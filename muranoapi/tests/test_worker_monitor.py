@@ -0,0 +1,68 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import mock
+import unittest2 as unittest
+
+from muranoapi.engine import worker_monitor
+
+
+class TestWorkerMonitor(unittest.TestCase):
+    def setUp(self):
+        self.rss = 100
+        self.recycle = mock.Mock()
+
+    def _monitor(self, max_tasks=0, max_rss=0):
+        monitor = worker_monitor.WorkerMonitor(
+            max_tasks, max_rss, 0.001, lambda: self.rss)
+        monitor.set_recycle_callback(self.recycle)
+        return monitor
+
+    def test_peak_memory(self):
+        monitor = self._monitor()
+        memory = monitor.task_started()
+        self.rss = 300
+        eventlet.sleep(0.01)
+        self.rss = 200
+        monitor.task_finished(memory)
+
+        self.assertEqual(300, memory.peak)
+        self.assertEqual(200, memory.growth)
+        self.assertEqual(300, monitor.stats()['peak_rss'])
+
+    def test_recycle_after_tasks(self):
+        monitor = self._monitor(max_tasks=2)
+        for _ in range(3):
+            monitor.task_finished(monitor.task_started())
+            eventlet.sleep(0)
+
+        self.recycle.assert_called_once_with()
+        self.assertTrue(monitor.recycling)
+
+    def test_recycle_above_rss(self):
+        monitor = self._monitor(max_rss=150)
+        monitor.task_finished(monitor.task_started())
+        self.assertFalse(self.recycle.called)
+
+        self.rss = 200
+        monitor.task_finished(monitor.task_started())
+        self.recycle.assert_called_once_with()
+
+    def test_no_recycle_without_callback(self):
+        monitor = worker_monitor.WorkerMonitor(1, 0, 0.001, lambda: self.rss)
+        monitor.task_finished(monitor.task_started())
+
+        self.assertFalse(monitor.recycling)